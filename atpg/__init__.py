@@ -0,0 +1,5 @@
+from atpg.pipeline import FaultSimStage, run_pipeline
+from atpg.runner import run_streaming
+from atpg.session import AtpgResult, AtpgSession
+
+__all__ = ["AtpgResult", "AtpgSession", "FaultSimStage", "run_pipeline", "run_streaming"]
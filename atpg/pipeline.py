@@ -0,0 +1,240 @@
+"""ATPG workers feeding a fault-simulation stage through a bounded queue."""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing as mp
+import queue
+import traceback
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from atpg.session import AtpgResult, AtpgSession, EngineName
+from configs.cfg import PIPELINE_BLOCK, PIPELINE_QUEUE_SIZE, PIPELINE_WORKERS
+from dto import Circuit, Fault
+from helpers.fault_sim import characteristic_faults
+from helpers.netlist import compile_circuit, pack_patterns, simulate_words
+from helpers.redundancy import UntestableCache
+
+# Seconds between checks that the workers are still alive while the queue is empty
+POLL_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class _WorkerFailure:
+    traceback: str
+
+
+# worker -> stage: (fault id, status, test), a failure, or None once the worker is done
+Message = Optional[Union[Tuple[str, str, Optional[Dict[str, int]]], _WorkerFailure]]
+
+
+class FaultSimStage:
+    """Packs incoming tests into blocks and drops every live fault a block detects.
+
+    Redundant faults are final as soon as they arrive; aborted ones are held
+    back, since a later block may still detect them, and reported by
+    `finish()`.
+    """
+
+    def __init__(self, circuit: Circuit, faults: Sequence[Fault], block: int = PIPELINE_BLOCK):
+        self.circuit = circuit
+        self.compiled = compile_circuit(circuit)
+        self.block = block
+        self.live: Dict[str, Fault] = {_fault_id(f): f for f in faults}
+        self.aborted: Dict[str, Fault] = {}
+        self.pending: List[Dict[str, int]] = []
+        self.blocks = 0
+
+    def accept(self, fault_id: str, status: str, test: Optional[Dict[str, int]]) -> List[AtpgResult]:
+        fault = self.live.get(fault_id)
+        if fault is None:
+            return []  # already dropped by an earlier block
+        if status == "redundant":
+            del self.live[fault_id]
+            return [AtpgResult(fault, "redundant")]
+        if status == "aborted":
+            self.aborted[fault_id] = fault
+            return []
+        self.pending.append(test)
+        return self.flush() if len(self.pending) >= self.block else []
+
+    def flush(self) -> List[AtpgResult]:
+        """Simulate the pending tests against the live faults, all patterns at once."""
+        if not self.pending:
+            return []
+        tests, self.pending = self.pending, []
+        self.blocks += 1
+        words, mask = pack_patterns(self.compiled, tests)
+        good = simulate_words(self.compiled, words, mask)
+
+        dropped: List[AtpgResult] = []
+        for fault_id, fault in list(self.live.items()):
+            values = simulate_words(
+                self.compiled, words, mask, (self.compiled.index[fault.pole], fault.stuck_at)
+            )
+            diff = 0
+            for o in self.compiled.outputs:
+                diff |= values[o] ^ good[o]
+            if diff:
+                first = (diff & -diff).bit_length() - 1
+                del self.live[fault_id]
+                self.aborted.pop(fault_id, None)
+                dropped.append(AtpgResult(fault, "detected", tests[first]))
+        return dropped
+
+    def finish(self) -> List[AtpgResult]:
+        results = self.flush()
+        results += [AtpgResult(f, "aborted") for f in self.aborted.values() if _fault_id(f) in self.live]
+        return results
+
+
+def run_pipeline(
+    circuit: Circuit,
+    engine: EngineName = "d_algorithm",
+    faults: Optional[Sequence[Fault]] = None,
+    *,
+    workers: int = PIPELINE_WORKERS,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    block: int = PIPELINE_BLOCK,
+    cache: Optional[UntestableCache] = None,
+) -> Iterator[AtpgResult]:
+    """Stream one result per fault while ATPG and fault simulation overlap.
+
+    The faults are striped over `workers` processes, each of which runs an
+    `AtpgSession` and puts its tests on a queue of at most `queue_size`
+    entries. This process packs them into blocks of `block` patterns, fault
+    simulates each block and broadcasts the faults it drops, so the workers
+    skip them. With `workers=0` everything runs in this process.
+    """
+    faults = list(faults if faults is not None else characteristic_faults(circuit))
+    cache = cache if cache is not None else UntestableCache(circuit)
+    stage = FaultSimStage(circuit, faults, block)
+
+    if workers <= 0:
+        results = _serial(circuit, engine, stage, cache)
+    else:
+        results = _parallel(circuit, engine, faults, stage, cache, workers, queue_size)
+
+    for result in results:
+        if result.status == "redundant":
+            cache.record_redundant(result.fault)
+        yield result
+    cache.save()
+
+
+def _serial(
+    circuit: Circuit, engine: EngineName, stage: FaultSimStage, cache: UntestableCache
+) -> Iterator[AtpgResult]:
+    session = AtpgSession(circuit, engine, cache=cache)
+    for fault_id, fault in list(stage.live.items()):
+        if fault_id not in stage.live:
+            continue
+        result = session.test_for(fault)
+        yield from stage.accept(fault_id, result.status, result.test)
+        # nothing runs in parallel here, so drop faults after every test
+        yield from stage.flush()
+    yield from stage.finish()
+
+
+def _parallel(
+    circuit: Circuit,
+    engine: EngineName,
+    faults: List[Fault],
+    stage: FaultSimStage,
+    cache: UntestableCache,
+    workers: int,
+    queue_size: int,
+) -> Iterator[AtpgResult]:
+    ctx = mp.get_context()
+    results: mp.Queue = ctx.Queue(maxsize=queue_size)
+    drops = [ctx.Queue() for _ in range(workers)]
+    procs = [
+        ctx.Process(
+            target=_worker,
+            args=(circuit, engine, faults[k::workers], sorted(cache.redundant), results, drops[k]),
+            daemon=True,
+        )
+        for k in range(workers)
+    ]
+    for proc in procs:
+        proc.start()
+
+    def broadcast(batch: List[AtpgResult]) -> List[AtpgResult]:
+        for result in batch:
+            if result.status == "detected":
+                for q in drops:
+                    q.put(_fault_id(result.fault))
+        return batch
+
+    running = workers
+    try:
+        while running:
+            try:
+                message: Message = results.get_nowait()
+            except queue.Empty:
+                # workers are behind: use the wait to simulate a partial block
+                yield from broadcast(stage.flush())
+                message = _next_message(results, procs)
+            if message is None:
+                running -= 1
+                continue
+            if isinstance(message, _WorkerFailure):
+                raise RuntimeError(f"ATPG worker failed:\n{message.traceback}")
+            yield from broadcast(stage.accept(*message))
+        yield from stage.finish()
+    finally:
+        for q in drops:
+            q.cancel_join_thread()  # workers may exit with broadcasts unread
+        for proc in procs:
+            proc.join(timeout=1)
+            if proc.is_alive():
+                proc.terminate()
+
+
+def _worker(
+    circuit: Circuit,
+    engine: EngineName,
+    faults: List[Fault],
+    redundant: List[str],
+    results: mp.Queue,
+    drops: mp.Queue,
+) -> None:
+    for name in ("lab1.single_path", "lab2.d_algorithm"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    try:
+        cache = UntestableCache(circuit, directory=None)
+        cache.redundant.update(redundant)
+        session = AtpgSession(circuit, engine, cache=cache)
+        dropped = set()
+        for fault in faults:
+            while True:
+                try:
+                    dropped.add(drops.get_nowait())
+                except queue.Empty:
+                    break
+            fault_id = _fault_id(fault)
+            if fault_id in dropped:
+                continue
+            result = session.test_for(fault)
+            results.put((fault_id, result.status, result.test))
+    except Exception:
+        results.put(_WorkerFailure(traceback.format_exc()))
+    finally:
+        results.put(None)  # the stage counts these, so it must come even after a failure
+
+
+def _next_message(results: mp.Queue, procs: List[mp.Process]) -> Message:
+    """Block for the next message, but fail instead of hanging if a worker died without one."""
+    while True:
+        try:
+            return results.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            dead = [proc for proc in procs if proc.exitcode not in (None, 0)]
+            if dead:
+                raise RuntimeError(f"ATPG worker exited with code {dead[0].exitcode}")
+
+
+def _fault_id(fault: Fault) -> str:
+    return f"{fault.pole}/{fault.stuck_at}"
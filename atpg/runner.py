@@ -0,0 +1,48 @@
+"""Streaming ATPG run: every result is logged as the pipeline produces it."""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from typing import Dict, Sequence
+
+from atpg.pipeline import run_pipeline
+from atpg.session import ENGINES, EngineName
+from configs.cfg import PIPELINE_BLOCK, PIPELINE_QUEUE_SIZE, PIPELINE_WORKERS
+from dto import Circuit
+from helpers.circuit_factory import create_circuit_variant_3
+from lab1.single_path import format_test
+
+logger = logging.getLogger(__name__)
+
+
+def run_streaming(
+    circuit: Circuit | None = None, engines: Sequence[EngineName] = ENGINES
+) -> Dict[str, Counter]:
+    """Run the ATPG / fault-simulation pipeline per engine; returns status counts per engine."""
+    circuit = circuit or create_circuit_variant_3()
+    counts: Dict[str, Counter] = {}
+    for engine in engines:
+        logger.info(
+            "\n=== ATPG pipeline: %s (%d workers, queue of %d, blocks of %d) ===\n",
+            engine,
+            PIPELINE_WORKERS,
+            PIPELINE_QUEUE_SIZE,
+            PIPELINE_BLOCK,
+        )
+        statuses: Counter = Counter()
+        for result in run_pipeline(circuit, engine):
+            statuses[result.status] += 1
+            fault = f"{result.fault.pole}/{result.fault.stuck_at}"
+            if result.test is not None:
+                logger.info("Test for %s: %s", fault, format_test(result.test, circuit))
+            else:
+                logger.info("%s: %s", fault, result.status)
+        logger.info(
+            "\nTotal: %d detected, %d redundant, %d aborted",
+            statuses["detected"],
+            statuses["redundant"],
+            statuses["aborted"],
+        )
+        counts[engine] = statuses
+    return counts
@@ -0,0 +1,128 @@
+"""Reusable ATPG session: per-circuit state built once, faults answered in batches."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Literal, Optional
+
+from configs.cfg import STATIC_LEARNING
+from dto import Circuit, Fault, Gate, GateType
+from helpers.cube import CubeTables
+from helpers.fault_sim import characteristic_faults
+from helpers.learning import ImplicationGraph, learn_implications
+from helpers.logic import find_paths
+from helpers.netlist import CompiledCircuit, compile_circuit, pack_patterns, simulate_words
+from helpers.redundancy import RedundancyProver, UntestableCache, classify_untested
+from helpers.stats import AtpgStats, fault_timer
+from helpers.testability import Scoap, compute_scoap
+from lab1.single_path import find_test_for_fault
+from lab2.d_algorithm import cube_to_test, d_algorithm
+
+EngineName = Literal["single_path", "d_algorithm"]
+Status = Literal["detected", "redundant", "aborted"]
+
+ENGINES = ("single_path", "d_algorithm")
+
+
+@dataclass(frozen=True)
+class AtpgResult:
+    fault: Fault
+    status: Status
+    test: Optional[Dict[str, int]] = None
+
+
+class AtpgSession:
+    """ATPG for one circuit with the setup paid once.
+
+    The compiled netlist, SCOAP measures, learned implications, cube tables,
+    redundancy prover and untestable cache are built on construction; path
+    lists are memoized per fault site. Every returned test is checked by
+    simulation, so `detected` always means the test really detects the
+    fault. The untestable cache is only written by `save()`.
+    """
+
+    def __init__(
+        self,
+        circuit: Circuit,
+        engine: EngineName = "d_algorithm",
+        *,
+        learned: Optional[ImplicationGraph] = None,
+        cache: Optional[UntestableCache] = None,
+        stats: Optional[AtpgStats] = None,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {', '.join(ENGINES)}")
+
+        self.circuit = circuit
+        self.engine = engine
+        self.stats = stats
+        self.compiled: CompiledCircuit = (
+            learned.compiled if learned is not None else compile_circuit(circuit)
+        )
+        if learned is None and STATIC_LEARNING:
+            learned = learn_implications(circuit, self.compiled)
+        self.learned = learned
+        self.scoap: Scoap = compute_scoap(circuit, self.compiled)
+        self.tables = CubeTables(circuit.get_all_poles())
+        self.drivers: Dict[str, Gate] = {gate.output: gate for gate in circuit.gates}
+        self.prover = RedundancyProver(circuit, self.compiled, learned)
+        self.cache = cache if cache is not None else UntestableCache(circuit)
+        self._paths: Dict[str, List[List[str]]] = {}
+
+    def paths(self, pole: str) -> List[List[str]]:
+        """Paths from `pole` to the outputs, easiest to sensitize first (by SCOAP)."""
+        if pole not in self._paths:
+            paths = find_paths(self.circuit, pole, self.circuit.outputs)
+            self._paths[pole] = sorted(paths, key=self._path_cost)
+        return self._paths[pole]
+
+    def test_for(self, fault: Fault) -> AtpgResult:
+        if self.cache.is_redundant(fault):
+            return AtpgResult(fault, "redundant")
+
+        with fault_timer(self.stats, f"{fault.pole}/{fault.stuck_at}"):
+            test = self._run_engine(fault)
+        if test is not None and self.detects(test, fault):
+            self.cache.record_detected(fault, self.engine)
+            return AtpgResult(fault, "detected", test)
+        if classify_untested(self.cache, self.prover, fault, self.engine):
+            return AtpgResult(fault, "redundant")
+        return AtpgResult(fault, "aborted")
+
+    def generate(self, faults: Optional[Iterable[Fault]] = None) -> Iterator[AtpgResult]:
+        """Results in fault order; all characteristic faults by default."""
+        for fault in faults if faults is not None else characteristic_faults(self.circuit):
+            yield self.test_for(fault)
+
+    def detects(self, test: Dict[str, int], fault: Fault) -> bool:
+        words, mask = pack_patterns(self.compiled, [test])
+        good = simulate_words(self.compiled, words, mask)
+        bad = simulate_words(
+            self.compiled, words, mask, (self.compiled.index[fault.pole], fault.stuck_at)
+        )
+        return any(good[o] != bad[o] for o in self.compiled.outputs)
+
+    def save(self) -> None:
+        self.cache.save()
+
+    def _run_engine(self, fault: Fault) -> Optional[Dict[str, int]]:
+        if self.engine == "single_path":
+            paths = None if fault.pole in self.circuit.inputs else self.paths(fault.pole)
+            return find_test_for_fault(self.circuit, fault, self.stats, self.learned, paths)
+        cube = d_algorithm(self.circuit, fault, self.stats, self.learned, self.tables)
+        return cube_to_test(cube, self.circuit) if cube else None
+
+    def _path_cost(self, path: List[str]) -> int:
+        cost = 0
+        for prev, pole in zip(path, path[1:]):
+            gate = self.drivers[pole]
+            for side in gate.inputs:
+                if side == prev:
+                    continue
+                if gate.gate_type in (GateType.AND, GateType.NAND):
+                    cost += self.scoap.controllability(side, 1)
+                elif gate.gate_type in (GateType.OR, GateType.NOR):
+                    cost += self.scoap.controllability(side, 0)
+                elif gate.gate_type == GateType.XOR:
+                    cost += min(self.scoap.controllability(side, 0), self.scoap.controllability(side, 1))
+        return cost
@@ -0,0 +1,3 @@
+from bench.runner import run_bench
+
+__all__ = ["run_bench"]
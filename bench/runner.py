@@ -0,0 +1,274 @@
+"""ATPG / fault-simulation benchmark on generated circuits."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import platform
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from atpg import AtpgSession
+from configs.cfg import (
+    BENCH_HISTORY,
+    BENCH_MAX_CONE_INPUTS,
+    BENCH_MAX_DALG_GATES,
+    BENCH_MAX_ENUM_INPUTS,
+    BENCH_MAX_GATES,
+    BENCH_MAX_PATH_GATES,
+    BENCH_MAX_SIM_GATES,
+    BENCH_PATTERNS,
+    BENCH_REGRESSION_RATIO,
+)
+from dto import Circuit, Fault
+from helpers.circuit_factory import (
+    create_array_multiplier,
+    create_carry_lookahead_adder,
+    create_circuit_variant_3,
+    create_parity_tree,
+    create_random_dag,
+    create_ripple_carry_adder,
+)
+from helpers.fault_sim import characteristic_faults, detects_fault
+from helpers.aig import build_aig, detected_faults, netlist_mismatches
+from helpers.netlist import compile_circuit, simulate_words
+from helpers.pseudo_exhaustive import build_pseudo_exhaustive, output_supports
+from helpers.redundancy import UntestableCache
+
+logger = logging.getLogger(__name__)
+
+# Engine returns the faults it detected out of the given list.
+EngineFn = Callable[[Circuit, List[Fault]], List[Fault]]
+
+
+@dataclass(frozen=True)
+class Engine:
+    name: str
+    run: EngineFn
+    max_inputs: Optional[int] = None  # skip designs wider than this (exhaustive inner loops)
+    max_gates: Optional[int] = None  # skip designs larger than this (search time)
+    max_cone: Optional[int] = None  # skip designs with an output cone wider than this
+
+    def handles(self, circuit: Circuit) -> bool:
+        if self.max_inputs is not None and len(circuit.inputs) > self.max_inputs:
+            return False
+        if self.max_gates is not None and len(circuit.gates) > self.max_gates:
+            return False
+        if self.max_cone is None:
+            return True
+        return max((len(s) for s in output_supports(circuit).values()), default=0) <= self.max_cone
+
+
+@dataclass
+class BenchResult:
+    design: str
+    engine: str
+    inputs: int
+    gates: int
+    faults: int
+    detected: int
+    wall_s: float
+    peak_kib: float
+
+    @property
+    def coverage(self) -> float:
+        return (self.detected / self.faults) * 100 if self.faults else 0.0
+
+    @property
+    def faults_per_s(self) -> float:
+        return self.faults / self.wall_s if self.wall_s else 0.0
+
+    def as_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["coverage"] = round(self.coverage, 2)
+        data["faults_per_s"] = round(self.faults_per_s, 2)
+        return data
+
+
+def _session_engine(engine: str) -> EngineFn:
+    def run(circuit: Circuit, faults: List[Fault]) -> List[Fault]:
+        session = AtpgSession(circuit, engine, cache=UntestableCache(circuit, directory=None))
+        return [r.fault for r in session.generate(faults) if r.status == "detected"]
+
+    return run
+
+
+def _random_tests(circuit: Circuit) -> List[Dict[str, int]]:
+    rng = random.Random(1)
+    return [{inp: rng.randint(0, 1) for inp in circuit.inputs} for _ in range(BENCH_PATTERNS)]
+
+
+def _random_fault_sim(circuit: Circuit, faults: List[Fault]) -> List[Fault]:
+    tests = _random_tests(circuit)
+    return [f for f in faults if any(detects_fault(circuit, t, f) for t in tests)]
+
+
+def _aig_fault_sim(circuit: Circuit, faults: List[Fault]) -> List[Fault]:
+    return detected_faults(build_aig(circuit), circuit, _random_tests(circuit), faults)
+
+
+def _pseudo_exhaustive(circuit: Circuit, faults: List[Fault]) -> List[Fault]:
+    plan = build_pseudo_exhaustive(circuit)
+    compiled = compile_circuit(circuit)
+    words, mask = plan.input_words(), (1 << plan.pattern_count) - 1
+    good = simulate_words(compiled, words, mask)
+    detected = []
+    for fault in faults:
+        values = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+        if any(values[o] != good[o] for o in compiled.outputs):
+            detected.append(fault)
+    return detected
+
+
+ENGINES: List[Engine] = [
+    Engine(
+        "single_path",
+        _session_engine("single_path"),
+        max_inputs=BENCH_MAX_ENUM_INPUTS,
+        max_gates=BENCH_MAX_PATH_GATES,
+    ),
+    Engine("d_algorithm", _session_engine("d_algorithm"), max_gates=BENCH_MAX_DALG_GATES),
+    Engine("fault_sim", _random_fault_sim, max_gates=BENCH_MAX_SIM_GATES),
+    Engine("aig_sim", _aig_fault_sim),
+    Engine("pseudo_exh", _pseudo_exhaustive, max_cone=BENCH_MAX_CONE_INPUTS),
+]
+
+
+def default_designs(max_gates: int = BENCH_MAX_GATES) -> List[Tuple[str, Circuit]]:
+    """Size ladder of generated circuits, smallest first within each family."""
+    designs: List[Tuple[str, Circuit]] = [("variant3", create_circuit_variant_3())]
+    designs += [(f"rca{n}", create_ripple_carry_adder(n)) for n in (2, 4, 8, 16, 32)]
+    designs += [(f"cla{n}", create_carry_lookahead_adder(n)) for n in (4, 8, 16, 32)]
+    designs += [(f"mult{n}", create_array_multiplier(n)) for n in (2, 3, 4, 8)]
+    designs += [(f"parity{n}", create_parity_tree(n)) for n in (4, 8, 16, 64)]
+    designs += [
+        (f"dag{g}", create_random_dag(8, g, reconvergence=0.3, seed=g)) for g in (16, 32, 64, 256)
+    ]
+    designs.append(("dag1024", create_random_dag(16, 1024, reconvergence=0.3, seed=1024)))
+    return [(name, circuit) for name, circuit in designs if len(circuit.gates) <= max_gates]
+
+
+def run_bench(
+    designs: Sequence[Tuple[str, Circuit]] | None = None,
+    engines: Sequence[Engine] | None = None,
+    history_path: str = BENCH_HISTORY,
+) -> List[BenchResult]:
+    """Run every engine over every design and append the results to the JSON history."""
+    designs = list(designs) if designs is not None else default_designs()
+    engines = list(engines) if engines is not None else ENGINES
+
+    logger.info("=== Benchmark: ATPG and fault simulation ===")
+    quiet = [logging.getLogger(name) for name in ("lab1.single_path", "lab2.d_algorithm")]
+    levels = [lg.level for lg in quiet]
+    for lg in quiet:
+        lg.setLevel(logging.WARNING)
+
+    results: List[BenchResult] = []
+    try:
+        for design, circuit in designs:
+            faults = characteristic_faults(circuit)
+            for engine in engines:
+                if not engine.handles(circuit):
+                    continue
+                results.append(_measure(design, circuit, faults, engine))
+            if any(engine.run is _aig_fault_sim for engine in engines):
+                _check_aig(design, circuit)
+    finally:
+        for lg, level in zip(quiet, levels):
+            lg.setLevel(level)
+
+    previous = _load_history(history_path)
+    _log_results(results, previous[-1] if previous else None)
+    _log_pattern_counts(designs)
+    _append_history(history_path, previous, results)
+    return results
+
+
+def _check_aig(design: str, circuit: Circuit) -> None:
+    """The AIG engine must detect exactly what netlist simulation detects."""
+    mismatched = netlist_mismatches(build_aig(circuit), circuit, _random_tests(circuit))
+    if mismatched:
+        logger.warning(
+            "aig_sim disagrees with netlist simulation on %s: %s",
+            design,
+            ", ".join(f"{f.pole}/{f.stuck_at}" for f in mismatched),
+        )
+
+
+def _measure(design: str, circuit: Circuit, faults: List[Fault], engine: Engine) -> BenchResult:
+    # tracemalloc slows the engines several times over, so timing and memory use separate runs
+    started = time.perf_counter()
+    detected = engine.run(circuit, faults)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        engine.run(circuit, faults)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return BenchResult(
+        design=design,
+        engine=engine.name,
+        inputs=len(circuit.inputs),
+        gates=len(circuit.gates),
+        faults=len(faults),
+        detected=len(detected),
+        wall_s=elapsed,
+        peak_kib=peak / 1024,
+    )
+
+
+def _load_history(path: str) -> List[Dict[str, object]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _append_history(path: str, history: List[Dict[str, object]], results: List[BenchResult]) -> None:
+    history.append(
+        {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "results": [r.as_dict() for r in results],
+        }
+    )
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(history, fh, indent=2)
+
+
+def _log_results(results: List[BenchResult], previous: Dict[str, object] | None) -> None:
+    baseline: Dict[Tuple[str, str], float] = {}
+    if previous:
+        for row in previous["results"]:
+            baseline[(row["design"], row["engine"])] = row["wall_s"]
+
+    logger.info(
+        "%-10s %-12s %6s %6s %7s %10s %10s %9s %8s",
+        "design", "engine", "inputs", "gates", "faults", "wall, s", "faults/s", "peak KiB", "cov, %",
+    )
+    for r in results:
+        line = "%-10s %-12s %6d %6d %7d %10.4f %10.1f %9.1f %8.1f" % (
+            r.design, r.engine, r.inputs, r.gates, r.faults,
+            r.wall_s, r.faults_per_s, r.peak_kib, r.coverage,
+        )
+        before = baseline.get((r.design, r.engine))
+        if before and r.wall_s > before * BENCH_REGRESSION_RATIO:
+            line += f"  REGRESSION x{r.wall_s / before:.2f}"
+        logger.info(line)
+
+
+def _log_pattern_counts(designs: Sequence[Tuple[str, Circuit]]) -> None:
+    logger.info("%-10s %6s %6s %10s %12s", "design", "inputs", "cone", "patterns", "exhaustive")
+    for design, circuit in designs:
+        plan = build_pseudo_exhaustive(circuit)
+        logger.info(
+            "%-10s %6d %6d %10d %12d",
+            design, len(circuit.inputs), plan.largest_cone, plan.pattern_count, plan.exhaustive_count,
+        )
@@ -14,3 +14,60 @@ LAB5_SIM_BITS = int(os.getenv('LAB5_SIM_BITS', '256'))
 LAB5_FAULT_SAMPLES = int(os.getenv('LAB5_FAULT_SAMPLES', '32'))
 
 
+
+BENCH_HISTORY = os.getenv('BENCH_HISTORY', 'bench_history.json')
+BENCH_PATTERNS = int(os.getenv('BENCH_PATTERNS', '64'))
+BENCH_MAX_GATES = int(os.getenv('BENCH_MAX_GATES', '1024'))
+BENCH_MAX_ENUM_INPUTS = int(os.getenv('BENCH_MAX_ENUM_INPUTS', '12'))
+# Single-path activation enumerates paths, whose number grows with reconvergent depth
+BENCH_MAX_PATH_GATES = int(os.getenv('BENCH_MAX_PATH_GATES', '64'))
+# The D-algorithm's search time grows steeply with size: it skips larger designs
+BENCH_MAX_DALG_GATES = int(os.getenv('BENCH_MAX_DALG_GATES', '40'))
+# Pattern-at-a-time fault simulation re-evaluates the netlist per test and fault
+BENCH_MAX_SIM_GATES = int(os.getenv('BENCH_MAX_SIM_GATES', '240'))
+# Pseudo-exhaustive words hold 2 ** cone bits
+BENCH_MAX_CONE_INPUTS = int(os.getenv('BENCH_MAX_CONE_INPUTS', '16'))
+BENCH_REGRESSION_RATIO = float(os.getenv('BENCH_REGRESSION_RATIO', '1.25'))
+
+# '' (off), 'log' or 'json': hot-path counters for lab1/lab2
+ATPG_STATS = os.getenv('ATPG_STATS', '').lower()
+
+# Per-circuit cache of proven-redundant faults; empty string keeps it in memory only
+UNTESTABLE_CACHE_DIR = os.getenv('UNTESTABLE_CACHE_DIR', '.atpg_cache')
+
+# Learn indirect implications once per circuit before running lab1/lab2
+STATIC_LEARNING = os.getenv('STATIC_LEARNING', '1') == '1'
+
+# Log the lab1/lab2 tests relaxed to cubes with only the bits that matter
+RELAX_TESTS = os.getenv('RELAX_TESTS', '0') == '1'
+
+# Streaming ATPG -> fault-simulation pipeline (atpg.pipeline); 0 workers runs in-process
+PIPELINE_WORKERS = int(os.getenv('PIPELINE_WORKERS', str(os.cpu_count() or 1)))
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '256'))
+PIPELINE_BLOCK = int(os.getenv('PIPELINE_BLOCK', '64'))
+
+# Bridging-fault grading: candidate pairs per streamed chunk; 1 logs lab1/lab2 bridge coverage
+BRIDGE_CHUNK = int(os.getenv('BRIDGE_CHUNK', '4096'))
+BRIDGE_COVERAGE = os.getenv('BRIDGE_COVERAGE', '0') == '1'
+
+# Sequential circuits: a flat pattern stream is applied from reset in sequences of this many cycles
+SEQ_CYCLES = int(os.getenv('SEQ_CYCLES', '8'))
+
+# Characteristic polynomial of the response-compaction MISR
+MISR_POLY = os.getenv('MISR_POLY', 'x16⊕x14⊕x13⊕x11⊕1')
+
+# LFSR reseeding (helpers.reseeding): most states expanded from each seed
+RESEED_CYCLES = int(os.getenv('RESEED_CYCLES', '8'))
+
+# Weighted random patterns (helpers.weighted): source LFSR, most bits ANDed/ORed per weight,
+# weight sets and patterns per set before switching to the next, patterns per lab6 comparison
+WEIGHTED_POLY = os.getenv('WEIGHTED_POLY', 'x32⊕x22⊕x2⊕x1⊕1')
+WEIGHT_MAX_TERMS = int(os.getenv('WEIGHT_MAX_TERMS', '4'))
+WEIGHT_SETS = int(os.getenv('WEIGHT_SETS', '2'))
+WEIGHT_BLOCK = int(os.getenv('WEIGHT_BLOCK', '16'))
+WEIGHTED_PATTERNS = int(os.getenv('WEIGHTED_PATTERNS', '256'))
+
+
+# Sharded fault simulation (helpers.fault_shard): faults per shard, seconds before a claimed shard is requeued
+SHARD_SIZE = int(os.getenv('SHARD_SIZE', '256'))
+SHARD_STALE_SECONDS = float(os.getenv('SHARD_STALE_SECONDS', '600'))
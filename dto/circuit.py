@@ -10,6 +10,7 @@ class GateType(str, Enum):
     NAND = "NAND"
     NOR = "NOR"
     XOR = "XOR"
+    DFF = "DFF"  # D flip-flop: output is the stored state, input is the next state
 
 
 class Gate(BaseModel):
@@ -34,6 +35,8 @@ class Gate(BaseModel):
             return int(not any(vals))
         elif self.gate_type == GateType.XOR:
             return vals[0] ^ vals[1] if len(vals) >= 2 else 0
+        elif self.gate_type == GateType.DFF:
+            return input_values.get(self.output, 0)
         return 0
 
 
@@ -62,12 +65,19 @@ class Circuit(BaseModel):
             poles.update(gate.inputs)
         return sorted(poles)
     
+    def get_flip_flops(self) -> List[Gate]:
+        """DFF gates, in netlist order"""
+        return [gate for gate in self.gates if gate.gate_type == GateType.DFF]
+    
     def evaluate(self, input_values: Dict[str, int]) -> Dict[str, int]:
-        """Eval circuit"""
+        """Eval circuit (one clock cycle; flip-flop state is read from input_values)"""
         values = dict(input_values)
         
         # Topological eval
         evaluated = set(self.inputs)
+        for gate in self.get_flip_flops():
+            values[gate.output] = gate.evaluate(values)
+            evaluated.add(gate.output)
         max_iterations = len(self.gates) * 2
         
         for _ in range(max_iterations):
@@ -1,6 +1,6 @@
 from helpers.logic import find_paths, get_activation_condition, get_observability_condition
 from helpers.cube import (
-    Cube, d_intersection, build_singular_cubes, build_d_cubes, 
+    Cube, CubeTables, d_intersection, build_singular_cubes, build_d_cubes, 
     build_primitive_d_cubes, build_primitive_d_cubes_for_input
 )
 
@@ -9,6 +9,7 @@ __all__ = [
     'get_activation_condition',
     'get_observability_condition',
     'Cube',
+    'CubeTables',
     'd_intersection',
     'build_singular_cubes',
     'build_d_cubes',
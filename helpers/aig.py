@@ -0,0 +1,288 @@
+"""Structurally hashed And-Inverter Graph front end for simulation and fault lists."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from dto import Circuit, Fault
+from helpers.fault_sim import Coverage, characteristic_faults
+from helpers.netlist import (
+    OP_AND,
+    OP_NAND,
+    OP_NOR,
+    OP_NOT,
+    OP_OR,
+    CompiledCircuit,
+    compile_circuit,
+    pack_patterns,
+    simulate_words,
+)
+
+# Literals are 2 * node + complement; node 0 is constant false.
+CONST0, CONST1 = 0, 1
+
+
+@dataclass
+class Aig:
+    """AND nodes in flat fanin arrays, nodes 1..len(inputs) being the inputs.
+
+    `pole_literal` maps each original pole that survived simplification to
+    its literal. A stuck-at fault on a pole in `exact` is the same fault as
+    the matching stuck-at on its node; the other poles were merged with
+    foreign logic (or folded to a constant) and need the original netlist to
+    be judged.
+    """
+
+    inputs: List[str]
+    fanin0: List[int]
+    fanin1: List[int]
+    outputs: List[str]
+    output_lits: List[int]
+    pole_literal: Dict[str, int]
+    exact: Set[str]
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.fanin0)
+
+    @property
+    def num_ands(self) -> int:
+        return self.num_nodes - 1 - len(self.inputs)
+
+    def node_fault(self, fault: Fault) -> Optional[Tuple[int, int]]:
+        """(node, stuck value) for a fault on an exact pole, None otherwise."""
+        if fault.pole not in self.exact or fault.pole not in self.pole_literal:
+            return None
+        lit = self.pole_literal[fault.pole]
+        return lit >> 1, fault.stuck_at ^ (lit & 1)
+
+    def log(self, logger: logging.Logger, circuit: Circuit) -> None:
+        logger.info(
+            "AIG: %d gates -> %d AND nodes, %d fault sites -> %d (%d poles need the netlist)",
+            len(circuit.gates),
+            self.num_ands,
+            len(characteristic_faults(circuit)),
+            2 * (self.num_nodes - 1),
+            len(set(circuit.inputs) | {g.output for g in circuit.gates}) - len(self.exact),
+        )
+
+
+class _AigBuilder:
+    def __init__(self, num_inputs: int):
+        self.num_inputs = num_inputs
+        self.fanin0 = [0] * (num_inputs + 1)
+        self.fanin1 = [0] * (num_inputs + 1)
+        self.owner = [-1] + list(range(num_inputs))  # pole that created the node; inputs come first
+        self.shared = [True] + [False] * num_inputs
+        self.strash: Dict[Tuple[int, int], int] = {}
+        self.current = -1
+
+    def touch(self, lit: int) -> int:
+        """Mark a node reused outside the pole that created it."""
+        node = lit >> 1
+        if self.owner[node] != self.current:
+            self.shared[node] = True
+        return lit
+
+    def and_(self, a: int, b: int) -> int:
+        if a > b:
+            a, b = b, a
+        if a == CONST0 or a == b ^ 1:
+            return self.touch(CONST0)
+        if a == CONST1 or a == b:
+            return self.touch(b)
+        for x, y in ((a, b), (b, a)):
+            if not y & 1 and y >> 1 > self.num_inputs:
+                fanins = (self.fanin0[y >> 1], self.fanin1[y >> 1])
+                if x in fanins:  # x & (x & z) = x & z
+                    return self.touch(y)
+                if x ^ 1 in fanins:  # x & (!x & z) = 0
+                    self.touch(y)  # y's own fault no longer reaches this gate
+                    return self.touch(CONST0)
+
+        key = (a, b)
+        if key in self.strash:
+            return self.touch(2 * self.strash[key])
+        node = len(self.fanin0)
+        self.fanin0.append(a)
+        self.fanin1.append(b)
+        self.owner.append(self.current)
+        self.shared.append(False)
+        self.strash[key] = node
+        return 2 * node
+
+    def and_all(self, lits: Sequence[int]) -> int:
+        if not lits:
+            return CONST1
+        result = lits[0]
+        for lit in lits[1:]:
+            result = self.and_(result, lit)
+        return result
+
+    def gate(self, op: int, lits: Sequence[int]) -> int:
+        if op == OP_NOT:
+            return lits[0] ^ 1
+        if op in (OP_AND, OP_NAND):
+            return self.and_all(lits) ^ (op == OP_NAND)
+        if op in (OP_OR, OP_NOR):
+            return self.and_all([lit ^ 1 for lit in lits]) ^ (op == OP_OR)
+        if len(lits) < 2:
+            return CONST0
+        a, b = lits[0], lits[1]
+        return self.and_(self.and_(a, b ^ 1) ^ 1, self.and_(a ^ 1, b) ^ 1) ^ 1
+
+
+def build_aig(circuit: Circuit, compiled: Optional[CompiledCircuit] = None) -> Aig:
+    """Strash the netlist with constant propagation, then drop logic no output reads."""
+    compiled = compiled or compile_circuit(circuit)
+    builder = _AigBuilder(len(compiled.inputs))
+
+    literal = [CONST0] * compiled.num_poles  # undriven poles are constant 0
+    for k, pole in enumerate(compiled.inputs):
+        literal[pole] = 2 * (k + 1)
+    for op, ins, out in zip(compiled.gate_ops, compiled.gate_inputs, compiled.gate_outputs):
+        builder.current = out
+        literal[out] = builder.touch(builder.gate(op, [literal[i] for i in ins]))
+
+    exact = {
+        compiled.poles[p]
+        for p in compiled.inputs + compiled.gate_outputs
+        if not builder.shared[literal[p] >> 1] and builder.owner[literal[p] >> 1] == p
+    }
+    return _sweep(circuit, compiled, builder, literal, exact)
+
+
+def _sweep(
+    circuit: Circuit,
+    compiled: CompiledCircuit,
+    builder: _AigBuilder,
+    literal: List[int],
+    exact: Set[str],
+) -> Aig:
+    num_inputs = len(compiled.inputs)
+    output_lits = [literal[o] for o in compiled.outputs]
+
+    live = [False] * len(builder.fanin0)
+    live[: num_inputs + 1] = [True] * (num_inputs + 1)
+    for lit in output_lits:
+        live[lit >> 1] = True
+    for node in range(len(live) - 1, num_inputs, -1):
+        if live[node]:
+            live[builder.fanin0[node] >> 1] = True
+            live[builder.fanin1[node] >> 1] = True
+
+    remap = [0] * len(live)
+    fanin0: List[int] = []
+    fanin1: List[int] = []
+    for node, alive in enumerate(live):
+        if not alive:
+            continue
+        remap[node] = len(fanin0)
+        a, b = builder.fanin0[node], builder.fanin1[node]
+        fanin0.append(2 * remap[a >> 1] | (a & 1) if node > num_inputs else 0)
+        fanin1.append(2 * remap[b >> 1] | (b & 1) if node > num_inputs else 0)
+
+    def relit(lit: int) -> int:
+        return 2 * remap[lit >> 1] | (lit & 1)
+
+    return Aig(
+        inputs=list(circuit.inputs),
+        fanin0=fanin0,
+        fanin1=fanin1,
+        outputs=list(circuit.outputs),
+        output_lits=[relit(lit) for lit in output_lits],
+        pole_literal={
+            name: relit(literal[p]) for p, name in enumerate(compiled.poles) if live[literal[p] >> 1]
+        },
+        exact=exact,
+    )
+
+
+def simulate_aig(
+    aig: Aig,
+    input_words: Sequence[int],
+    mask: int,
+    fault: Optional[Tuple[int, int]] = None,
+) -> List[int]:
+    """Node words for all patterns at once; `fault` is (node, stuck value)."""
+    values = [0] * aig.num_nodes
+    for k, word in enumerate(input_words):
+        values[k + 1] = word & mask
+    fault_node = fault[0] if fault is not None else -1
+    if fault is not None:
+        values[fault_node] = mask if fault[1] else 0
+
+    fanin0, fanin1 = aig.fanin0, aig.fanin1
+    for node in range(len(aig.inputs) + 1, aig.num_nodes):
+        if node == fault_node:
+            continue
+        a, b = fanin0[node], fanin1[node]
+        va = values[a >> 1] ^ (mask if a & 1 else 0)
+        vb = values[b >> 1] ^ (mask if b & 1 else 0)
+        values[node] = va & vb
+    return values
+
+
+def output_words(aig: Aig, values: Sequence[int], mask: int) -> List[int]:
+    return [values[lit >> 1] ^ (mask if lit & 1 else 0) for lit in aig.output_lits]
+
+
+def fault_map(aig: Aig, circuit: Circuit) -> Dict[Tuple[int, int], Fault]:
+    """AIG node faults mapped back to the original fault each one stands for."""
+    mapped: Dict[Tuple[int, int], Fault] = {}
+    for fault in characteristic_faults(circuit):
+        site = aig.node_fault(fault)
+        if site is not None:
+            mapped[site] = fault
+    return mapped
+
+
+def detected_faults(
+    aig: Aig,
+    circuit: Circuit,
+    tests: Sequence[Dict[str, int]],
+    faults: Optional[Sequence[Fault]] = None,
+) -> List[Fault]:
+    """Faults the tests detect; exact poles are simulated on the AIG, the rest on the netlist."""
+    compiled = compile_circuit(circuit)
+    words, mask = pack_patterns(compiled, tests)
+    good = output_words(aig, simulate_aig(aig, words, mask), mask)
+    reference: Optional[List[int]] = None
+
+    detected = []
+    for fault in faults if faults is not None else characteristic_faults(circuit):
+        site = aig.node_fault(fault)
+        if site is not None:
+            hit = output_words(aig, simulate_aig(aig, words, mask, site), mask) != good
+        elif fault.pole in aig.exact:
+            hit = False  # swept: no output reads it
+        else:
+            if reference is None:
+                reference = simulate_words(compiled, words, mask)
+            values = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+            hit = any(values[o] != reference[o] for o in compiled.outputs)
+        if hit:
+            detected.append(fault)
+    return detected
+
+
+def aig_coverage(aig: Aig, circuit: Circuit, tests: Sequence[Dict[str, int]]) -> Coverage:
+    detected = detected_faults(aig, circuit, tests)
+    return Coverage(detected=len(detected), total=len(characteristic_faults(circuit)))
+
+
+def netlist_mismatches(aig: Aig, circuit: Circuit, tests: Sequence[Dict[str, int]]) -> List[Fault]:
+    """Faults where `detected_faults` disagrees with plain netlist simulation; empty when sound."""
+    compiled = compile_circuit(circuit)
+    words, mask = pack_patterns(compiled, tests)
+    good = simulate_words(compiled, words, mask)
+    on_aig = {(f.pole, f.stuck_at) for f in detected_faults(aig, circuit, tests)}
+    mismatched = []
+    for fault in characteristic_faults(circuit):
+        values = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+        hit = any(values[o] != good[o] for o in compiled.outputs)
+        if hit != ((fault.pole, fault.stuck_at) in on_aig):
+            mismatched.append(fault)
+    return mismatched
@@ -0,0 +1,226 @@
+"""Versioned binary netlist format, loaded through mmap as zero-copy NumPy views.
+
+Layout (little-endian): a fixed header, then sections in this order, each
+starting on an 8-byte boundary:
+
+    inputs        u32[num_inputs]       pole index of each primary input
+    outputs       u32[num_outputs]      pole index of each primary output
+    gate_ops      u8[num_gates]         OP_* codes from helpers.netlist
+    input_offsets u32[num_gates + 1]    gate g reads input_index[off[g]:off[g+1]]
+    input_index   u32[num_edges]
+    gate_outputs  u32[num_gates]
+    levels        u32[num_poles]
+    name_offsets  u32[num_poles + 1]    pole names, UTF-8
+    names         u8[...]
+    id_offsets    u32[num_gates + 1]    gate ids, UTF-8
+    ids           u8[...]
+
+Gates are stored in topological order and poles in `CompiledCircuit` order,
+so a loaded netlist needs no sorting or validation before simulation.
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from dto import Circuit, Gate
+from helpers.netlist import GATE_OPS, CompiledCircuit, compile_circuit
+
+MAGIC = b"CNET"
+VERSION = 1
+_HEADER = struct.Struct("<4sHHIIIIIII")  # magic, version, reserved, 7 counts
+_ALIGN = 8
+_OP_TYPES = {op: gate_type for gate_type, op in GATE_OPS.items()}
+
+
+@dataclass
+class MappedNetlist:
+    """Arrays viewing a mapped file; the mapping lives as long as this object."""
+
+    inputs: np.ndarray
+    outputs: np.ndarray
+    gate_ops: np.ndarray
+    input_offsets: np.ndarray
+    input_index: np.ndarray
+    gate_outputs: np.ndarray
+    levels: np.ndarray
+    name_offsets: np.ndarray
+    names: np.ndarray
+    id_offsets: np.ndarray
+    ids: np.ndarray
+    _mmap: Optional[mmap.mmap] = None
+
+    @property
+    def num_poles(self) -> int:
+        return len(self.levels)
+
+    @property
+    def num_gates(self) -> int:
+        return len(self.gate_ops)
+
+    def pole_name(self, pole: int) -> str:
+        return _decode(self.names, self.name_offsets, pole)
+
+    def gate_inputs(self, gate: int) -> np.ndarray:
+        return self.input_index[self.input_offsets[gate] : self.input_offsets[gate + 1]]
+
+    def to_compiled(self) -> CompiledCircuit:
+        poles = _decode_all(self.names, self.name_offsets)
+        offsets = self.input_offsets.tolist()
+        flat = self.input_index.tolist()
+        gate_inputs = [tuple(flat[offsets[g] : offsets[g + 1]]) for g in range(self.num_gates)]
+        fanout: List[List[int]] = [[] for _ in poles]
+        for g, ins in enumerate(gate_inputs):
+            for i in ins:
+                fanout[i].append(g)
+        return CompiledCircuit(
+            poles=poles,
+            index={name: i for i, name in enumerate(poles)},
+            inputs=self.inputs.tolist(),
+            outputs=self.outputs.tolist(),
+            gate_ops=self.gate_ops.tolist(),
+            gate_inputs=gate_inputs,
+            gate_outputs=self.gate_outputs.tolist(),
+            levels=self.levels.tolist(),
+            fanout=fanout,
+        )
+
+    def to_circuit(self) -> Circuit:
+        poles = _decode_all(self.names, self.name_offsets)
+        ids = _decode_all(self.ids, self.id_offsets)
+        offsets = self.input_offsets.tolist()
+        flat = self.input_index.tolist()
+        gates = [
+            Gate(
+                id=ids[g],
+                gate_type=_OP_TYPES[op],
+                inputs=[poles[i] for i in flat[offsets[g] : offsets[g + 1]]],
+                output=poles[out],
+            )
+            for g, (op, out) in enumerate(zip(self.gate_ops.tolist(), self.gate_outputs.tolist()))
+        ]
+        return Circuit(
+            inputs=[poles[i] for i in self.inputs.tolist()],
+            outputs=[poles[i] for i in self.outputs.tolist()],
+            gates=gates,
+        )
+
+
+def save_netlist(circuit: Circuit, path: str, compiled: Optional[CompiledCircuit] = None) -> None:
+    """Write the circuit in binary form (gates in topological order)."""
+    compiled = compiled or compile_circuit(circuit)
+    driver_ids = {gate.output: gate.id for gate in circuit.gates}
+
+    offsets = [0]
+    for ins in compiled.gate_inputs:
+        offsets.append(offsets[-1] + len(ins))
+    name_offsets, names = _encode(compiled.poles)
+    id_offsets, ids = _encode([driver_ids[compiled.poles[out]] for out in compiled.gate_outputs])
+
+    sections: List[Tuple[str, Union[Sequence[int], bytes]]] = [
+        ("<u4", compiled.inputs),
+        ("<u4", compiled.outputs),
+        ("u1", compiled.gate_ops),
+        ("<u4", offsets),
+        ("<u4", [i for ins in compiled.gate_inputs for i in ins]),
+        ("<u4", compiled.gate_outputs),
+        ("<u4", compiled.levels),
+        ("<u4", name_offsets),
+        ("u1", names),
+        ("<u4", id_offsets),
+        ("u1", ids),
+    ]
+    header = _HEADER.pack(
+        MAGIC,
+        VERSION,
+        0,
+        compiled.num_poles,
+        len(compiled.inputs),
+        len(compiled.outputs),
+        compiled.num_gates,
+        offsets[-1],
+        len(names),
+        len(ids),
+    )
+
+    with open(path, "wb") as fh:
+        fh.write(header)
+        pos = len(header)
+        for dtype, values in sections:
+            pad = -pos % _ALIGN
+            fh.write(b"\0" * pad)
+            data = values if isinstance(values, bytes) else np.asarray(values, dtype=dtype).tobytes()
+            fh.write(data)
+            pos += pad + len(data)
+
+
+def load_netlist(path: str) -> MappedNetlist:
+    """Map the file read-only; no section is copied or parsed."""
+    with open(path, "rb") as fh:
+        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(mm) < _HEADER.size:
+        mm.close()
+        raise ValueError(f"{path}: too short for a netlist header")
+    magic, version, _, poles, inputs, outputs, gates, edges, names, ids = _HEADER.unpack_from(mm)
+    if magic != MAGIC:
+        mm.close()
+        raise ValueError(f"{path}: not a binary netlist")
+    if version != VERSION:
+        mm.close()
+        raise ValueError(f"{path}: unsupported netlist version {version}")
+
+    layout = [
+        ("<u4", inputs),
+        ("<u4", outputs),
+        ("u1", gates),
+        ("<u4", gates + 1),
+        ("<u4", edges),
+        ("<u4", gates),
+        ("<u4", poles),
+        ("<u4", poles + 1),
+        ("u1", names),
+        ("<u4", gates + 1),
+        ("u1", ids),
+    ]
+    offsets = []
+    pos = _HEADER.size
+    for dtype, count in layout:
+        pos += -pos % _ALIGN
+        offsets.append(pos)
+        pos += count * np.dtype(dtype).itemsize
+    size = len(mm)
+    if pos > size:
+        mm.close()
+        raise ValueError(f"{path}: truncated, the header needs {pos} bytes but the file has {size}")
+
+    arrays = [
+        np.frombuffer(mm, dtype=dtype, count=count, offset=offset)
+        for (dtype, count), offset in zip(layout, offsets)
+    ]
+    return MappedNetlist(*arrays, _mmap=mm)
+
+
+def _encode(strings: Sequence[str]) -> Tuple[List[int], bytes]:
+    offsets = [0]
+    chunks = []
+    for s in strings:
+        data = s.encode("utf-8")
+        chunks.append(data)
+        offsets.append(offsets[-1] + len(data))
+    return offsets, b"".join(chunks)
+
+
+def _decode(blob: np.ndarray, offsets: np.ndarray, i: int) -> str:
+    return blob[offsets[i] : offsets[i + 1]].tobytes().decode("utf-8")
+
+
+def _decode_all(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i] : bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
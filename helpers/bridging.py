@@ -0,0 +1,159 @@
+"""Bridging (short) faults between pairs of poles, simulated pattern-parallel."""
+
+from __future__ import annotations
+
+import heapq
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
+
+from configs.cfg import BRIDGE_CHUNK
+from dto import Circuit
+from helpers.netlist import CompiledCircuit, compile_circuit, eval_word, pack_patterns, simulate_words
+
+BridgeKind = Literal["wired_and", "wired_or", "dominant"]
+BRIDGE_KINDS: Tuple[BridgeKind, ...] = ("wired_and", "wired_or", "dominant")
+
+
+@dataclass(frozen=True)
+class Bridge:
+    """Short between poles `a` and `b` (compiled indexes).
+
+    Wired bridges drive both nets with the AND/OR of their values; a dominant
+    bridge lets `a` (the aggressor) override `b`.
+    """
+
+    a: int
+    b: int
+    kind: BridgeKind
+
+    def label(self, compiled: CompiledCircuit) -> str:
+        arrow = "->" if self.kind == "dominant" else "~"
+        return f"{compiled.poles[self.a]}{arrow}{compiled.poles[self.b]} ({self.kind})"
+
+
+@dataclass
+class BridgeCoverage:
+    detected: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in BRIDGE_KINDS})
+    total: Dict[str, int] = field(default_factory=lambda: {k: 0 for k in BRIDGE_KINDS})
+    undetected_sample: List[str] = field(default_factory=list)
+
+    def percent(self, kind: str) -> float:
+        return (self.detected[kind] / self.total[kind]) * 100 if self.total[kind] else 0.0
+
+    def log(self, logger: logging.Logger) -> None:
+        for kind in BRIDGE_KINDS:
+            if self.total[kind]:
+                logger.info(
+                    "Bridging coverage (%s): %d/%d (%.1f%%)",
+                    kind,
+                    self.detected[kind],
+                    self.total[kind],
+                    self.percent(kind),
+                )
+        if self.undetected_sample:
+            logger.info("Undetected bridges (sample): %s", ", ".join(self.undetected_sample))
+
+
+def fanout_cones(compiled: CompiledCircuit) -> List[int]:
+    """Bitmask of every pole reachable from each pole, the pole itself included."""
+    cone = [1 << p for p in range(compiled.num_poles)]
+    for ins, out in zip(reversed(compiled.gate_inputs), reversed(compiled.gate_outputs)):
+        for i in ins:
+            cone[i] |= cone[out]
+    return cone
+
+
+def candidate_bridges(
+    compiled: CompiledCircuit,
+    kinds: Sequence[BridgeKind] = BRIDGE_KINDS,
+    chunk: int = BRIDGE_CHUNK,
+) -> Iterator[List[Bridge]]:
+    """Non-feedback bridges in chunks of at most `chunk`, generated lazily.
+
+    Pairs where one pole feeds the other would close a loop and are skipped.
+    Dominant bridges are listed in both directions.
+    """
+    cone = fanout_cones(compiled)
+    poles = compiled.inputs + compiled.gate_outputs
+    batch: List[Bridge] = []
+    for i, a in enumerate(poles):
+        for b in poles[i + 1 :]:
+            if (cone[a] >> b) & 1 or (cone[b] >> a) & 1:
+                continue
+            for kind in kinds:
+                batch.append(Bridge(a, b, kind))
+                if kind == "dominant":
+                    batch.append(Bridge(b, a, kind))
+            if len(batch) >= chunk:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+class BridgeSimulator:
+    """Simulates bridges against a fixed pattern set, re-evaluating only their fanout."""
+
+    def __init__(self, compiled: CompiledCircuit, tests: Sequence[Dict[str, int]]):
+        self.compiled = compiled
+        self.words, self.mask = pack_patterns(compiled, tests)
+        self.good = simulate_words(compiled, self.words, self.mask)
+
+    def bridged_values(self, bridge: Bridge) -> Tuple[int, int]:
+        va, vb = self.good[bridge.a], self.good[bridge.b]
+        if bridge.kind == "wired_and":
+            return va & vb, va & vb
+        if bridge.kind == "wired_or":
+            return va | vb, va | vb
+        return va, va
+
+    def detects(self, bridge: Bridge) -> bool:
+        new_a, new_b = self.bridged_values(bridge)
+        good = self.good
+        if new_a == good[bridge.a] and new_b == good[bridge.b]:
+            return False  # the short never changes a value
+
+        compiled = self.compiled
+        forced = (bridge.a, bridge.b)
+        values = {p: v for p, v in zip(forced, (new_a, new_b)) if v != good[p]}
+        # event-driven: gate indexes are topological, so a heap visits them in order
+        pending = sorted({g for p in values for g in compiled.fanout[p]})
+        queued = set(pending)
+        while pending:
+            g = heapq.heappop(pending)
+            out = compiled.gate_outputs[g]
+            if out in forced:
+                continue
+            ins = compiled.gate_inputs[g]
+            word = eval_word(compiled.gate_ops[g], [values.get(i, good[i]) for i in ins], self.mask)
+            if word == values.get(out, good[out]):
+                continue
+            values[out] = word
+            for reader in compiled.fanout[out]:
+                if reader not in queued:
+                    queued.add(reader)
+                    heapq.heappush(pending, reader)
+        return any(values.get(o, good[o]) != good[o] for o in compiled.outputs)
+
+
+def bridge_coverage(
+    circuit: Circuit,
+    tests: Sequence[Dict[str, int]],
+    kinds: Sequence[BridgeKind] = BRIDGE_KINDS,
+    chunk: int = BRIDGE_CHUNK,
+    bridges: Optional[Iterable[List[Bridge]]] = None,
+    sample: int = 5,
+) -> BridgeCoverage:
+    """Grade every non-feedback bridge (or the given chunks) against the tests."""
+    compiled = compile_circuit(circuit)
+    simulator = BridgeSimulator(compiled, tests)
+    coverage = BridgeCoverage()
+    for batch in bridges if bridges is not None else candidate_bridges(compiled, kinds, chunk):
+        for bridge in batch:
+            coverage.total[bridge.kind] += 1
+            if simulator.detects(bridge):
+                coverage.detected[bridge.kind] += 1
+            elif len(coverage.undetected_sample) < sample:
+                coverage.undetected_sample.append(bridge.label(compiled))
+    return coverage
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import random
+from typing import List, Tuple
+
 from dto import Circuit, Gate, GateType
 
 
@@ -17,3 +20,231 @@ def create_circuit_variant_3() -> Circuit:
 
     return Circuit(inputs=inputs, outputs=outputs, gates=gates)
 
+
+
+class _CircuitBuilder:
+    """Accumulates gates with sequential ids for the generators below."""
+
+    def __init__(self, inputs: List[str]):
+        self.inputs = list(inputs)
+        self.gates: List[Gate] = []
+        self._counter = 0
+
+    def add(self, gate_type: GateType, inputs: List[str], output: str | None = None) -> str:
+        self._counter += 1
+        name = output or f"N{self._counter}"
+        self.gates.append(
+            Gate(id=f"G{self._counter}", gate_type=gate_type, inputs=list(inputs), output=name)
+        )
+        return name
+
+    def half_adder(self, a: str, b: str, s: str | None = None, c: str | None = None) -> Tuple[str, str]:
+        return self.add(GateType.XOR, [a, b], s), self.add(GateType.AND, [a, b], c)
+
+    def full_adder(
+        self, a: str, b: str, cin: str, s: str | None = None, cout: str | None = None
+    ) -> Tuple[str, str]:
+        p = self.add(GateType.XOR, [a, b])
+        g = self.add(GateType.AND, [a, b])
+        total = self.add(GateType.XOR, [p, cin], s)
+        t = self.add(GateType.AND, [p, cin])
+        return total, self.add(GateType.OR, [g, t], cout)
+
+    def build(self, outputs: List[str]) -> Circuit:
+        return Circuit(inputs=self.inputs, outputs=outputs, gates=self.gates)
+
+
+def create_ripple_carry_adder(bits: int) -> Circuit:
+    """n-bit ripple-carry adder: a + b + cin -> s, cout."""
+    if bits < 1:
+        raise ValueError("bits must be >= 1")
+
+    a = [f"a{i}" for i in range(bits)]
+    b = [f"b{i}" for i in range(bits)]
+    builder = _CircuitBuilder(a + b + ["cin"])
+
+    carry = "cin"
+    for i in range(bits):
+        cout = "cout" if i == bits - 1 else f"c{i + 1}"
+        builder.full_adder(a[i], b[i], carry, s=f"s{i}", cout=cout)
+        carry = cout
+
+    return builder.build([f"s{i}" for i in range(bits)] + ["cout"])
+
+
+def create_carry_lookahead_adder(bits: int, block: int = 4) -> Circuit:
+    """n-bit block carry-lookahead adder (lookahead inside blocks, ripple between them)."""
+    if bits < 1 or block < 1:
+        raise ValueError("bits and block must be >= 1")
+
+    a = [f"a{i}" for i in range(bits)]
+    b = [f"b{i}" for i in range(bits)]
+    builder = _CircuitBuilder(a + b + ["cin"])
+
+    p = [builder.add(GateType.XOR, [a[i], b[i]], f"p{i}") for i in range(bits)]
+    g = [builder.add(GateType.AND, [a[i], b[i]], f"g{i}") for i in range(bits)]
+
+    carries = ["cin"]
+    for start in range(0, bits, block):
+        block_carry = carries[start]
+        for i in range(start, min(start + block, bits)):
+            # c[i+1] = g[i] | p[i]g[i-1] | ... | p[i]..p[start]c[start]
+            terms = [g[i]]
+            for j in range(i - 1, start - 1, -1):
+                terms.append(builder.add(GateType.AND, p[j + 1:i + 1] + [g[j]]))
+            terms.append(builder.add(GateType.AND, p[start:i + 1] + [block_carry]))
+            name = "cout" if i == bits - 1 else f"c{i + 1}"
+            carries.append(builder.add(GateType.OR, terms, name))
+
+    for i in range(bits):
+        builder.add(GateType.XOR, [p[i], carries[i]], f"s{i}")
+
+    return builder.build([f"s{i}" for i in range(bits)] + ["cout"])
+
+
+def create_array_multiplier(bits: int) -> Circuit:
+    """n x n unsigned array multiplier built from AND partial products and adder rows."""
+    if bits < 1:
+        raise ValueError("bits must be >= 1")
+
+    a = [f"a{i}" for i in range(bits)]
+    b = [f"b{i}" for i in range(bits)]
+    builder = _CircuitBuilder(a + b)
+
+    pp = [[builder.add(GateType.AND, [a[j], b[i]]) for j in range(bits)] for i in range(bits)]
+
+    # row[k] holds the running sum bit of weight (i + k) for the current row i
+    products: List[str] = [pp[0][0]]
+    row = pp[0][1:]
+    for i in range(1, bits):
+        carry: str | None = None
+        next_row: List[str] = []
+        for j in range(bits):
+            addend = row[j] if j < len(row) else None
+            bit = pp[i][j]
+            if addend is None and carry is None:
+                total = bit
+            elif addend is None or carry is None:
+                total, carry = builder.half_adder(bit, addend or carry)
+            else:
+                total, carry = builder.full_adder(bit, addend, carry)
+            if j == 0:
+                products.append(total)
+            else:
+                next_row.append(total)
+        if carry is not None:
+            next_row.append(carry)
+        row = next_row
+    products.extend(row)
+
+    names = {pole: f"p{k}" for k, pole in enumerate(products)}
+    for gate in builder.gates:
+        gate.output = names.get(gate.output, gate.output)
+    return builder.build([f"p{k}" for k in range(len(products))])
+
+
+def create_parity_tree(width: int) -> Circuit:
+    """Balanced XOR tree computing the parity of `width` inputs."""
+    if width < 2:
+        raise ValueError("width must be >= 2")
+
+    inputs = [f"x{i + 1}" for i in range(width)]
+    builder = _CircuitBuilder(inputs)
+
+    level = list(inputs)
+    while len(level) > 1:
+        nxt = [builder.add(GateType.XOR, level[k:k + 2]) for k in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+
+    builder.gates[-1].output = "parity"
+    return builder.build(["parity"])
+
+
+def create_counter(bits: int) -> Circuit:
+    """Synchronous up-counter with enable: `bits` flip-flops q0.. and carry out `co`."""
+    if bits < 1:
+        raise ValueError("bits must be >= 1")
+
+    builder = _CircuitBuilder(["en"])
+    carry = "en"
+    for i in range(bits):
+        q = f"q{i}"
+        d = builder.add(GateType.XOR, [q, carry])
+        builder.add(GateType.DFF, [d], q)
+        carry = builder.add(GateType.AND, [carry, q])
+    builder.gates[-1].output = "co"
+    return builder.build([f"q{i}" for i in range(bits)] + ["co"])
+
+
+def create_random_dag(
+    num_inputs: int,
+    num_gates: int,
+    *,
+    reconvergence: float = 0.3,
+    max_fanin: int = 3,
+    seed: int | None = 0,
+) -> Circuit:
+    """Random combinational DAG.
+
+    Fanins are drawn from every signal built so far; `reconvergence` is the
+    probability that a fanin is drawn only from signals that already have
+    fanout, which creates reconvergent paths. Primary inputs are forced in
+    while there are barely enough gates left to consume them all. Every
+    unconsumed gate output is a primary output.
+    """
+    if num_inputs < 1 or num_gates < 1:
+        raise ValueError("num_inputs and num_gates must be >= 1")
+    if not 0.0 <= reconvergence <= 1.0:
+        raise ValueError("reconvergence must be in [0, 1]")
+
+    rng = random.Random(seed)
+    inputs = [f"x{i + 1}" for i in range(num_inputs)]
+    builder = _CircuitBuilder(inputs)
+    signals = list(inputs)
+    pending = list(inputs)  # primary inputs nothing reads yet
+    fanout: set = set()
+    shared: List[str] = []  # signals with fanout, in the order they got it
+    multi_input = [GateType.AND, GateType.OR, GateType.NAND, GateType.NOR]
+
+    for g in range(num_gates):
+        gate_type = rng.choice(multi_input + [GateType.NOT, GateType.XOR])
+        if gate_type == GateType.NOT:
+            arity = 1
+        elif gate_type == GateType.XOR:
+            arity = 2
+        else:
+            arity = rng.randint(2, max(2, max_fanin))
+        arity = min(arity, len(signals))
+        if arity == 1:
+            gate_type = GateType.NOT
+
+        chosen: List[str] = []
+        for _ in range(arity):
+            waiting = len(pending) - sum(pole in pending for pole in chosen)
+            if waiting and waiting > num_gates - g - 1:
+                pole = _draw(rng, pending, chosen)
+            elif len(shared) > len(chosen) and rng.random() < reconvergence:
+                pole = _draw(rng, shared, chosen)
+            else:
+                pole = _draw(rng, signals, chosen)
+            chosen.append(pole)
+            if pole not in fanout:
+                fanout.add(pole)
+                shared.append(pole)
+            if pole in pending:
+                pending.remove(pole)
+
+        signals.append(builder.add(gate_type, chosen))
+
+    outputs = [pole for pole in signals if pole not in fanout and pole not in builder.inputs]
+    return builder.build(outputs)
+
+
+def _draw(rng: random.Random, pool: List[str], chosen: List[str]) -> str:
+    """A random signal of `pool` not in `chosen`; the pool must hold one (it has more entries)."""
+    while True:
+        pole = rng.choice(pool)
+        if pole not in chosen:
+            return pole
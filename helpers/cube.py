@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from dto import Gate, GateType
 
 
@@ -324,3 +324,32 @@ def build_primitive_d_cubes_for_input(input_pole: str, fault_stuck_at: int, all_
     
     return [cube]
 
+
+
+class CubeTables:
+    """Singular, propagation and primitive D-cubes per gate, built once per pole list.
+
+    The cached cubes are shared between callers and must not be modified.
+    """
+    
+    def __init__(self, all_poles: List[str]):
+        self.all_poles = all_poles
+        self._singular: Dict[str, List[Cube]] = {}
+        self._d_cubes: Dict[str, List[Cube]] = {}
+        self._primitive: Dict[Tuple[str, int], List[Cube]] = {}
+    
+    def singular(self, gate: Gate) -> List[Cube]:
+        if gate.id not in self._singular:
+            self._singular[gate.id] = build_singular_cubes(gate, self.all_poles)
+        return self._singular[gate.id]
+    
+    def d_cubes(self, gate: Gate) -> List[Cube]:
+        if gate.id not in self._d_cubes:
+            self._d_cubes[gate.id] = build_d_cubes(gate, self.all_poles)
+        return self._d_cubes[gate.id]
+    
+    def primitive(self, gate: Gate, stuck_at: int) -> List[Cube]:
+        key = (gate.id, stuck_at)
+        if key not in self._primitive:
+            self._primitive[key] = build_primitive_d_cubes(gate, stuck_at, self.all_poles)
+        return self._primitive[key]
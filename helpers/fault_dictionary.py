@@ -0,0 +1,133 @@
+"""Fault dictionaries for diagnosis: precomputed failing signatures per fault."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Sequence
+
+from dto import Circuit
+from helpers.fault_sim import characteristic_faults
+from helpers.netlist import compile_circuit, pack_patterns, simulate_words
+
+DictionaryKind = Literal["full", "pass_fail"]
+
+
+@dataclass(frozen=True)
+class DictionarySize:
+    faults: int
+    classes: int
+    largest_class: int
+    signature_bits: int
+    signature_bytes: int
+    index_bytes: int
+    matrix_bytes: int
+
+    def log(self, logger: logging.Logger) -> None:
+        logger.info(
+            "Fault dictionary: %d faults in %d classes (largest %d)",
+            self.faults,
+            self.classes,
+            self.largest_class,
+        )
+        logger.info(
+            "  %d-bit signatures: %d B signatures + %d B index (full response matrix: %d B)",
+            self.signature_bits,
+            self.signature_bytes,
+            self.index_bytes,
+            self.matrix_bytes,
+        )
+
+
+@dataclass
+class FaultDictionary:
+    """Signature -> equivalence class of faults.
+
+    A signature packs the per-test failures into one int: for a pass/fail
+    dictionary bit j is set when test j fails; for a full-response dictionary
+    bit (o * tests + j) is set when output o mismatches on test j. Faults with
+    equal signatures are indistinguishable by the test set and share an entry;
+    signature 0 holds the faults the tests miss.
+    """
+
+    kind: DictionaryKind
+    inputs: List[str]
+    outputs: List[str]
+    tests: List[Dict[str, int]]
+    good: List[int]  # packed good response per output
+    index: Dict[int, List[str]]
+
+    def signature(self, responses: Sequence[Dict[str, int]]) -> int:
+        """Signature of observed responses (one output-value dict per test)."""
+        if len(responses) != len(self.tests):
+            raise ValueError(f"Expected {len(self.tests)} responses, got {len(responses)}")
+
+        diffs = []
+        for o, out in enumerate(self.outputs):
+            word = 0
+            for j, response in enumerate(responses):
+                if response.get(out, 0):
+                    word |= 1 << j
+            diffs.append(word ^ self.good[o])
+        return _combine(self.kind, diffs, len(self.tests))
+
+    def diagnose(self, responses: Sequence[Dict[str, int]]) -> List[str]:
+        """Candidate faults explaining the observed responses."""
+        return list(self.index.get(self.signature(responses), []))
+
+    def size_report(self) -> DictionarySize:
+        bits = len(self.tests) * (len(self.outputs) if self.kind == "full" else 1)
+        faults = sum(len(ids) for ids in self.index.values())
+        return DictionarySize(
+            faults=faults,
+            classes=len(self.index),
+            largest_class=max((len(ids) for ids in self.index.values()), default=0),
+            signature_bits=bits,
+            signature_bytes=len(self.index) * ((bits + 7) // 8),
+            # one 32-bit fault number per entry plus one offset per class
+            index_bytes=4 * (faults + len(self.index)),
+            matrix_bytes=(faults * len(self.tests) * len(self.outputs) + 7) // 8,
+        )
+
+
+def build_fault_dictionary(
+    circuit: Circuit,
+    tests: Sequence[Dict[str, int]],
+    kind: DictionaryKind = "full",
+) -> FaultDictionary:
+    """Simulate every characteristic fault over the test set, all tests per pass."""
+    if kind not in ("full", "pass_fail"):
+        raise ValueError(f"Unknown dictionary kind '{kind}'")
+
+    compiled = compile_circuit(circuit)
+    tests = list(tests)
+    words, mask = pack_patterns(compiled, tests)
+    good_values = simulate_words(compiled, words, mask)
+    good = [good_values[o] for o in compiled.outputs]
+
+    index: Dict[int, List[str]] = {}
+    for fault in characteristic_faults(circuit):
+        values = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+        diffs = [values[o] ^ g for o, g in zip(compiled.outputs, good)]
+        sig = _combine(kind, diffs, len(tests))
+        index.setdefault(sig, []).append(f"{fault.pole}/{fault.stuck_at}")
+
+    return FaultDictionary(
+        kind=kind,
+        inputs=list(circuit.inputs),
+        outputs=list(circuit.outputs),
+        tests=tests,
+        good=good,
+        index=index,
+    )
+
+
+def _combine(kind: DictionaryKind, diffs: Sequence[int], width: int) -> int:
+    sig = 0
+    if kind == "pass_fail":
+        for word in diffs:
+            sig |= word
+    else:
+        for o, word in enumerate(diffs):
+            sig |= word << (o * width)
+    return sig
@@ -0,0 +1,234 @@
+"""Fault simulation sharded over workers through a directory work queue.
+
+A job directory holds:
+
+    job.json          circuit and tests
+    todo/NNNNN.json   fault shards waiting for a worker
+    claimed/          shards a worker is simulating
+    done/NNNNN.json   detection bitmaps per fault
+
+A worker claims a shard by renaming it from todo/ to claimed/; rename is
+atomic, so exactly one worker wins each shard. The shard is stamped with
+the claim time before the rename, so it never sits in claimed/ with an old
+time that `requeue_stale` could mistake for a dead worker. Results are written to a
+temporary file and renamed into done/. Any process that sees the directory
+(over a shared file system for several nodes) can be a worker:
+
+    python -m helpers.fault_shard worker <job dir>
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from configs.cfg import SHARD_SIZE, SHARD_STALE_SECONDS
+from dto import Circuit, Fault
+from helpers.fault_sim import Coverage, characteristic_faults, observing_outputs
+from helpers.netlist import compile_circuit, pack_patterns, simulate_words
+
+logger = logging.getLogger(__name__)
+
+JOB_FILE = "job.json"
+
+
+def publish(
+    directory: str,
+    circuit: Circuit,
+    tests: Sequence[Dict[str, int]],
+    faults: Optional[Sequence[Fault]] = None,
+    shard_size: int = SHARD_SIZE,
+) -> int:
+    """Write a job and its fault shards; returns the number of shards.
+
+    Shards of an earlier job in the same directory are removed first, so
+    its results are not merged into this one. No worker of the earlier job
+    may still be running.
+    """
+    if shard_size < 1:
+        raise ValueError("shard_size must be >= 1")
+    faults = list(faults if faults is not None else characteristic_faults(circuit))
+    for sub in ("todo", "claimed", "done"):
+        path = os.path.join(directory, sub)
+        os.makedirs(path, exist_ok=True)
+        for name in os.listdir(path):
+            os.remove(os.path.join(path, name))
+
+    _write_json(
+        os.path.join(directory, JOB_FILE),
+        {"circuit": circuit.model_dump(mode="json"), "tests": list(tests)},
+    )
+    shards = [faults[k : k + shard_size] for k in range(0, len(faults), shard_size)]
+    for n, shard in enumerate(shards):
+        _write_json(
+            os.path.join(directory, "todo", _shard_name(n)),
+            [[f.pole, f.stuck_at] for f in shard],
+        )
+    return len(shards)
+
+
+def claim(directory: str) -> Optional[str]:
+    """Move one shard from todo/ to claimed/; None when nothing is left."""
+    for name in _shards(directory, "todo"):
+        source = os.path.join(directory, "todo", name)
+        try:
+            os.utime(source)  # claim time, for requeue_stale(); rename keeps it
+            os.rename(source, os.path.join(directory, "claimed", name))
+        except FileNotFoundError:
+            continue  # another worker was faster
+        return name
+    return None
+
+
+def simulate_shard(circuit: Circuit, tests: Sequence[Dict[str, int]], faults: Sequence[Fault]) -> Dict[str, List]:
+    """Fault id -> [detection bitmap as hex (bit j = test j), observing outputs]."""
+    compiled = compile_circuit(circuit)
+    words, mask = pack_patterns(compiled, tests)
+    good = simulate_words(compiled, words, mask)
+    results: Dict[str, List] = {}
+    for fault in faults:
+        bad = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+        diffs = [bad[o] ^ good[o] for o in compiled.outputs]
+        detected = 0
+        for diff in diffs:
+            detected |= diff
+        outputs = 0
+        if detected:
+            first = (detected & -detected).bit_length() - 1
+            outputs = sum(1 << k for k, diff in enumerate(diffs) if (diff >> first) & 1)
+        results[f"{fault.pole}/{fault.stuck_at}"] = [f"{detected:x}", outputs]
+    return results
+
+
+def run_worker(directory: str) -> int:
+    """Simulate shards until todo/ is empty; returns how many this worker did."""
+    with open(os.path.join(directory, JOB_FILE), encoding="utf-8") as fh:
+        job = json.load(fh)
+    circuit = Circuit.model_validate(job["circuit"])
+    tests = job["tests"]
+    done = 0
+    while (name := claim(directory)) is not None:
+        claimed = os.path.join(directory, "claimed", name)
+        with open(claimed, encoding="utf-8") as fh:
+            faults = [Fault(pole=pole, stuck_at=sa) for pole, sa in json.load(fh)]
+        _write_json(os.path.join(directory, "done", name), simulate_shard(circuit, tests, faults))
+        try:
+            os.remove(claimed)
+        except FileNotFoundError:
+            pass  # requeued as stale meanwhile; the duplicate result is identical
+        done += 1
+    return done
+
+
+def requeue_stale(directory: str, timeout: float = SHARD_STALE_SECONDS) -> int:
+    """Return shards claimed more than `timeout` seconds ago to todo/ (dead workers)."""
+    requeued = 0
+    now = time.time()
+    for name in _shards(directory, "claimed"):
+        path = os.path.join(directory, "claimed", name)
+        try:
+            stale = now - os.path.getmtime(path) > timeout
+            if stale and not os.path.exists(os.path.join(directory, "done", name)):
+                os.rename(path, os.path.join(directory, "todo", name))
+                requeued += 1
+        except FileNotFoundError:
+            continue  # finished while we looked
+    return requeued
+
+
+def merge(directory: str, circuit: Circuit) -> Tuple[Coverage, Dict[str, int]]:
+    """Combine all done/ shards into a Coverage and the per-fault bitmaps."""
+    bitmaps: Dict[str, int] = {}
+    observed: Dict[str, Tuple[str, ...]] = {}
+    total = 0
+    for name in _shards(directory, "done"):
+        with open(os.path.join(directory, "done", name), encoding="utf-8") as fh:
+            shard = json.load(fh)
+        total += len(shard)
+        for fault_id, (word, outputs) in shard.items():
+            bitmaps[fault_id] = int(word, 16)
+            if outputs:
+                observed[fault_id] = observing_outputs(circuit, outputs)
+    return Coverage(detected=len(observed), total=total, observed=observed), bitmaps
+
+
+def sharded_coverage(
+    circuit: Circuit,
+    tests: Sequence[Dict[str, int]],
+    *,
+    workers: int = 2,
+    shard_size: int = SHARD_SIZE,
+    directory: Optional[str] = None,
+    poll: float = 0.05,
+) -> Tuple[Coverage, Dict[str, int]]:
+    """Coordinator: publish a job, run local worker processes, merge the results.
+
+    Workers on other nodes may join by running the worker CLI on the same
+    `directory`; with `workers=0` the coordinator only waits for them.
+    """
+    if directory is None:
+        with tempfile.TemporaryDirectory(prefix="fault-shard-") as scratch:
+            return sharded_coverage(
+                circuit, tests, workers=workers, shard_size=shard_size, directory=scratch, poll=poll
+            )
+
+    shards = publish(directory, circuit, tests, shard_size=shard_size)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    procs = [
+        subprocess.Popen([sys.executable, "-m", "helpers.fault_shard", "worker", directory], env=env)
+        for _ in range(workers)
+    ]
+    try:
+        while len(_shards(directory, "done")) < shards:
+            if procs and all(proc.poll() is not None for proc in procs):
+                # the local workers are gone with shards unfinished: take over
+                requeue_stale(directory, timeout=0)
+                run_worker(directory)
+                continue
+            requeue_stale(directory)
+            time.sleep(poll)
+    finally:
+        for proc in procs:
+            proc.wait()
+    return merge(directory, circuit)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Sharded fault simulation worker.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="Simulate shards from a job directory until none are left.")
+    worker.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    done = run_worker(args.directory)
+    logger.info("%s[%d]: %d shards", socket.gethostname(), os.getpid(), done)
+
+
+def _shard_name(n: int) -> str:
+    return f"{n:05d}.json"
+
+
+def _shards(directory: str, state: str) -> List[str]:
+    """Shard files in todo/, claimed/ or done/, skipping half-written temporaries."""
+    return sorted(name for name in os.listdir(os.path.join(directory, state)) if name.endswith(".json"))
+
+
+def _write_json(path: str, payload: object) -> None:
+    tmp = f"{path}.{socket.gethostname()}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(payload, fh)
+    os.replace(tmp, path)
+
+
+if __name__ == "__main__":
+    main()
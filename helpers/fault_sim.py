@@ -1,15 +1,20 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, List, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
+from configs.cfg import MISR_POLY
 from dto import Circuit, Fault
+from helpers.lfsr import MISR
+from helpers.netlist import compile_circuit, pack_patterns, simulate_words
 
 
 @dataclass(frozen=True)
 class Coverage:
     detected: int
     total: int
+    # fault id ("pole/stuck_at") -> primary outputs that observed it
+    observed: Dict[str, Tuple[str, ...]] = field(default_factory=dict, compare=False)
 
     @property
     def percent(self) -> float:
@@ -21,11 +26,27 @@ def characteristic_faults(circuit: Circuit) -> List[Fault]:
     return [Fault(pole=p, stuck_at=sa) for p in poles for sa in (0, 1)]
 
 
+def output_word(circuit: Circuit, values: Dict[str, int]) -> int:
+    """Pack primary output values into one int, bit i = circuit.outputs[i]."""
+    word = 0
+    for i, out in enumerate(circuit.outputs):
+        if values.get(out):
+            word |= 1 << i
+    return word
+
+
+def observing_outputs(circuit: Circuit, mask: int) -> Tuple[str, ...]:
+    return tuple(out for i, out in enumerate(circuit.outputs) if (mask >> i) & 1)
+
+
+def detection_mask(circuit: Circuit, test: Dict[str, int], fault: Fault) -> int:
+    """Outputs (as bits of `output_word`) that differ between good and faulty machine."""
+    normal = output_word(circuit, circuit.evaluate(test))
+    return normal ^ output_word(circuit, simulate_stuck_at(circuit, test, fault))
+
+
 def detects_fault(circuit: Circuit, test: Dict[str, int], fault: Fault) -> bool:
-    normal = circuit.evaluate(test)
-    faulty = simulate_stuck_at(circuit, test, fault)
-    out = circuit.outputs[0]
-    return normal.get(out) != faulty.get(out)
+    return detection_mask(circuit, test, fault) != 0
 
 
 def simulate_stuck_at(circuit: Circuit, test: Dict[str, int], fault: Fault) -> Dict[str, int]:
@@ -60,14 +81,73 @@ def simulate_stuck_at(circuit: Circuit, test: Dict[str, int], fault: Fault) -> D
 
 
 def coverage_for_tests(circuit: Circuit, tests: Iterable[Dict[str, int]]) -> Coverage:
+    tests = list(tests)
+    if circuit.get_flip_flops():
+        from helpers.sequential import sequential_coverage, split_stream
+
+        return sequential_coverage(circuit, split_stream(tests))
+
     faults = characteristic_faults(circuit)
-    detected = 0
+    good = [output_word(circuit, circuit.evaluate(t)) for t in tests]
+    observed: Dict[str, Tuple[str, ...]] = {}
 
     for fault in faults:
-        if any(detects_fault(circuit, t, fault) for t in tests):
-            detected += 1
+        for test, normal in zip(tests, good):
+            mask = normal ^ output_word(circuit, simulate_stuck_at(circuit, test, fault))
+            if mask:
+                observed[f"{fault.pole}/{fault.stuck_at}"] = observing_outputs(circuit, mask)
+                break
+
+    return Coverage(detected=len(observed), total=len(faults), observed=observed)
 
-    return Coverage(detected=detected, total=len(faults))
+
+@dataclass(frozen=True)
+class SignatureCoverage:
+    """Faults graded by MISR signature instead of by full response."""
+
+    coverage: Coverage
+    good: int
+    # fault id -> faulty signature: the only per-fault state kept
+    signatures: Dict[str, int] = field(compare=False)
+    # responses that differ from the good machine but compact to its signature
+    aliased: int = 0
+    aliasing_estimate: float = 0.0
+
+
+def signature_coverage(
+    circuit: Circuit,
+    tests: Sequence[Dict[str, int]],
+    polynomial: str = MISR_POLY,
+    faults: Optional[Sequence[Fault]] = None,
+) -> SignatureCoverage:
+    """Compact the packed responses of every fault into a signature and compare it."""
+    compiled = compile_circuit(circuit)
+    faults = list(faults if faults is not None else characteristic_faults(circuit))
+    misr = MISR(polynomial)
+    words, mask = pack_patterns(compiled, tests)
+    good = simulate_words(compiled, words, mask)
+    good_outputs = [good[o] for o in compiled.outputs]
+    good_signature = misr.compact_packed(good_outputs, len(tests))
+
+    signatures: Dict[str, int] = {}
+    aliased = 0
+    for fault in faults:
+        bad = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+        outputs = [bad[o] for o in compiled.outputs]
+        misr.reset()
+        signature = misr.compact_packed(outputs, len(tests))
+        signatures[f"{fault.pole}/{fault.stuck_at}"] = signature
+        if signature == good_signature and outputs != good_outputs:
+            aliased += 1
+
+    detected = sum(1 for sig in signatures.values() if sig != good_signature)
+    return SignatureCoverage(
+        coverage=Coverage(detected=detected, total=len(faults)),
+        good=good_signature,
+        signatures=signatures,
+        aliased=aliased,
+        aliasing_estimate=misr.aliasing_probability(len(tests), len(compiled.outputs)),
+    )
 
 
 def map_bits_to_inputs(bits: List[int], inputs: List[str]) -> Dict[str, int]:
@@ -0,0 +1,120 @@
+"""Bit-packed linear algebra over GF(2).
+
+A vector is an int (bit i = coordinate i); an n x n matrix is a list of n
+row ints, so y = A x has bit i equal to the parity of rows[i] & x.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+def identity(n: int) -> List[int]:
+    return [1 << i for i in range(n)]
+
+
+def matrix_of(linear: Callable[[int], int], n: int) -> List[int]:
+    """Matrix of a linear map on n-bit vectors, read off from the images of the unit vectors."""
+    columns = [linear(1 << j) for j in range(n)]
+    return [sum(((col >> i) & 1) << j for j, col in enumerate(columns)) for i in range(n)]
+
+
+def mat_vec(rows: Sequence[int], x: int) -> int:
+    y = 0
+    for i, row in enumerate(rows):
+        y |= ((row & x).bit_count() & 1) << i
+    return y
+
+
+def mat_mul(a: Sequence[int], b: Sequence[int]) -> List[int]:
+    """A B: row i of the product is the XOR of the rows of B selected by row i of A."""
+    product = []
+    for row in a:
+        acc = 0
+        j = 0
+        while row:
+            if row & 1:
+                acc ^= b[j]
+            row >>= 1
+            j += 1
+        product.append(acc)
+    return product
+
+
+def mat_pow(rows: Sequence[int], k: int) -> List[int]:
+    """rows ** k by repeated squaring."""
+    result = identity(len(rows))
+    base = list(rows)
+    while k:
+        if k & 1:
+            result = mat_mul(result, base)
+        k >>= 1
+        if k:
+            base = mat_mul(base, base)
+    return result
+
+
+class LinearSystem:
+    """Equations row . x = rhs over n unknowns, kept in reduced echelon form as they arrive.
+
+    An equation is one int holding the coefficients in bits 0..n-1 and the
+    right-hand side in bit n, so every elimination step is a single XOR.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self.pivots: Dict[int, int] = {}  # pivot column -> equation
+
+    @property
+    def rank(self) -> int:
+        return len(self.pivots)
+
+    def copy(self) -> "LinearSystem":
+        clone = LinearSystem(self.n)
+        clone.pivots = dict(self.pivots)
+        return clone
+
+    def add(self, row: int, rhs: int) -> bool:
+        """Add row . x = rhs; False (and no change) when it contradicts the system."""
+        mask = (1 << self.n) - 1
+        eq = (row & mask) | ((rhs & 1) << self.n)
+        for col, pivot in self.pivots.items():
+            if (eq >> col) & 1:
+                eq ^= pivot
+        coefficients = eq & mask
+        if not coefficients:
+            return not eq  # 0 = 0 is redundant, 0 = 1 a contradiction
+        col = (coefficients & -coefficients).bit_length() - 1
+        for other, pivot in self.pivots.items():
+            if (pivot >> col) & 1:
+                self.pivots[other] = pivot ^ eq
+        self.pivots[col] = eq
+        return True
+
+    def solution(self, free: int = 0) -> int:
+        """The solution whose free unknowns take their bits from `free`."""
+        mask = (1 << self.n) - 1
+        pivot_mask = sum(1 << col for col in self.pivots)
+        x = free & mask & ~pivot_mask
+        for col, eq in self.pivots.items():
+            # a reduced equation involves its pivot and free unknowns only
+            bit = (eq >> self.n) ^ ((eq & mask & ~(1 << col) & x).bit_count() & 1)
+            x |= (bit & 1) << col
+        return x
+
+    def nonzero_solution(self) -> Optional[int]:
+        """Any solution other than 0; None when 0 is the only one."""
+        x = self.solution()
+        if x:
+            return x
+        free = ((1 << self.n) - 1) & ~sum(1 << col for col in self.pivots)
+        return self.solution(free & -free) if free else None
+
+
+def solve(rows: Sequence[int], rhs: int, n: int) -> Optional[int]:
+    """One x with parity(rows[i] & x) = bit i of `rhs` for every i, or None."""
+    system = LinearSystem(n)
+    for i, row in enumerate(rows):
+        if not system.add(row, rhs >> i):
+            return None
+    return system.solution()
@@ -0,0 +1,123 @@
+"""Three-valued forward/backward implication on a compiled netlist."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from helpers.netlist import (
+    OP_AND,
+    OP_NAND,
+    OP_NOR,
+    OP_NOT,
+    OP_OR,
+    CompiledCircuit,
+)
+
+if TYPE_CHECKING:
+    from helpers.learning import ImplicationGraph
+
+X = -1
+
+
+class Implicator:
+    """Propagates value assignments through the netlist until a fixpoint or a conflict."""
+
+    def __init__(self, compiled: CompiledCircuit, learned: Optional["ImplicationGraph"] = None):
+        self.compiled = compiled
+        self.learned = learned
+        self.driver: List[int] = [-1] * compiled.num_poles
+        for g, out in enumerate(compiled.gate_outputs):
+            self.driver[out] = g
+        inputs = set(compiled.inputs)
+        self.constants = {
+            p: 0 for p in range(compiled.num_poles) if self.driver[p] < 0 and p not in inputs
+        }
+
+    def imply(self, assignments: Dict[int, int]) -> Optional[List[int]]:
+        """Pole values implied by `assignments` (X where unknown), or None on conflict."""
+        values = [X] * self.compiled.num_poles
+        queue: deque = deque()
+
+        def assign(pole: int, value: int) -> bool:
+            current = values[pole]
+            if current == X:
+                values[pole] = value
+                queue.append(pole)
+                return True
+            return current == value
+
+        for pole, value in self.constants.items():
+            assign(pole, value)
+        if self.learned is not None:
+            for pole, value in self.learned.constants.items():
+                if not assign(pole, value):
+                    return None
+        for pole, value in assignments.items():
+            if not assign(pole, value):
+                return None
+
+        fanout = self.compiled.fanout
+        edges = self.learned.edges if self.learned is not None else None
+        while queue:
+            pole = queue.popleft()
+            if edges is not None:
+                for lit in edges[2 * pole + values[pole]]:
+                    if not assign(lit >> 1, lit & 1):
+                        return None
+            gates = list(fanout[pole])
+            if self.driver[pole] >= 0:
+                gates.append(self.driver[pole])
+            for g in gates:
+                if not self._imply_gate(g, values, assign):
+                    return None
+        return values
+
+    def _imply_gate(self, g: int, values: List[int], assign) -> bool:
+        op = self.compiled.gate_ops[g]
+        ins = self.compiled.gate_inputs[g]
+        out = self.compiled.gate_outputs[g]
+        vo = values[out]
+
+        if op == OP_NOT:
+            vi = values[ins[0]]
+            if vi != X and not assign(out, 1 - vi):
+                return False
+            if vo != X and not assign(ins[0], 1 - vo):
+                return False
+            return True
+
+        if op not in (OP_AND, OP_NAND, OP_OR, OP_NOR):
+            return self._imply_xor(ins, out, values, assign)
+
+        ctrl = 0 if op in (OP_AND, OP_NAND) else 1
+        inv = 1 if op in (OP_NAND, OP_NOR) else 0
+        unknown = [i for i in ins if values[i] == X]
+
+        if any(values[i] == ctrl for i in ins):
+            return assign(out, ctrl ^ inv)
+        if not unknown:
+            return assign(out, (1 - ctrl) ^ inv)
+        if vo == X:
+            return True
+
+        core = vo ^ inv
+        if core != ctrl:
+            return all(assign(i, 1 - ctrl) for i in unknown)
+        if len(unknown) == 1:
+            return assign(unknown[0], ctrl)
+        return True
+
+    @staticmethod
+    def _imply_xor(ins, out: int, values: List[int], assign) -> bool:
+        if len(ins) < 2:
+            return assign(out, 0)
+        a, b = ins[0], ins[1]
+        va, vb, vo = values[a], values[b], values[out]
+        if va != X and vb != X:
+            return assign(out, va ^ vb)
+        if va != X and vo != X:
+            return assign(b, va ^ vo)
+        if vb != X and vo != X:
+            return assign(a, vb ^ vo)
+        return True
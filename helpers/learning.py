@@ -0,0 +1,91 @@
+"""Static learning of indirect implications (SOCRATES-style)."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Optional
+
+from dto import Circuit
+from helpers.implication import X, Implicator
+from helpers.netlist import CompiledCircuit, compile_circuit
+
+
+@dataclass
+class ImplicationGraph:
+    """Learned implications over literals `2 * pole + value`.
+
+    `edges[lit]` lists the literals implied by `lit` that direct implication
+    cannot derive; `constants` maps poles that can only take one value.
+    """
+
+    compiled: CompiledCircuit
+    edges: List[List[int]]
+    constants: Dict[int, int]
+    _implicator: Optional[Implicator] = field(default=None, init=False, repr=False)
+
+    @property
+    def size(self) -> int:
+        return sum(len(targets) for targets in self.edges)
+
+    def implied(self, pole: str, value: int) -> List[tuple]:
+        """Learned consequences of `pole = value` as (pole, value) pairs."""
+        lit = 2 * self.compiled.index[pole] + value
+        return [(self.compiled.poles[t >> 1], t & 1) for t in self.edges[lit]]
+
+    def imply(self, assignment: Dict[str, int]) -> Optional[Dict[str, int]]:
+        """Direct plus learned implications of a named assignment; None on conflict."""
+        index = self.compiled.index
+        values = self.implicator().imply({index[p]: v for p, v in assignment.items() if p in index})
+        if values is None:
+            return None
+        return {self.compiled.poles[i]: v for i, v in enumerate(values) if v != X}
+
+    def implicator(self) -> Implicator:
+        if self._implicator is None:
+            self._implicator = Implicator(self.compiled, learned=self)
+        return self._implicator
+
+
+def learn_implications(
+    circuit: Circuit, compiled: Optional[CompiledCircuit] = None
+) -> ImplicationGraph:
+    """Learn indirect implications once per netlist.
+
+    For every literal p=v, direct implication gives q=w; the contrapositive
+    q=!w -> p=!v is kept when direct implication of q=!w does not already
+    reach p=!v. A literal whose implication conflicts makes its pole constant.
+    """
+    compiled = compiled or compile_circuit(circuit)
+    implicator = Implicator(compiled)
+    closures: Dict[int, Optional[FrozenSet[int]]] = {}
+
+    def closure(lit: int) -> Optional[FrozenSet[int]]:
+        if lit not in closures:
+            values = implicator.imply({lit >> 1: lit & 1})
+            closures[lit] = (
+                None
+                if values is None
+                else frozenset(2 * p + v for p, v in enumerate(values) if v != X)
+            )
+        return closures[lit]
+
+    edges: List[List[int]] = [[] for _ in range(2 * compiled.num_poles)]
+    constants: Dict[int, int] = {}
+
+    for pole in range(compiled.num_poles):
+        for value in (0, 1):
+            lit = 2 * pole + value
+            implied = closure(lit)
+            if implied is None:
+                constants[pole] = 1 - value
+                continue
+            for target in implied:
+                if target >> 1 == pole:
+                    continue
+                source = target ^ 1  # q = !w
+                learned = lit ^ 1  # p = !v
+                direct = closure(source)
+                if direct is not None and learned not in direct:
+                    edges[source].append(learned)
+
+    return ImplicationGraph(compiled=compiled, edges=edges, constants=constants)
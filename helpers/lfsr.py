@@ -2,31 +2,46 @@
 
 from __future__ import annotations
 
+import math
 import re
 from dataclasses import dataclass
-from typing import Iterable, List
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 
+import numpy as np
 
-POLY_TERM_PATTERN = re.compile(r"x\d+|x|\d+")
+from helpers.gf2 import mat_mul, mat_pow, mat_vec, matrix_of
+
+
+POLY_TERM_PATTERN = re.compile(r"x\d*|1")
+
+# Batch generation keeps states in uint64 arrays
+MAX_BATCH_DEGREE = 64
+
+# Bits per table lookup in word-at-a-time stepping
+TABLE_WIDTHS = (8, 16)
 
 
 def parse_polynomial(poly: str) -> List[int]:
-    """Parse polynomial string like 'x8⊕x6⊕x5⊕x4⊕1' into degrees."""
+    """Parse polynomial string like 'x8⊕x6⊕x5⊕x4⊕1' into degrees.
+
+    The register always feeds the shifted-out bit back, so the constant
+    term is implied: 'x8⊕x6⊕x5⊕x4' parses the same as 'x8⊕x6⊕x5⊕x4⊕1'.
+    """
     normalized = (
         poly.replace(" ", "")
         .replace("^", "")
         .replace("+", "⊕")
         .replace("", "⊕")
     )
-    terms = POLY_TERM_PATTERN.findall(normalized)
     degrees: List[int] = []
 
-    for term in terms:
-        if term.startswith("x"):
-            degree = term[1:]
-            degrees.append(int(degree) if degree else 1)
-        else:
-            degrees.append(int(term))
+    for term in filter(None, normalized.split("⊕")):
+        if not POLY_TERM_PATTERN.fullmatch(term):
+            raise ValueError(f"Unknown polynomial term '{term}' in '{poly}'")
+        degree = 0 if term == "1" else int(term[1:] or 1)
+        if degree in degrees:
+            raise ValueError(f"Polynomial '{poly}' repeats the x^{degree} term")
+        degrees.append(degree)
 
     if not degrees:
         raise ValueError(f"Polynomial '{poly}' contains no terms")
@@ -34,12 +49,15 @@ def parse_polynomial(poly: str) -> List[int]:
     if max(degrees) == 0:
         raise ValueError("Polynomial must have degree >= 1")
 
+    if 0 not in degrees:
+        degrees.append(0)
+
     return sorted(degrees, reverse=True)
 
 
 @dataclass
 class LFSR:
-    """Right-shift Fibonacci LFSR with XOR feedback."""
+    """Right-shift LFSR: the bit shifted out of bit 0 is XORed into the tap positions."""
 
     polynomial: str
     seed: int
@@ -50,6 +68,8 @@ class LFSR:
         self.period = (1 << self.degree) - 1
         self._taps_mask = self._build_taps_mask(degrees)
         self.state = self.seed & self.period
+        self._powers: List[List[int]] = []  # step matrices for 2**i steps, filled on demand
+        self._tables: Dict[int, Tuple[List[int], List[int]]] = {}  # width -> (next state, output bits)
 
         if self.seed == 0 or self.seed > self.period:
             raise ValueError(
@@ -58,24 +78,411 @@ class LFSR:
 
     @staticmethod
     def _build_taps_mask(degrees: Iterable[int]) -> int:
+        """Bit d-1 for every non-constant term x^d, so the shifted-out bit also refills the top stage."""
         mask = 0
-        highest = max(degrees)
         for degree in degrees:
-            if degree in (highest, 0):
-                continue
-            mask |= 1 << (degree - 1)
+            if degree:
+                mask |= 1 << (degree - 1)
         return mask
 
     def step(self) -> int:
         """Advance the register by one cycle and return the new state."""
-        lsb = self.state & 1
-        self.state >>= 1
-        if lsb:
-            self.state ^= self._taps_mask
+        self.state = self.next_state(self.state)
         return self.state
 
+    def transition(self) -> List[int]:
+        """GF(2) matrix of one `step()` (bit-packed rows)."""
+        return self._power(0)
+
+    def _power(self, i: int) -> List[int]:
+        if not self._powers:
+            self._powers.append(matrix_of(self.next_state, self.degree))
+        while len(self._powers) <= i:
+            self._powers.append(mat_mul(self._powers[-1], self._powers[-1]))
+        return self._powers[i]
+
+    def next_state(self, state: int) -> int:
+        """The state one `step()` after `state`, without touching the register."""
+        lsb = state & 1
+        state >>= 1
+        return state ^ self._taps_mask if lsb else state
+
+    def next_states(self, states: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """`next_state` for a whole uint64 array, optionally written into `out`."""
+        feedback = (states & np.uint64(1)) * np.uint64(self._taps_mask)
+        out = np.right_shift(states, np.uint64(1), out=out)
+        out ^= feedback
+        return out
+
+    def state_at(self, seed: int, k: int) -> int:
+        """State after `k` steps from `seed`, in O(degree^2 log k)."""
+        if k < 0:
+            raise ValueError("k must be >= 0")
+        state = seed & self.period
+        i = 0
+        while k:
+            if k & 1:
+                state = mat_vec(self._power(i), state)
+            k >>= 1
+            i += 1
+        return state
+
+    def advance(self, k: int) -> int:
+        """Jump `k` steps ahead and return the new state; same as `k` calls to `step()`."""
+        self.state = self.state_at(self.state, k)
+        return self.state
+
+    def chunk_starts(self, chunks: int, length: int) -> List[int]:
+        """Start states of `chunks` consecutive runs of `length` steps from the seed."""
+        return [self.state_at(self.seed, c * length) for c in range(chunks)]
+
+    def steps_between(self, seed: int, state: int) -> Optional[int]:
+        """Smallest k with `state_at(seed, k) == state`, or None (baby-step giant-step).
+
+        The step map may be singular, in which case the orbit has a tail of
+        at most `degree` states before its cycle; the tail is walked directly
+        and BSGS runs on the cycle, where the map is invertible.
+        """
+        current = seed & self.period
+        for k in range(self.degree + 1):
+            if current == state:
+                return k
+            if k < self.degree:
+                current = self.next_state(current)
+
+        # current lies on the cycle: find k in (0, m * (m + 1)] with M^k current == state
+        m = math.isqrt(self.period) + 1
+        baby: Dict[int, int] = {}
+        value = state
+        for j in range(m):
+            baby[value] = j  # the largest j wins, giving the smallest k
+            value = self.next_state(value)
+
+        giant = mat_pow(self.transition(), m)
+        value = current
+        for i in range(1, m + 2):
+            value = mat_vec(giant, value)
+            j = baby.get(value)
+            # a state off the cycle can collide with its baby steps, so verify
+            if j is not None and self.state_at(current, i * m - j) == state:
+                return self.degree + i * m - j
+        return None
+
+    def states(self, count: int) -> np.ndarray:
+        """The next `count` states, the current one first, as uint64; the register moves past them.
+
+        The run is cut into about sqrt(2 count) chunks whose start states come
+        from jump-ahead; all chunks are then stepped together, one NumPy
+        operation per step for every chunk.
+        """
+        if self.degree > MAX_BATCH_DEGREE:
+            raise ValueError(f"Batch generation supports degree <= {MAX_BATCH_DEGREE}, got {self.degree}")
+        if count <= 0:
+            return np.empty(0, dtype=np.uint64)
+        lanes = max(1, math.isqrt(2 * count))
+        length = -(-count // lanes)
+        jump = mat_pow(self.transition(), length)
+        starts = []
+        state = self.state
+        for _ in range(lanes):
+            starts.append(state)
+            state = mat_vec(jump, state)
+
+        out = np.empty((length, lanes), dtype=np.uint64)
+        out[0] = starts
+        for t in range(1, length):
+            self.next_states(out[t - 1], out=out[t])
+        self.advance(count)
+        return out.T.reshape(-1)[:count]
+
+    def pattern_words(self, count: int, width: int) -> List[int]:
+        """The next `count` states in packed-pattern layout: word i holds bit i of every state."""
+        return pack_states(self.states(count), width)
+
     def bits(self, count: int) -> List[int]:
         """Return the lowest `count` bits of the current state."""
         return [(self.state >> i) & 1 for i in range(count)]
 
+    def bits_int(self, count: int) -> int:
+        """`bits(count)` as an int: bit i is bit i of the current state."""
+        return self.state & ((1 << count) - 1)
+
+    def output_bit(self, state: int) -> int:
+        """The bit shifted out of the register by the next step."""
+        return state & 1
+
+    def step_word(self, width: int = 8) -> int:
+        """Advance `width` steps with one table lookup; returns the bits shifted out, first in bit 0."""
+        next_states, outputs = self._table(width)
+        index = self._table_index(self.state, width)
+        self.state = self._table_shift(self.state, width) ^ next_states[index]
+        return outputs[index]
+
+    def stream(self, count: int, width: int = 8) -> int:
+        """The next `count` output bits as an int (bit k from step k), a table word at a time."""
+        words = []
+        if self.degree >= width:
+            words = [self.step_word(width) for _ in range(count // width)]
+        out = int.from_bytes(np.asarray(words, dtype=f"<u{width // 8}").tobytes(), "little")
+        k = len(words) * width
+        tail = 0
+        for i in range(count - k):
+            tail |= self.output_bit(self.state) << i
+            self.step()
+        return out | (tail << k)
+
+    def _table(self, width: int) -> Tuple[List[int], List[int]]:
+        """State after `width` steps and the bits shifted out, per value of the consumed bits.
+
+        Both are linear in those bits, so only the unit vectors are stepped;
+        every other entry is the XOR of two earlier ones.
+        """
+        if width not in TABLE_WIDTHS:
+            raise ValueError(f"Unknown table width '{width}', expected one of {TABLE_WIDTHS}")
+        if self.degree < width:
+            raise ValueError(f"Table width {width} exceeds the register degree {self.degree}")
+        if width not in self._tables:
+            next_states = [0] * (1 << width)
+            outputs = [0] * (1 << width)
+            for b in range(width):
+                state = self._table_place(1 << b, width)
+                for k in range(width):
+                    outputs[1 << b] |= self.output_bit(state) << k
+                    state = self.next_state(state)
+                next_states[1 << b] = state
+            for v in range(3, 1 << width):
+                low = v & -v
+                if v != low:
+                    next_states[v] = next_states[v ^ low] ^ next_states[low]
+                    outputs[v] = outputs[v ^ low] ^ outputs[low]
+            self._tables[width] = (next_states, outputs)
+        return self._tables[width]
+
+    def _table_index(self, state: int, width: int) -> int:
+        """The `width` bits the next `width` steps shift out."""
+        return state & ((1 << width) - 1)
+
+    def _table_place(self, index: int, width: int) -> int:
+        """A state whose consumed bits are `index` and all other bits 0."""
+        return index
+
+    def _table_shift(self, state: int, width: int) -> int:
+        """What is left of `state` after `width` steps, before feedback."""
+        return state >> width
+
+
+class GaloisLFSR(LFSR):
+    """The same register as `LFSR`, mirrored into the left-shifting CRC form.
+
+    `LFSR` shifts right and XORs the bit it shifts out of bit 0 into its tap
+    positions; this form shifts left, out of bit degree-1. Reversing the
+    bit order maps one onto the other: if `LFSR(poly, s)` reaches state t
+    after k steps, `GaloisLFSR(poly, reverse_bits(s, degree))` reaches
+    `reverse_bits(t, degree)`, and both shift out the same bit sequence.
+    """
+
+    def __post_init__(self) -> None:
+        super().__post_init__()
+        self._feedback = reverse_bits(self._taps_mask, self.degree)
+
+    @classmethod
+    def from_lfsr(cls, lfsr: LFSR) -> "GaloisLFSR":
+        """The Galois register in the state that corresponds to `lfsr`'s current state."""
+        return cls(lfsr.polynomial, reverse_bits(lfsr.state, lfsr.degree))
+
+    def to_lfsr(self) -> LFSR:
+        return LFSR(self.polynomial, reverse_bits(self.state, self.degree))
+
+    def next_state(self, state: int) -> int:
+        msb = state >> (self.degree - 1)
+        state = (state << 1) & self.period
+        return state ^ self._feedback if msb else state
+
+    def next_states(self, states: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        feedback = (states >> np.uint64(self.degree - 1)) * np.uint64(self._feedback)
+        out = np.left_shift(states, np.uint64(1), out=out)
+        out &= np.uint64(self.period)
+        out ^= feedback
+        return out
+
+    def output_bit(self, state: int) -> int:
+        return state >> (self.degree - 1)
+
+    def _table_index(self, state: int, width: int) -> int:
+        return state >> (self.degree - width)
+
+    def _table_place(self, index: int, width: int) -> int:
+        return index << (self.degree - width)
+
+    def _table_shift(self, state: int, width: int) -> int:
+        return (state << width) & self.period
+
+
+def reverse_bits(value: int, width: int) -> int:
+    """`value` with its lowest `width` bits in reverse order."""
+    return int(f"{value:0{width}b}"[::-1], 2) if width else 0
+
+
+
+
+class LfsrBank:
+    """Many registers stepped together as bitslices.
+
+    Plane i is an int whose bit l is bit i of lane l, so one step is a
+    handful of wide XOR/AND operations for all lanes, and the planes are
+    already packed-pattern words: after each step, lane l is pattern l.
+    Lanes may differ in seed and polynomial, but must all be right-shift
+    `LFSR`s; a `GaloisLFSR` steps differently and is rejected.
+    """
+
+    def __init__(self, registers: Sequence[LFSR]):
+        if not registers:
+            raise ValueError("LfsrBank needs at least one register")
+        for reg in registers:
+            if type(reg) is not LFSR:
+                raise ValueError(f"LfsrBank steps right-shift LFSRs only, got {type(reg).__name__}")
+        self.lanes = len(registers)
+        self.degree = max(reg.degree for reg in registers)
+        self.planes = [_plane((reg.state >> i) & 1 for reg in registers) for i in range(self.degree)]
+        taps = [_plane((reg._taps_mask >> i) & 1 for reg in registers) for i in range(self.degree)]
+        self._taps = [(i, plane) for i, plane in enumerate(taps) if plane]
+
+    @classmethod
+    def from_seeds(cls, polynomial: str, seeds: Iterable[int]) -> "LfsrBank":
+        return cls([LFSR(polynomial, seed) for seed in seeds])
+
+    def step(self) -> List[int]:
+        """Step every lane once; returns the new planes."""
+        lsb = self.planes[0]
+        planes = self.planes[1:] + [0]
+        for i, taps in self._taps:
+            planes[i] ^= lsb & taps
+        self.planes = planes
+        return planes
+
+    def pattern_words(self, width: int) -> List[int]:
+        """The current lane states as `width` packed-pattern words (bit l = lane l)."""
+        return (self.planes + [0] * width)[:width]
+
+    def states(self) -> np.ndarray:
+        """The current state of every lane as uint64."""
+        nbytes = (self.lanes + 7) // 8
+        out = np.zeros(self.lanes, dtype=np.uint64)
+        for i, plane in enumerate(self.planes):
+            bits = np.unpackbits(
+                np.frombuffer(plane.to_bytes(nbytes, "little"), dtype=np.uint8), bitorder="little"
+            )[: self.lanes]
+            out |= bits.astype(np.uint64) << np.uint64(i)
+        return out
+
+    def run(self, count: int) -> np.ndarray:
+        """States of every lane for the next `count` cycles, shape (count, lanes)."""
+        out = np.empty((count, self.lanes), dtype=np.uint64)
+        for t in range(count):
+            out[t] = self.states()
+            self.step()
+        return out
+
+
+class MISR:
+    """Multiple-input signature register built on the `LFSR` step map.
+
+    Each clock steps the register and XORs one response word into it,
+    bit o of the word into stage o (folded modulo the degree when there
+    are more inputs than stages).
+    """
+
+    def __init__(self, polynomial: str, seed: int = 0):
+        self.register = LFSR(polynomial, 1)
+        self.polynomial = polynomial
+        self.degree = self.register.degree
+        self.seed = seed & self.register.period
+        self.state = self.seed
+        self._input_tables: Dict[int, List[int]] = {}  # input bit -> 8-clock contribution per byte
+
+    def reset(self) -> None:
+        self.state = self.seed
+
+    def clock(self, word: int) -> int:
+        """One clock with `word` on the parallel inputs; returns the new state."""
+        self.state = self.register.next_state(self.state) ^ self._fold(word)
+        return self.state
+
+    def compact(self, words: Iterable[int]) -> int:
+        """Clock in every word in order; returns the signature."""
+        for word in words:
+            self.clock(word)
+        return self.state
+
+    def compact_packed(self, columns: Sequence[int], count: int) -> int:
+        """Signature of `count` patterns given as packed columns (bit j of column o = input o at clock j).
+
+        Eight clocks cost one table step of the register plus one lookup
+        per input, whatever the pattern values.
+        """
+        full = count // 8 if self.degree >= 8 else 0
+        if full:
+            next_states, _ = self.register._table(8)
+            tables = [self._input_table(o) for o in range(len(columns))]
+            chunks = [(column & ((1 << (8 * full)) - 1)).to_bytes(full, "little") for column in columns]
+            state = self.state
+            for b in range(full):
+                state = self.register._table_shift(state, 8) ^ next_states[self.register._table_index(state, 8)]
+                for table, data in zip(tables, chunks):
+                    state ^= table[data[b]]
+            self.state = state
+        for j in range(8 * full, count):
+            self.clock(sum(((column >> j) & 1) << o for o, column in enumerate(columns)))
+        return self.state
+
+    def aliasing_probability(self, patterns: int, inputs: int) -> float:
+        """Chance that an erroneous response stream leaves the good signature.
+
+        Every non-zero error stream of `patterns` x `inputs` bits is taken
+        as equally likely: (2^(mL - n) - 1) / (2^(mL) - 1), close to 2^-n
+        for long runs.
+        """
+        bits = patterns * inputs
+        if bits <= self.degree:
+            return 0.0
+        return 2.0 ** -self.degree * (1 - 2.0 ** (self.degree - bits)) / (1 - 2.0 ** -bits)
+
+    def _fold(self, word: int) -> int:
+        folded = 0
+        while word:
+            folded ^= word & self.register.period
+            word >>= self.degree
+        return folded
+
+    def _input_table(self, o: int) -> List[int]:
+        """Contribution of input `o` over 8 clocks, indexed by its 8 bits (clock t = bit t)."""
+        if o not in self._input_tables:
+            impulses = [self._fold(1 << o)]
+            for _ in range(7):
+                impulses.append(self.register.next_state(impulses[-1]))
+            table = [0] * 256
+            for t in range(8):
+                table[1 << t] = impulses[7 - t]
+            for v in range(3, 256):
+                low = v & -v
+                if v != low:
+                    table[v] = table[v ^ low] ^ table[low]
+            self._input_tables[o] = table
+        return self._input_tables[o]
+
+
+def pack_states(states: np.ndarray, width: int) -> List[int]:
+    """Packed-pattern words from a state array: bit j of word i is bit i of states[j]."""
+    octets = np.asarray(states, dtype="<u8").view(np.uint8).reshape(-1, 8)
+    words = []
+    for i in range(width):
+        bits = (octets[:, i // 8] >> (i % 8)) & 1
+        words.append(int.from_bytes(np.packbits(bits, bitorder="little").tobytes(), "little"))
+    return words
+
 
+def _plane(bits: Iterable[int]) -> int:
+    word = 0
+    for lane, bit in enumerate(bits):
+        word |= bit << lane
+    return word
@@ -1,5 +1,7 @@
 from typing import List, Set, Dict, Tuple, Optional
 from dto import Circuit, Gate, GateType
+from helpers.learning import ImplicationGraph
+from helpers.stats import AtpgStats
 
 
 def find_paths(circuit: Circuit, start_pole: str, target_poles: List[str]) -> List[List[str]]:
@@ -75,7 +77,12 @@ def get_activation_condition(gate: Gate, sensitive_input: str) -> Dict[str, int]
     return condition
 
 
-def solve_conditions(conditions: List[Dict[str, int]], circuit: Circuit) -> List[Dict[str, int]]:
+def solve_conditions(
+    conditions: List[Dict[str, int]],
+    circuit: Circuit,
+    stats: Optional[AtpgStats] = None,
+    learned: Optional[ImplicationGraph] = None,
+) -> List[Dict[str, int]]:
     """Solve combined conditions"""
     if not conditions:
         return []
@@ -95,6 +102,21 @@ def solve_conditions(conditions: List[Dict[str, int]], circuit: Circuit) -> List
     
     if conflict:
         return []
+    if stats is not None:
+        stats.implications += len(merged)
+    
+    # Implied input values (direct + learned) prune the enumeration
+    if learned is not None:
+        implied = learned.imply(merged)
+        if implied is None:
+            if stats is not None:
+                stats.backtracks += 1
+            return []
+        for inp in circuit.inputs:
+            if inp in implied and inp not in merged:
+                merged[inp] = implied[inp]
+                if stats is not None:
+                    stats.implications += 1
     
     # Backtrack to find input assignments
     solutions = []
@@ -105,6 +127,10 @@ def solve_conditions(conditions: List[Dict[str, int]], circuit: Circuit) -> List
             # Check if assignment satisfies conditions
             values = circuit.evaluate(assignment)
             valid = all(values.get(pole) == val for pole, val in merged.items())
+            if stats is not None:
+                stats.gate_evaluations += len(circuit.gates)
+                if not valid:
+                    stats.backtracks += 1
             if valid:
                 solutions.append(assignment.copy())
             return
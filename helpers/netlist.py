@@ -0,0 +1,186 @@
+"""Index-based, levelized netlist for bit-parallel simulation."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dto import Circuit, GateType
+
+# Bit-parallel words are plain ints: bit j of a pole's word is its value under pattern j.
+OP_AND, OP_OR, OP_NOT, OP_NAND, OP_NOR, OP_XOR = range(6)
+
+GATE_OPS = {
+    GateType.AND: OP_AND,
+    GateType.OR: OP_OR,
+    GateType.NOT: OP_NOT,
+    GateType.NAND: OP_NAND,
+    GateType.NOR: OP_NOR,
+    GateType.XOR: OP_XOR,
+}
+
+
+@dataclass
+class CompiledCircuit:
+    """Circuit flattened to pole indexes with gates in topological order.
+
+    Poles are numbered inputs first, then undriven poles (constant 0, as in
+    `Gate.evaluate`), then gate outputs in evaluation order.
+    """
+
+    poles: List[str]
+    index: Dict[str, int]
+    inputs: List[int]
+    outputs: List[int]
+    gate_ops: List[int]
+    gate_inputs: List[Tuple[int, ...]]
+    gate_outputs: List[int]
+    levels: List[int]
+    fanout: List[List[int]]
+
+    @property
+    def num_poles(self) -> int:
+        return len(self.poles)
+
+    @property
+    def num_gates(self) -> int:
+        return len(self.gate_ops)
+
+
+def compile_circuit(circuit: Circuit) -> CompiledCircuit:
+    if circuit.get_flip_flops():
+        raise ValueError("Circuit has flip-flops; compile it with helpers.sequential")
+    drivers = {gate.output: gate for gate in circuit.gates}
+    primary = set(circuit.inputs)
+    poles: List[str] = list(circuit.inputs)
+    index: Dict[str, int] = {name: i for i, name in enumerate(poles)}
+
+    for gate in circuit.gates:
+        for inp in gate.inputs:
+            if inp not in index and inp not in drivers:
+                index[inp] = len(poles)
+                poles.append(inp)
+
+    # Kahn's algorithm over gates
+    pending: Dict[str, int] = {}
+    readers: Dict[str, List[str]] = {}
+    for gate in circuit.gates:
+        internal = [inp for inp in gate.inputs if inp in drivers and inp not in primary]
+        pending[gate.output] = len(internal)
+        for inp in internal:
+            readers.setdefault(inp, []).append(gate.output)
+
+    ready = deque(name for name, count in pending.items() if count == 0)
+    order: List[str] = []
+    while ready:
+        name = ready.popleft()
+        order.append(name)
+        for reader in readers.get(name, []):
+            pending[reader] -= 1
+            if pending[reader] == 0:
+                ready.append(reader)
+
+    if len(order) != len(drivers):
+        raise ValueError("Circuit has a combinational loop")
+
+    for name in order:
+        if name not in index:
+            index[name] = len(poles)
+            poles.append(name)
+
+    levels = [0] * len(poles)
+    fanout: List[List[int]] = [[] for _ in poles]
+    gate_ops: List[int] = []
+    gate_inputs: List[Tuple[int, ...]] = []
+    gate_outputs: List[int] = []
+
+    for name in order:
+        if name in primary:
+            continue  # a gate driving a primary input is ignored by Circuit.evaluate too
+        gate = drivers[name]
+        ins = tuple(index[inp] for inp in gate.inputs)
+        out = index[name]
+        for inp in ins:
+            fanout[inp].append(len(gate_ops))
+        levels[out] = 1 + max((levels[i] for i in ins), default=0)
+        gate_ops.append(GATE_OPS[gate.gate_type])
+        gate_inputs.append(ins)
+        gate_outputs.append(out)
+
+    return CompiledCircuit(
+        poles=poles,
+        index=index,
+        inputs=[index[name] for name in circuit.inputs],
+        outputs=[index[name] for name in circuit.outputs],
+        gate_ops=gate_ops,
+        gate_inputs=gate_inputs,
+        gate_outputs=gate_outputs,
+        levels=levels,
+        fanout=fanout,
+    )
+
+
+def circuit_fingerprint(circuit: Circuit) -> str:
+    """Stable hash of the netlist, used to key per-circuit caches."""
+    payload = json.dumps(circuit.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def eval_word(op: int, words: Sequence[int], mask: int) -> int:
+    """Evaluate one gate over packed words (same semantics as `Gate.evaluate`)."""
+    if op == OP_AND or op == OP_NAND:
+        value = mask
+        for w in words:
+            value &= w
+    elif op == OP_OR or op == OP_NOR:
+        value = 0
+        for w in words:
+            value |= w
+    elif op == OP_NOT:
+        return ~words[0] & mask
+    else:
+        return words[0] ^ words[1] if len(words) >= 2 else 0
+
+    if op == OP_NAND or op == OP_NOR:
+        return ~value & mask
+    return value
+
+
+def simulate_words(
+    compiled: CompiledCircuit,
+    input_words: Sequence[int],
+    mask: int,
+    fault: Optional[Tuple[int, int]] = None,
+) -> List[int]:
+    """Simulate all patterns at once; `fault` is (pole index, stuck_at)."""
+    values = [0] * compiled.num_poles
+    for pole, word in zip(compiled.inputs, input_words):
+        values[pole] = word & mask
+
+    fault_pole = -1
+    forced = 0
+    if fault is not None:
+        fault_pole = fault[0]
+        forced = mask if fault[1] else 0
+        values[fault_pole] = forced
+
+    for op, ins, out in zip(compiled.gate_ops, compiled.gate_inputs, compiled.gate_outputs):
+        if out == fault_pole:
+            continue
+        values[out] = eval_word(op, [values[i] for i in ins], mask)
+
+    return values
+
+
+def pack_patterns(compiled: CompiledCircuit, tests: Sequence[Dict[str, int]]) -> Tuple[List[int], int]:
+    """Pack tests into one word per primary input; returns (words, mask)."""
+    words = [0] * len(compiled.inputs)
+    names = [compiled.poles[i] for i in compiled.inputs]
+    for j, test in enumerate(tests):
+        for k, name in enumerate(names):
+            if test.get(name, 0):
+                words[k] |= 1 << j
+    return words, (1 << len(tests)) - 1
@@ -0,0 +1,216 @@
+"""Polynomials over GF(2): irreducibility, primitivity and a table of sparse primitives.
+
+A polynomial is an int whose bit i is the coefficient of x^i, so
+x^8 + x^6 + x^5 + x^4 + 1 is 0b101110001.
+"""
+
+from __future__ import annotations
+
+import math
+import random
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_SMALL_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47)
+
+
+def from_degrees(degrees: Iterable[int]) -> int:
+    poly = 0
+    for degree in degrees:
+        poly |= 1 << degree
+    return poly
+
+
+def to_degrees(poly: int) -> List[int]:
+    return [d for d in reversed(range(poly.bit_length())) if (poly >> d) & 1]
+
+
+def to_string(poly: int) -> str:
+    """In the notation `parse_polynomial` reads, e.g. 'x8⊕x6⊕x5⊕x4⊕1'."""
+    return "⊕".join("1" if d == 0 else "x" if d == 1 else f"x{d}" for d in to_degrees(poly))
+
+
+def degree(poly: int) -> int:
+    return poly.bit_length() - 1
+
+
+def mul_mod(a: int, b: int, modulus: int) -> int:
+    """a * b mod `modulus`, shift-and-add with reduction at every step."""
+    n = degree(modulus)
+    top = 1 << n
+    a = reduce(a, modulus)
+    result = 0
+    while b:
+        if b & 1:
+            result ^= a
+        b >>= 1
+        a <<= 1
+        if a & top:
+            a ^= modulus
+    return result
+
+
+def reduce(a: int, modulus: int) -> int:
+    n = degree(modulus)
+    while a.bit_length() - 1 >= n:
+        a ^= modulus << (a.bit_length() - 1 - n)
+    return a
+
+
+def pow_mod(base: int, exponent: int, modulus: int) -> int:
+    """base ** exponent mod `modulus` by repeated squaring."""
+    result = 1
+    base = reduce(base, modulus)
+    while exponent:
+        if exponent & 1:
+            result = mul_mod(result, base, modulus)
+        exponent >>= 1
+        if exponent:
+            base = mul_mod(base, base, modulus)
+    return result
+
+
+def gcd(a: int, b: int) -> int:
+    while b:
+        a, b = b, reduce(a, b)
+    return a
+
+
+def is_irreducible(poly: int) -> bool:
+    """Rabin's test: x^(2^n) = x mod p, and x^(2^(n/q)) - x is coprime to p for every prime q | n."""
+    n = degree(poly)
+    if n < 1:
+        return False
+    if n == 1:
+        return True
+    if not poly & 1:
+        return False  # divisible by x
+    x = 0b10
+    if _frobenius(x, n, poly) != x:
+        return False
+    for q in factorize(n):
+        if gcd(_frobenius(x, n // q, poly) ^ x, poly) != 1:
+            return False
+    return True
+
+
+def is_primitive(poly: int) -> bool:
+    """Irreducible, and x has order exactly 2^n - 1 modulo the polynomial."""
+    n = degree(poly)
+    if not is_irreducible(poly):
+        return False
+    order = (1 << n) - 1
+    return all(pow_mod(0b10, order // q, poly) != 1 for q in factorize(order))
+
+
+def primitive_polynomials(n: int, weight: Optional[int] = None) -> Iterator[int]:
+    """Primitive polynomials of degree `n`, sparsest first (trinomials, pentanomials, ...).
+
+    Within one weight the middle terms are in lexicographic order of their
+    degrees. Even weights are skipped: such polynomials have the root 1.
+    """
+    if n < 1:
+        raise ValueError("degree must be >= 1")
+    if n == 1:
+        if weight in (None, 2):
+            yield 0b11
+        return
+    weights = [weight] if weight is not None else range(3, n + 2, 2)
+    for w in weights:
+        if w % 2 == 0 or w < 3:
+            continue
+        for middle in combinations(range(1, n), w - 2):
+            poly = (1 << n) | 1 | from_degrees(middle)
+            if is_primitive(poly):
+                yield poly
+
+
+@lru_cache(maxsize=None)
+def sparsest_primitive(n: int) -> int:
+    """The first polynomial `primitive_polynomials(n)` yields; memoized per degree."""
+    for poly in primitive_polynomials(n):
+        return poly
+    raise ValueError(f"No primitive polynomial of degree {n}")
+
+
+@lru_cache(maxsize=None)
+def factorize(n: int) -> Dict[int, int]:
+    """Prime factorization {prime: exponent}; memoized, so 2^n - 1 is factored once per degree."""
+    factors: Dict[int, int] = {}
+    stack = [n]
+    while stack:
+        m = stack.pop()
+        if m == 1:
+            continue
+        for p in _SMALL_PRIMES:
+            while m % p == 0:
+                factors[p] = factors.get(p, 0) + 1
+                m //= p
+        if m == 1:
+            continue
+        if _is_probable_prime(m):
+            factors[m] = factors.get(m, 0) + 1
+            continue
+        d = _pollard_rho(m)
+        stack.extend((d, m // d))
+    return dict(sorted(factors.items()))
+
+
+def _frobenius(a: int, times: int, modulus: int) -> int:
+    """a^(2^times) mod `modulus`: `times` squarings."""
+    for _ in range(times):
+        a = mul_mod(a, a, modulus)
+    return a
+
+
+def _is_probable_prime(n: int) -> bool:
+    """Miller-Rabin; deterministic below 3.3e24 with these bases."""
+    if n < 2:
+        return False
+    for p in _SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _SMALL_PRIMES[:13]:
+        x = pow(a, d, n)
+        if x in (1, n - 1):
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _pollard_rho(n: int) -> int:
+    """A non-trivial factor of the composite `n` (Brent's variant)."""
+    rng = random.Random(n)
+    while True:
+        y, c, m = rng.randrange(1, n), rng.randrange(1, n), 128
+        g = r = q = 1
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
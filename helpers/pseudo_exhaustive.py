@@ -0,0 +1,128 @@
+"""Pseudo-exhaustive test sets built from output-cone supports."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from dto import Circuit
+from helpers.fault_sim import Coverage, characteristic_faults
+from helpers.netlist import CompiledCircuit, compile_circuit, simulate_words
+
+
+@dataclass
+class PseudoExhaustivePlan:
+    """Inputs grouped onto shared test signals.
+
+    Inputs that never meet in one output cone can be driven by the same
+    signal, so `2 ** signals` patterns apply every combination to every cone.
+    """
+
+    inputs: List[str]
+    supports: Dict[str, List[str]]  # output -> inputs it depends on
+    signal_of: Dict[str, int]  # input -> test signal
+    signals: int
+
+    @property
+    def largest_cone(self) -> int:
+        return max((len(s) for s in self.supports.values()), default=0)
+
+    @property
+    def pattern_count(self) -> int:
+        return 1 << self.signals
+
+    @property
+    def exhaustive_count(self) -> int:
+        return 1 << len(self.inputs)
+
+    def patterns(self) -> Iterator[Dict[str, int]]:
+        for j in range(self.pattern_count):
+            yield {inp: (j >> self.signal_of[inp]) & 1 for inp in self.inputs}
+
+    def input_words(self) -> List[int]:
+        """Packed patterns, one word per input (bit j = pattern j)."""
+        signal_words = [_counter_word(s, self.signals) for s in range(self.signals)]
+        return [signal_words[self.signal_of[inp]] for inp in self.inputs]
+
+    def log(self, logger: logging.Logger) -> None:
+        logger.info(
+            "Pseudo-exhaustive: %d patterns on %d signals vs %d exhaustive (largest cone %d of %d inputs)",
+            self.pattern_count,
+            self.signals,
+            self.exhaustive_count,
+            self.largest_cone,
+            len(self.inputs),
+        )
+
+
+def output_supports(circuit: Circuit, compiled: Optional[CompiledCircuit] = None) -> Dict[str, List[str]]:
+    """Primary inputs each primary output depends on structurally."""
+    compiled = compiled or compile_circuit(circuit)
+    support = [0] * compiled.num_poles
+    for k, pole in enumerate(compiled.inputs):
+        support[pole] = 1 << k
+    for ins, out in zip(compiled.gate_inputs, compiled.gate_outputs):
+        word = 0
+        for i in ins:
+            word |= support[i]
+        support[out] = word
+
+    return {
+        compiled.poles[o]: [inp for k, inp in enumerate(circuit.inputs) if (support[o] >> k) & 1]
+        for o in compiled.outputs
+    }
+
+
+def build_pseudo_exhaustive(circuit: Circuit, compiled: Optional[CompiledCircuit] = None) -> PseudoExhaustivePlan:
+    """Greedy-colour the input conflict graph; every colour becomes one test signal."""
+    supports = output_supports(circuit, compiled)
+    conflicts: Dict[str, set] = {inp: set() for inp in circuit.inputs}
+    for cone in supports.values():
+        for inp in cone:
+            conflicts[inp].update(other for other in cone if other != inp)
+
+    # Welsh-Powell: most constrained inputs first, circuit order on ties
+    order = sorted(circuit.inputs, key=lambda inp: -len(conflicts[inp]))
+    signal_of: Dict[str, int] = {}
+    for inp in order:
+        taken = {signal_of[other] for other in conflicts[inp] if other in signal_of}
+        signal = 0
+        while signal in taken:
+            signal += 1
+        signal_of[inp] = signal
+
+    return PseudoExhaustivePlan(
+        inputs=list(circuit.inputs),
+        supports=supports,
+        signal_of=signal_of,
+        signals=max(signal_of.values(), default=-1) + 1,
+    )
+
+
+def plan_coverage(circuit: Circuit, plan: PseudoExhaustivePlan) -> Coverage:
+    """Stuck-at coverage of the plan's patterns, all patterns simulated per pass."""
+    compiled = compile_circuit(circuit)
+    words = plan.input_words()
+    mask = (1 << plan.pattern_count) - 1
+    good = simulate_words(compiled, words, mask)
+
+    detected = 0
+    faults = characteristic_faults(circuit)
+    for fault in faults:
+        values = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+        if any(values[o] != good[o] for o in compiled.outputs):
+            detected += 1
+    return Coverage(detected=detected, total=len(faults))
+
+
+def _counter_word(bit: int, width: int) -> int:
+    """Word whose bit j is bit `bit` of j, for j < 2 ** width."""
+    block = ((1 << (1 << bit)) - 1) << (1 << bit)  # 2^bit zeros, then 2^bit ones
+    period = 1 << (bit + 1)
+    word = block
+    span = period
+    while span < (1 << width):
+        word |= word << span
+        span *= 2
+    return word
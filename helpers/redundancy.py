@@ -0,0 +1,181 @@
+"""Untestability proofs for stuck-at faults and a persistent per-circuit cache."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from configs.cfg import UNTESTABLE_CACHE_DIR
+from dto import Circuit, Fault
+from helpers.implication import Implicator
+from helpers.learning import ImplicationGraph
+from helpers.netlist import (
+    OP_AND,
+    OP_NAND,
+    OP_NOR,
+    OP_OR,
+    CompiledCircuit,
+    circuit_fingerprint,
+    compile_circuit,
+)
+
+_NON_CONTROLLING = {OP_AND: 1, OP_NAND: 1, OP_OR: 0, OP_NOR: 0}
+
+
+class RedundancyProver:
+    """Proves faults untestable from their necessary conditions.
+
+    A test must set the fault site to the opposite of the stuck value and
+    propagate the effect through every dominator of the site (gates all paths
+    to the outputs pass through). Dominator side inputs outside the fault's
+    fanout cone therefore have to be non-controlling. If implication of these
+    mandatory values hits a conflict, or no output is reachable at all, the
+    fault is redundant. A failed proof says nothing: the fault may still be
+    testable. Learned implications, when given, make more conflicts visible.
+    """
+
+    def __init__(
+        self,
+        circuit: Circuit,
+        compiled: Optional[CompiledCircuit] = None,
+        learned: Optional[ImplicationGraph] = None,
+    ):
+        self.compiled = learned.compiled if learned is not None else compiled or compile_circuit(circuit)
+        self.implicator = Implicator(self.compiled, learned)
+        self._outputs = set(self.compiled.outputs)
+
+    def is_redundant(self, fault: Fault) -> bool:
+        return self.mandatory_values(fault) is None
+
+    def mandatory_values(self, fault: Fault) -> Optional[Dict[int, int]]:
+        """Values every test for `fault` must produce, or None if there is no test."""
+        site = self.compiled.index.get(fault.pole)
+        if site is None:
+            return None
+
+        cone = self._fanout_cone(site)
+        if not cone & self._outputs:
+            return None
+
+        required = {site: 1 - fault.stuck_at}
+        for dom in self._dominators(site, cone):
+            gate = self.implicator.driver[dom]
+            value = _NON_CONTROLLING.get(self.compiled.gate_ops[gate])
+            if value is None:
+                continue
+            for side in self.compiled.gate_inputs[gate]:
+                if side in cone:
+                    continue
+                if required.get(side, value) != value:
+                    return None
+                required[side] = value
+
+        values = self.implicator.imply(required)
+        if values is None:
+            return None
+        return required
+
+    def _fanout_cone(self, site: int) -> Set[int]:
+        cone = {site}
+        stack = [site]
+        while stack:
+            pole = stack.pop()
+            for g in self.compiled.fanout[pole]:
+                out = self.compiled.gate_outputs[g]
+                if out not in cone:
+                    cone.add(out)
+                    stack.append(out)
+        return cone
+
+    def _dominators(self, site: int, cone: Set[int]) -> List[int]:
+        """Poles other than `site` lying on every path from `site` to an output."""
+        levels = self.compiled.levels
+        post: Dict[int, Optional[FrozenSet[int]]] = {}
+        for pole in sorted(cone, key=lambda p: levels[p], reverse=True):
+            # None stands for "reaches no output"
+            succ = [post[self.compiled.gate_outputs[g]] for g in self.compiled.fanout[pole]]
+            succ = [s for s in succ if s is not None]
+            if pole in self._outputs:
+                post[pole] = frozenset((pole,))
+            elif succ:
+                post[pole] = frozenset.intersection(*succ) | {pole}
+            else:
+                post[pole] = None
+        return sorted((post[site] or frozenset()) - {site}, key=lambda p: levels[p])
+
+
+class UntestableCache:
+    """Redundant and aborted faults of one circuit, persisted as JSON.
+
+    Redundant faults are proven untestable and are skipped by later runs of
+    every engine; aborted faults are ones a given engine gave up on without a
+    proof, so they are only recorded, per engine. With `directory=None` the
+    cache lives in memory only.
+    """
+
+    def __init__(self, circuit: Circuit, directory: Optional[str] = UNTESTABLE_CACHE_DIR or None):
+        self.key = circuit_fingerprint(circuit)
+        self.path = os.path.join(directory, f"{self.key}.json") if directory else None
+        self.redundant: Set[str] = set()
+        self.aborted: Dict[str, Set[str]] = {}
+
+        if self.path and os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as fh:
+                data = json.load(fh)
+            self.redundant = set(data.get("redundant", []))
+            self.aborted = {engine: set(ids) for engine, ids in data.get("aborted", {}).items()}
+
+    def is_redundant(self, fault: Fault) -> bool:
+        return _fault_id(fault) in self.redundant
+
+    def record_redundant(self, fault: Fault) -> None:
+        self.redundant.add(_fault_id(fault))
+        for ids in self.aborted.values():
+            ids.discard(_fault_id(fault))
+
+    def record_aborted(self, fault: Fault, engine: str) -> None:
+        if _fault_id(fault) not in self.redundant:
+            self.aborted.setdefault(engine, set()).add(_fault_id(fault))
+
+    def record_detected(self, fault: Fault, engine: str) -> None:
+        self.aborted.get(engine, set()).discard(_fault_id(fault))
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "redundant": sorted(self.redundant),
+                    "aborted": {engine: sorted(ids) for engine, ids in self.aborted.items()},
+                },
+                fh,
+                indent=2,
+            )
+        os.replace(tmp, self.path)
+
+    def log_summary(self, logger: logging.Logger, engine: str) -> None:
+        if self.redundant:
+            logger.info("Redundant faults: %s", ", ".join(sorted(self.redundant)))
+        aborted = self.aborted.get(engine)
+        if aborted:
+            logger.info("Aborted faults: %s", ", ".join(sorted(aborted)))
+
+
+def classify_untested(
+    cache: UntestableCache, prover: RedundancyProver, fault: Fault, engine: str
+) -> bool:
+    """Record a fault `engine` found no test for; True if it is proven redundant."""
+    if prover.is_redundant(fault):
+        cache.record_redundant(fault)
+        return True
+    cache.record_aborted(fault, engine)
+    return False
+
+
+def _fault_id(fault: Fault) -> str:
+    return f"{fault.pole}/{fault.stuck_at}"
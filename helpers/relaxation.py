@@ -0,0 +1,166 @@
+"""Test-cube relaxation with bit-parallel three-valued fault simulation."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dto import Circuit, Fault
+from helpers.fault_sim import characteristic_faults
+from helpers.netlist import (
+    OP_AND,
+    OP_NAND,
+    OP_NOR,
+    OP_NOT,
+    OP_OR,
+    CompiledCircuit,
+    compile_circuit,
+)
+
+
+@dataclass(frozen=True)
+class RelaxedCube:
+    test: Dict[str, int]
+    cube: str  # one of '0', '1', 'x' per primary input
+    faults: Tuple[str, ...]  # faults the cube still detects under any fill of its x bits
+
+    @property
+    def care_bits(self) -> int:
+        return sum(ch != 'x' for ch in self.cube)
+
+
+def simulate_three_valued(
+    compiled: CompiledCircuit,
+    cube: Sequence[Optional[int]],
+    faults: Sequence[Tuple[int, int]],
+) -> Tuple[List[int], List[int]]:
+    """Good machine in slot 0 and faults[k] in slot k + 1, all at once.
+
+    Every pole carries two words, `ones` and `zeros`; a slot with neither bit
+    set is X. `cube` holds 0, 1 or None per primary input.
+    """
+    mask = (1 << (len(faults) + 1)) - 1
+    force1 = [0] * compiled.num_poles
+    force0 = [0] * compiled.num_poles
+    for slot, (pole, value) in enumerate(faults, start=1):
+        if value:
+            force1[pole] |= 1 << slot
+        else:
+            force0[pole] |= 1 << slot
+
+    ones = [0] * compiled.num_poles
+    zeros = [mask] * compiled.num_poles  # undriven poles are constant 0
+    for pole, value in zip(compiled.inputs, cube):
+        ones[pole] = mask if value == 1 else 0
+        zeros[pole] = mask if value == 0 else 0
+
+    def inject(pole: int) -> None:
+        if force0[pole] or force1[pole]:
+            ones[pole] = (ones[pole] & ~force0[pole]) | force1[pole]
+            zeros[pole] = (zeros[pole] & ~force1[pole]) | force0[pole]
+
+    for pole in compiled.inputs:
+        inject(pole)
+
+    for op, ins, out in zip(compiled.gate_ops, compiled.gate_inputs, compiled.gate_outputs):
+        if op == OP_NOT:
+            one, zero = zeros[ins[0]], ones[ins[0]]
+        elif op in (OP_AND, OP_NAND):
+            one, zero = mask, 0
+            for i in ins:
+                one &= ones[i]
+                zero |= zeros[i]
+            if op == OP_NAND:
+                one, zero = zero, one
+        elif op in (OP_OR, OP_NOR):
+            one, zero = 0, mask
+            for i in ins:
+                one |= ones[i]
+                zero &= zeros[i]
+            if op == OP_NOR:
+                one, zero = zero, one
+        elif len(ins) >= 2:
+            a, b = ins[0], ins[1]
+            one = (ones[a] & zeros[b]) | (zeros[a] & ones[b])
+            zero = (ones[a] & ones[b]) | (zeros[a] & zeros[b])
+        else:
+            one, zero = 0, mask
+        ones[out], zeros[out] = one, zero
+        inject(out)
+
+    return ones, zeros
+
+
+def detected_slots(compiled: CompiledCircuit, ones: List[int], zeros: List[int]) -> int:
+    """Slots whose outputs differ from the good machine with both values known."""
+    detected = 0
+    for o in compiled.outputs:
+        if ones[o] & 1:
+            detected |= zeros[o]
+        elif zeros[o] & 1:
+            detected |= ones[o]
+    return detected & ~1
+
+
+def relax_test(
+    compiled: CompiledCircuit, test: Dict[str, int], faults: Sequence[Tuple[int, int]]
+) -> List[Optional[int]]:
+    """Turn input bits into X one at a time while every fault stays detected."""
+    cube: List[Optional[int]] = [test.get(compiled.poles[p], 0) for p in compiled.inputs]
+    if not faults:
+        return [None] * len(cube)
+
+    required = ((1 << (len(faults) + 1)) - 1) & ~1
+    for k, value in enumerate(cube):
+        cube[k] = None
+        ones, zeros = simulate_three_valued(compiled, cube, faults)
+        if detected_slots(compiled, ones, zeros) & required != required:
+            cube[k] = value
+    return cube
+
+
+def relax_tests(
+    circuit: Circuit,
+    tests: Sequence[Dict[str, int]],
+    faults: Optional[Sequence[Fault]] = None,
+) -> List[RelaxedCube]:
+    """Relax each test, keeping the faults it detects first (in test order).
+
+    Repeated tests are dropped; a test that detects nothing new relaxes to
+    all x.
+    """
+    compiled = compile_circuit(circuit)
+    remaining = list(faults if faults is not None else characteristic_faults(circuit))
+    relaxed: List[RelaxedCube] = []
+    seen = set()
+
+    for test in tests:
+        key = tuple(test.get(inp, 0) for inp in circuit.inputs)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        sites = [(compiled.index[f.pole], f.stuck_at) for f in remaining]
+        ones, zeros = simulate_three_valued(compiled, list(key), sites)
+        detected = detected_slots(compiled, ones, zeros)
+        mine = [f for slot, f in enumerate(remaining, start=1) if (detected >> slot) & 1]
+        remaining = [f for slot, f in enumerate(remaining, start=1) if not (detected >> slot) & 1]
+
+        cube = relax_test(compiled, test, [(compiled.index[f.pole], f.stuck_at) for f in mine])
+        relaxed.append(
+            RelaxedCube(
+                test=dict(test),
+                cube=''.join('x' if v is None else str(v) for v in cube),
+                faults=tuple(f"{f.pole}/{f.stuck_at}" for f in mine),
+            )
+        )
+    return relaxed
+
+
+def log_relaxed(cubes: Sequence[RelaxedCube], logger: logging.Logger) -> None:
+    for rc in cubes:
+        logger.info(f"Relaxed cube {rc.cube} ({rc.care_bits} care bits) for {', '.join(rc.faults) or '-'}")
+    total = sum(len(rc.cube) for rc in cubes)
+    care = sum(rc.care_bits for rc in cubes)
+    logger.info(f"Care bits: {care} of {total}")
@@ -0,0 +1,123 @@
+"""LFSR reseeding: solve for seeds whose first few states contain given test cubes.
+
+Stage i of the register after t steps is row i of M^t times the seed (M is
+the one-step matrix), so a cube that must appear at cycle t is one linear
+equation per care bit. Seeds are packed greedily: each takes as many cubes
+as stay solvable together, every cube at some cycle below the bound.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from configs.cfg import RESEED_CYCLES
+from helpers.gf2 import LinearSystem, identity, mat_mul
+from helpers.lfsr import LFSR
+
+
+@dataclass(frozen=True)
+class Reseed:
+    seed: int
+    cycles: int  # states to expand from the seed, the seed itself first
+    cubes: Tuple[Tuple[int, int], ...]  # (cube index, cycle whose state matches it)
+
+
+@dataclass(frozen=True)
+class ReseedingResult:
+    seeds: List[Reseed]
+    unencodable: List[int] = field(default_factory=list)  # cubes no seed yields within the bound
+
+    @property
+    def total_cycles(self) -> int:
+        return sum(s.cycles for s in self.seeds)
+
+
+def parse_cube(cube: str, width: int) -> Tuple[int, int]:
+    """(care mask, values) of a '0'/'1'/'x' string whose char i is stage i."""
+    if len(cube) > width:
+        raise ValueError(f"Cube '{cube}' is wider than the {width}-stage register")
+    care = value = 0
+    for i, ch in enumerate(cube):
+        if ch in "01":
+            care |= 1 << i
+            value |= int(ch) << i
+        elif ch not in "xX-":
+            raise ValueError(f"Unknown cube value '{ch}' in '{cube}'")
+    return care, value
+
+
+def stage_rows(lfsr: LFSR, cycles: int) -> List[List[int]]:
+    """rows[t][i]: the seed bits whose parity is stage i after t steps (M^t)."""
+    rows = [identity(lfsr.degree)]
+    step = lfsr.transition()
+    for _ in range(cycles - 1):
+        rows.append(mat_mul(step, rows[-1]))
+    return rows
+
+
+def encode_cubes(lfsr: LFSR, cubes: Sequence[str], max_cycles: int = RESEED_CYCLES) -> ReseedingResult:
+    """Greedy seed set whose expansions of at most `max_cycles` states contain every cube.
+
+    Cubes with the most care bits go first, each at the earliest cycle that
+    keeps the seed's system solvable with a non-zero seed. Once a seed is
+    fixed, cubes its expansion happens to contain are taken too. Minimum set
+    cover is NP-hard, so the count is greedy, not guaranteed optimal.
+    """
+    if max_cycles < 1:
+        raise ValueError("max_cycles must be >= 1")
+    parsed = [parse_cube(cube, lfsr.degree) for cube in cubes]
+    rows = stage_rows(lfsr, max_cycles)
+    pending = sorted(range(len(parsed)), key=lambda k: (-parsed[k][0].bit_count(), k))
+    seeds: List[Reseed] = []
+
+    while pending:
+        system = LinearSystem(lfsr.degree)
+        placed: List[Tuple[int, int]] = []
+        rest: List[int] = []
+        for k in pending:
+            found = _place(system, parsed[k], rows)
+            if found is None:
+                rest.append(k)
+            else:
+                cycle, system = found
+                placed.append((k, cycle))
+        if not placed:
+            # every cube here was tried against an empty system
+            return ReseedingResult(seeds=seeds, unencodable=sorted(rest))
+
+        seed = system.nonzero_solution()
+        states = _expand(lfsr, seed, max_cycles)
+        pending = []
+        for k in rest:
+            care, value = parsed[k]
+            cycle = next((t for t, state in enumerate(states) if state & care == value), None)
+            if cycle is None:
+                pending.append(k)
+            else:
+                placed.append((k, cycle))
+        seeds.append(
+            Reseed(seed=seed, cycles=max(t for _, t in placed) + 1, cubes=tuple(sorted(placed)))
+        )
+
+    return ReseedingResult(seeds=seeds)
+
+
+def _place(
+    system: LinearSystem, cube: Tuple[int, int], rows: List[List[int]]
+) -> Optional[Tuple[int, LinearSystem]]:
+    """(cycle, extended system) for the earliest cycle the cube fits, or None."""
+    care, value = cube
+    bits = [i for i in range(system.n) if (care >> i) & 1]
+    for cycle, matrix in enumerate(rows):
+        trial = system.copy()
+        if all(trial.add(matrix[i], value >> i) for i in bits) and trial.nonzero_solution() is not None:
+            return cycle, trial
+    return None
+
+
+def _expand(lfsr: LFSR, seed: int, cycles: int) -> List[int]:
+    states = [seed]
+    for _ in range(cycles - 1):
+        states.append(lfsr.next_state(states[-1]))
+    return states
@@ -0,0 +1,134 @@
+"""Clocked simulation of circuits with D flip-flops, many sequences at once."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from configs.cfg import SEQ_CYCLES
+from dto import Circuit, Fault, GateType
+from helpers.fault_sim import Coverage, characteristic_faults, observing_outputs
+from helpers.netlist import CompiledCircuit, compile_circuit, simulate_words
+
+
+@dataclass
+class CompiledSequential:
+    """Combinational core of a sequential circuit, cut at the flip-flops.
+
+    Each flip-flop output becomes a pseudo-input of `core` (after the
+    primary inputs) and its D input a pseudo-output (after the primary
+    outputs), so one clock cycle is one `simulate_words` call.
+    """
+
+    core: CompiledCircuit
+    num_inputs: int
+    num_outputs: int
+    state: List[int]  # core pole of each flip-flop output
+    next_state: List[int]  # core pole of each flip-flop D input
+
+    @property
+    def num_flip_flops(self) -> int:
+        return len(self.state)
+
+    @property
+    def outputs(self) -> List[int]:
+        return self.core.outputs[: self.num_outputs]
+
+
+def compile_sequential(circuit: Circuit) -> CompiledSequential:
+    flip_flops = circuit.get_flip_flops()
+    for ff in flip_flops:
+        if len(ff.inputs) != 1:
+            raise ValueError(f"Flip-flop '{ff.id}' must have exactly one input")
+
+    core = Circuit(
+        inputs=list(circuit.inputs) + [ff.output for ff in flip_flops],
+        outputs=list(circuit.outputs) + [ff.inputs[0] for ff in flip_flops],
+        gates=[gate for gate in circuit.gates if gate.gate_type != GateType.DFF],
+    )
+    compiled = compile_circuit(core)
+    n_in, n_out = len(circuit.inputs), len(circuit.outputs)
+    return CompiledSequential(
+        core=compiled,
+        num_inputs=n_in,
+        num_outputs=n_out,
+        state=compiled.inputs[n_in:],
+        next_state=compiled.outputs[n_out:],
+    )
+
+
+def pack_sequences(
+    seq: CompiledSequential, sequences: Sequence[Sequence[Dict[str, int]]]
+) -> Tuple[List[List[int]], int]:
+    """Pack input sequences into one word per primary input per cycle.
+
+    Bit j of every word belongs to sequence j; shorter sequences are padded
+    with all-zero cycles. Returns (frames, mask).
+    """
+    cycles = max((len(s) for s in sequences), default=0)
+    names = [seq.core.poles[i] for i in seq.core.inputs[: seq.num_inputs]]
+    frames = [[0] * len(names) for _ in range(cycles)]
+    for j, sequence in enumerate(sequences):
+        for t, pattern in enumerate(sequence):
+            for k, name in enumerate(names):
+                if pattern.get(name, 0):
+                    frames[t][k] |= 1 << j
+    return frames, (1 << len(sequences)) - 1
+
+
+def simulate_sequences(
+    seq: CompiledSequential,
+    frames: Sequence[Sequence[int]],
+    mask: int,
+    fault: Optional[Tuple[int, int]] = None,
+    initial: Optional[Sequence[int]] = None,
+) -> List[List[int]]:
+    """Clock every packed sequence through `frames`; primary output words per cycle.
+
+    Flip-flops start at `initial` (all 0 by default). A `fault` (core pole
+    index, stuck_at) is present in every cycle, which is the time-frame
+    expansion of the circuit.
+    """
+    state = list(initial) if initial is not None else [0] * seq.num_flip_flops
+    trace = []
+    for words in frames:
+        values = simulate_words(seq.core, list(words) + state, mask, fault)
+        trace.append([values[o] for o in seq.outputs])
+        state = [values[d] for d in seq.next_state]
+    return trace
+
+
+def split_stream(patterns: Sequence[Dict[str, int]], cycles: int = SEQ_CYCLES) -> List[List[Dict[str, int]]]:
+    """Cut a flat pattern stream into sequences of `cycles`, each applied from reset."""
+    if cycles < 1:
+        raise ValueError("cycles must be >= 1")
+    return [list(patterns[k : k + cycles]) for k in range(0, len(patterns), cycles)]
+
+
+def sequential_coverage(
+    circuit: Circuit,
+    sequences: Sequence[Sequence[Dict[str, int]]],
+    faults: Optional[Sequence[Fault]] = None,
+) -> Coverage:
+    """Stuck-at coverage of the sequences, each started from the all-0 state.
+
+    A fault counts as detected when any primary output differs in any cycle
+    of any sequence.
+    """
+    seq = compile_sequential(circuit)
+    faults = list(faults if faults is not None else characteristic_faults(circuit))
+    frames, mask = pack_sequences(seq, sequences)
+    good = simulate_sequences(seq, frames, mask)
+    observed: Dict[str, Tuple[str, ...]] = {}
+
+    for fault in faults:
+        bad = simulate_sequences(seq, frames, mask, (seq.core.index[fault.pole], fault.stuck_at))
+        differs = 0
+        for good_words, bad_words in zip(good, bad):
+            for k, (g, b) in enumerate(zip(good_words, bad_words)):
+                if g != b:
+                    differs |= 1 << k
+        if differs:
+            observed[f"{fault.pole}/{fault.stuck_at}"] = observing_outputs(circuit, differs)
+
+    return Coverage(detected=len(observed), total=len(faults), observed=observed)
@@ -0,0 +1,85 @@
+"""Opt-in hot-path counters for the ATPG engines."""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from typing import ContextManager, Dict, Iterator, Optional
+
+COUNTERS = (
+    "gate_evaluations",
+    "cube_intersections",
+    "implications",
+    "backtracks",
+    "paths_tried",
+)
+
+
+@dataclass
+class AtpgStats:
+    """Counters aggregated over one run.
+
+    Engines take `stats: Optional[AtpgStats] = None` and guard every update
+    with `if stats is not None`, so a disabled run pays one comparison per site.
+    """
+
+    gate_evaluations: int = 0
+    cube_intersections: int = 0
+    implications: int = 0
+    backtracks: int = 0
+    paths_tried: int = 0
+    fault_times: Dict[str, float] = field(default_factory=dict)
+
+    @contextmanager
+    def fault_timer(self, fault_id: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.fault_times[fault_id] = time.perf_counter() - started
+
+    @property
+    def total_time(self) -> float:
+        return sum(self.fault_times.values())
+
+    def as_dict(self) -> Dict[str, object]:
+        data: Dict[str, object] = {name: getattr(self, name) for name in COUNTERS}
+        data["faults"] = len(self.fault_times)
+        data["total_time_s"] = round(self.total_time, 6)
+        data["fault_times_s"] = {k: round(v, 6) for k, v in self.fault_times.items()}
+        return data
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+    def log_summary(self, logger: logging.Logger, slowest: int = 5) -> None:
+        logger.info("ATPG stats: %d faults in %.4f s", len(self.fault_times), self.total_time)
+        for name in COUNTERS:
+            logger.info("  %-19s %d", name, getattr(self, name))
+        ranked = sorted(self.fault_times.items(), key=lambda kv: kv[1], reverse=True)
+        for fault_id, elapsed in ranked[:slowest]:
+            logger.info("  slowest %-10s %.6f s", fault_id, elapsed)
+
+
+def fault_timer(stats: Optional[AtpgStats], fault_id: str) -> ContextManager[None]:
+    """`stats.fault_timer(fault_id)` when stats are enabled, a no-op otherwise."""
+    return stats.fault_timer(fault_id) if stats is not None else nullcontext()
+
+
+def make_stats(mode: str) -> Optional[AtpgStats]:
+    """Stats object for an `ATPG_STATS` mode ('', 'log' or 'json')."""
+    if mode not in ("", "log", "json"):
+        raise ValueError(f"Unknown ATPG_STATS mode '{mode}', expected '', 'log' or 'json'")
+    return AtpgStats() if mode else None
+
+
+def report_stats(stats: Optional[AtpgStats], mode: str, logger: logging.Logger) -> None:
+    if stats is None:
+        return
+    if mode == "json":
+        logger.info(stats.to_json())
+    else:
+        stats.log_summary(logger)
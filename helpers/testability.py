@@ -0,0 +1,267 @@
+"""Testability measures computed from the netlist structure."""
+
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from dto import Circuit, Fault
+from helpers.netlist import (
+    OP_AND,
+    OP_NAND,
+    OP_NOR,
+    OP_NOT,
+    OP_OR,
+    CompiledCircuit,
+    compile_circuit,
+)
+
+# Cost of a value that cannot be set or observed at all
+UNREACHABLE = 10 ** 9
+
+# Detection probability below which a fault counts as random-pattern resistant
+RESISTANT_THRESHOLD = 1 / 64
+
+
+@dataclass
+class Scoap:
+    """SCOAP combinational measures per compiled pole index.
+
+    `cc0`/`cc1` count the signal assignments needed to set a pole to 0/1;
+    `co` counts those needed to observe it at a primary output.
+    """
+
+    compiled: CompiledCircuit
+    cc0: List[int]
+    cc1: List[int]
+    co: List[int]
+
+    def controllability(self, pole: str, value: int) -> int:
+        i = self.compiled.index[pole]
+        return self.cc1[i] if value else self.cc0[i]
+
+    def observability(self, pole: str) -> int:
+        return self.co[self.compiled.index[pole]]
+
+
+def compute_scoap(circuit: Circuit, compiled: Optional[CompiledCircuit] = None) -> Scoap:
+    compiled = compiled or compile_circuit(circuit)
+    n = compiled.num_poles
+    cc0 = [0] * n  # undriven poles are constant 0: free to "set" to 0
+    cc1 = [UNREACHABLE] * n
+    for pole in compiled.inputs:
+        cc0[pole] = cc1[pole] = 1
+
+    for op, ins, out in zip(compiled.gate_ops, compiled.gate_inputs, compiled.gate_outputs):
+        c0 = [cc0[i] for i in ins]
+        c1 = [cc1[i] for i in ins]
+        if op == OP_NOT:
+            zero, one = c1[0], c0[0]
+        elif op in (OP_AND, OP_NAND):
+            zero, one = min(c0, default=UNREACHABLE), sum(c1)
+            if op == OP_NAND:
+                zero, one = one, zero
+        elif op in (OP_OR, OP_NOR):
+            zero, one = sum(c0), min(c1, default=UNREACHABLE)
+            if op == OP_NOR:
+                zero, one = one, zero
+        elif len(ins) >= 2:
+            zero = min(c0[0] + c0[1], c1[0] + c1[1])
+            one = min(c0[0] + c1[1], c1[0] + c0[1])
+        else:
+            zero, one = 0, UNREACHABLE
+        cc0[out] = min(zero + 1, UNREACHABLE)
+        cc1[out] = min(one + 1, UNREACHABLE)
+
+    co = [UNREACHABLE] * n
+    for pole in compiled.outputs:
+        co[pole] = 0
+    for g in reversed(range(compiled.num_gates)):
+        op = compiled.gate_ops[g]
+        ins = compiled.gate_inputs[g]
+        out = compiled.gate_outputs[g]
+        if co[out] >= UNREACHABLE:
+            continue
+        for k, pole in enumerate(ins):
+            sides = [s for j, s in enumerate(ins) if j != k]
+            if op in (OP_AND, OP_NAND):
+                side_cost = sum(cc1[s] for s in sides)
+            elif op in (OP_OR, OP_NOR):
+                side_cost = sum(cc0[s] for s in sides)
+            elif op == OP_NOT:
+                side_cost = 0
+            elif k < 2 and len(ins) >= 2:
+                side_cost = min(cc0[ins[1 - k]], cc1[ins[1 - k]])
+            else:
+                continue  # XOR ignores inputs past the second
+            co[pole] = min(co[pole], co[out] + side_cost + 1, UNREACHABLE)
+
+    return Scoap(compiled=compiled, cc0=cc0, cc1=cc1, co=co)
+
+
+@dataclass
+class Cop:
+    """COP probabilities per compiled pole index, for uniformly random inputs.
+
+    `p1`/`p0` are the probabilities that a pole is 1/0, `obs` the
+    probability that a change on it reaches a primary output. Both values
+    are kept, and "at least one of" is computed in the log domain, so
+    probabilities far below 1e-16 survive instead of rounding to 0.
+    Reconvergent fanout is treated as independent, so all are estimates.
+    """
+
+    compiled: CompiledCircuit
+    p1: List[float]
+    p0: List[float]
+    obs: List[float]
+
+    def probability(self, pole: str, value: int) -> float:
+        i = self.compiled.index[pole]
+        return self.p1[i] if value else self.p0[i]
+
+    def observability(self, pole: str) -> float:
+        return self.obs[self.compiled.index[pole]]
+
+    def detection_probability(self, fault: Fault) -> float:
+        """Chance that one random pattern excites the fault and observes it."""
+        return self.probability(fault.pole, 1 - fault.stuck_at) * self.observability(fault.pole)
+
+    def resistant_faults(
+        self, faults: Iterable[Fault], threshold: float = RESISTANT_THRESHOLD
+    ) -> List[Tuple[Fault, float]]:
+        """Faults detected with probability below `threshold`, hardest first."""
+        scored = [(f, self.detection_probability(f)) for f in faults]
+        return sorted([fp for fp in scored if fp[1] < threshold], key=lambda fp: fp[1])
+
+    def expected_coverage(self, faults: Sequence[Fault], patterns: int) -> float:
+        """Expected fraction of `faults` detected by `patterns` random patterns."""
+        if not faults:
+            return 1.0
+        return sum(_detected_within(self.detection_probability(f), patterns) for f in faults) / len(faults)
+
+    def expected_patterns(self, faults: Sequence[Fault], target: float = 0.95) -> Optional[int]:
+        """Fewest random patterns whose expected coverage reaches `target` (0..1).
+
+        None when the target exceeds the share of faults with a non-zero
+        detection probability, or when the count is too large for a float.
+        """
+        if not faults:
+            return 0
+        probs = [self.detection_probability(f) for f in faults]
+        if sum(1 for p in probs if p > 0) < target * len(faults) - 1e-9:
+            return None
+
+        def reached(n: int) -> bool:
+            return sum(_detected_within(p, n) for p in probs) >= target * len(faults) - 1e-9
+
+        # by this many patterns every detectable fault is missed with probability < 1e-9 / len
+        bound = max(
+            (math.log(1e-9 / len(faults)) / _log_miss(p) for p in probs if p > 0), default=0.0
+        )
+        if not math.isfinite(bound):
+            return None
+        hi = 1
+        while not reached(hi):
+            if hi > bound:
+                return None
+            hi *= 2
+        lo = hi // 2
+        while lo + 1 < hi:
+            mid = (lo + hi) // 2
+            if reached(mid):
+                hi = mid
+            else:
+                lo = mid
+        return hi
+
+    def log(
+        self,
+        logger: logging.Logger,
+        faults: Sequence[Fault],
+        targets: Sequence[float] = (0.9, 0.95, 1.0),
+        sample: int = 5,
+    ) -> None:
+        for target in targets:
+            n = self.expected_patterns(faults, target)
+            if n is None:
+                logger.info("COP estimate for %.0f%% coverage: unreachable", target * 100)
+            else:
+                logger.info("COP estimate for %.0f%% coverage: %d random patterns", target * 100, n)
+        resistant = self.resistant_faults(faults)
+        logger.info("Random-pattern-resistant faults (p < %g): %d", RESISTANT_THRESHOLD, len(resistant))
+        if resistant:
+            logger.info(
+                "Hardest faults: %s",
+                ", ".join(f"{f.pole}/{f.stuck_at} ({p:.3g})" for f, p in resistant[:sample]),
+            )
+
+
+def compute_cop(circuit: Circuit, compiled: Optional[CompiledCircuit] = None) -> Cop:
+    """One forward pass for `p1`/`p0`, one backward pass for `obs`."""
+    compiled = compiled or compile_circuit(circuit)
+    n = compiled.num_poles
+    p1 = [0.0] * n  # undriven poles are constant 0
+    p0 = [1.0] * n
+    for pole in compiled.inputs:
+        p1[pole] = p0[pole] = 0.5
+
+    for op, ins, out in zip(compiled.gate_ops, compiled.gate_inputs, compiled.gate_outputs):
+        if op == OP_NOT:
+            one, zero = p0[ins[0]], p1[ins[0]]
+        elif op in (OP_AND, OP_NAND):
+            one, zero = math.prod(p1[i] for i in ins), _any(p0[i] for i in ins)
+            if op == OP_NAND:
+                one, zero = zero, one
+        elif op in (OP_OR, OP_NOR):
+            one, zero = _any(p1[i] for i in ins), math.prod(p0[i] for i in ins)
+            if op == OP_NOR:
+                one, zero = zero, one
+        elif len(ins) >= 2:
+            a, b = ins[0], ins[1]
+            one = p1[a] * p0[b] + p0[a] * p1[b]
+            zero = p1[a] * p1[b] + p0[a] * p0[b]
+        else:
+            one, zero = 0.0, 1.0
+        p1[out], p0[out] = one, zero
+
+    # log_missed[i]: log of the probability that no branch of pole i propagates a change
+    log_missed = [0.0] * n
+    for pole in compiled.outputs:
+        log_missed[pole] = -math.inf
+    for g in reversed(range(compiled.num_gates)):
+        op = compiled.gate_ops[g]
+        ins = compiled.gate_inputs[g]
+        seen = -math.expm1(log_missed[compiled.gate_outputs[g]])
+        if not seen:
+            continue
+        for k, pole in enumerate(ins):
+            sides = [s for j, s in enumerate(ins) if j != k]
+            if op in (OP_AND, OP_NAND):
+                branch = seen * math.prod(p1[s] for s in sides)
+            elif op in (OP_OR, OP_NOR):
+                branch = seen * math.prod(p0[s] for s in sides)
+            elif op == OP_NOT or (k < 2 and len(ins) >= 2):
+                branch = seen
+            else:
+                continue  # XOR ignores inputs past the second
+            log_missed[pole] += _log_miss(branch)
+
+    # 0.0 - x rather than -x, so that certainty of a miss gives 0.0 and not -0.0
+    return Cop(compiled=compiled, p1=p1, p0=p0, obs=[0.0 - math.expm1(m) for m in log_missed])
+
+
+def _log_miss(p: float) -> float:
+    """log(1 - p), exact for tiny p and -inf for certain events."""
+    return math.log1p(-p) if p < 1.0 else -math.inf
+
+
+def _any(probs: Iterable[float]) -> float:
+    """1 - prod(1 - p): at least one of independent events happens."""
+    return 0.0 - math.expm1(math.fsum(_log_miss(p) for p in probs))
+
+
+def _detected_within(p: float, patterns: int) -> float:
+    """1 - (1 - p) ** patterns without losing p below the float epsilon."""
+    return 0.0 - math.expm1(patterns * _log_miss(p)) if patterns else 0.0
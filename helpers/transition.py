@@ -0,0 +1,109 @@
+"""Transition-delay faults graded on consecutive pattern pairs, bit-parallel."""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Optional, Sequence, Tuple
+
+from dto import Circuit
+from helpers.netlist import CompiledCircuit, compile_circuit, pack_patterns, simulate_words
+
+TransitionKind = Literal["str", "stf"]
+TRANSITION_KINDS: Tuple[TransitionKind, ...] = ("str", "stf")
+
+
+@dataclass(frozen=True)
+class TransitionFault:
+    """Slow-to-rise (`str`) or slow-to-fall (`stf`) at `pole`.
+
+    A pair (v1, v2) detects a slow-to-rise fault when v1 sets the pole to 0
+    and v2 detects it stuck-at-0; slow-to-fall is the mirror image.
+    """
+
+    pole: str
+    kind: TransitionKind
+
+    @property
+    def label(self) -> str:
+        return f"{self.pole}/{self.kind}"
+
+    @property
+    def initial(self) -> int:
+        """Value v1 must set on the pole; the late value v2 behaves as stuck at it."""
+        return 0 if self.kind == "str" else 1
+
+
+@dataclass(frozen=True)
+class TransitionCoverage:
+    detected: int
+    total: int
+    pairs: int
+    undetected: List[str] = field(default_factory=list, compare=False)
+
+    @property
+    def percent(self) -> float:
+        return (self.detected / self.total) * 100 if self.total else 0.0
+
+    def log(self, logger: logging.Logger, name: str, sample: int = 5) -> None:
+        logger.info(
+            "%s transition coverage (%d pairs): %d/%d (%.1f%%)",
+            name,
+            self.pairs,
+            self.detected,
+            self.total,
+            self.percent,
+        )
+        if self.undetected:
+            logger.info("  undetected (sample): %s", ", ".join(self.undetected[:sample]))
+
+
+def transition_faults(circuit: Circuit) -> List[TransitionFault]:
+    poles = list(circuit.inputs) + [g.output for g in circuit.gates]
+    return [TransitionFault(pole=p, kind=k) for p in poles for k in TRANSITION_KINDS]
+
+
+def pair_detection_words(
+    compiled: CompiledCircuit,
+    words: Sequence[int],
+    mask: int,
+    faults: Sequence[TransitionFault],
+) -> List[int]:
+    """Per fault, a word whose bit j is set when pair (j, j + 1) detects it.
+
+    The stream is simulated once per fault as a stuck-at block; shifting the
+    words right by one lines up each pattern with its predecessor, so the
+    launch condition and detection of all pairs are a few word operations.
+    """
+    pair_mask = mask >> 1
+    good = simulate_words(compiled, words, mask)
+    detected = []
+    for fault in faults:
+        pole = compiled.index[fault.pole]
+        stuck = fault.initial
+        bad = simulate_words(compiled, words, mask, (pole, stuck))
+        diff = 0
+        for o in compiled.outputs:
+            diff |= bad[o] ^ good[o]
+        first = good[pole] if stuck else ~good[pole]
+        detected.append(first & (diff >> 1) & pair_mask)
+    return detected
+
+
+def transition_coverage(
+    circuit: Circuit,
+    patterns: Sequence[Dict[str, int]],
+    faults: Optional[Sequence[TransitionFault]] = None,
+    compiled: Optional[CompiledCircuit] = None,
+) -> TransitionCoverage:
+    """Grade every consecutive pair of `patterns`, launch then capture."""
+    compiled = compiled or compile_circuit(circuit)
+    faults = list(faults if faults is not None else transition_faults(circuit))
+    words, mask = pack_patterns(compiled, patterns)
+    detected = pair_detection_words(compiled, words, mask, faults)
+    return TransitionCoverage(
+        detected=sum(1 for word in detected if word),
+        total=len(faults),
+        pairs=max(len(patterns) - 1, 0),
+        undetected=[f.label for f, word in zip(faults, detected) if not word],
+    )
@@ -0,0 +1,180 @@
+"""Weighted pseudo-random patterns: per-input 1-probabilities from AND/OR of LFSR bits.
+
+The AND of k independent uniform bits is 1 with probability 2^-k and their
+OR with probability 1 - 2^-k, so a weight is quantized to one of those
+levels. Bits come from an `LfsrBank` with one lane per pattern, so every
+AND/OR combines whole packed-pattern words.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterator, List, Literal, Optional, Sequence, Tuple
+
+from configs.cfg import WEIGHT_BLOCK, WEIGHT_MAX_TERMS
+from dto import Fault
+from helpers.gf2 import mat_pow, mat_vec
+from helpers.lfsr import LFSR, LfsrBank
+from helpers.netlist import CompiledCircuit, simulate_words
+
+WeightOp = Literal["and", "or"]
+
+
+@dataclass(frozen=True)
+class Weight:
+    """1-probability of an input: the AND (or OR) of `terms` LFSR bits."""
+
+    op: WeightOp
+    terms: int
+
+    @property
+    def probability(self) -> float:
+        low = 0.5 ** self.terms
+        return low if self.op == "and" else 1 - low
+
+
+UNIFORM = Weight("and", 1)
+
+
+def quantize(p: float, max_terms: int = WEIGHT_MAX_TERMS) -> Weight:
+    """The AND/OR level nearest to `p`, using at most `max_terms` bits."""
+    if max_terms < 1:
+        raise ValueError("max_terms must be >= 1")
+    levels = [Weight(op, k) for k in range(1, max_terms + 1) for op in ("and", "or")]
+    return min(levels, key=lambda w: (abs(w.probability - p), w.terms))
+
+
+def cube_weights(cubes: Sequence[str], width: int) -> List[float]:
+    """Per position, the share of cubes caring about it that want a 1 (0.5 if none care)."""
+    ones = [0] * width
+    cares = [0] * width
+    for cube in cubes:
+        for i, ch in enumerate(cube[:width]):
+            if ch in "01":
+                cares[i] += 1
+                ones[i] += ch == "1"
+    return [ones[i] / cares[i] if cares[i] else 0.5 for i in range(width)]
+
+
+def weight_sets(
+    cubes: Sequence[str], width: int, count: int, max_terms: int = WEIGHT_MAX_TERMS
+) -> List[List[Weight]]:
+    """Split the cubes into up to `count` groups that rarely conflict; one weight set per group.
+
+    Cubes with the most care bits go first. A cube joins the group where it
+    creates the fewest new conflicting positions (a 0 meeting a 1); it opens
+    a new group instead while conflicts are unavoidable and groups are left.
+    """
+    if count < 1:
+        raise ValueError("count must be >= 1")
+    order = sorted(range(len(cubes)), key=lambda k: (-sum(ch in "01" for ch in cubes[k]), k))
+    groups: List[Tuple[List[str], int, int]] = []  # (cubes, mask of 1s wanted, mask of 0s wanted)
+    for k in order:
+        ones, zeros = _masks(cubes[k])
+        if not groups:
+            groups.append(([cubes[k]], ones, zeros))
+            continue
+        costs = [(((ones & z) | (zeros & o)) & ~(o & z)).bit_count() for _, o, z in groups]
+        best = min(range(len(groups)), key=lambda g: (costs[g], g))
+        if costs[best] and len(groups) < count:
+            groups.append(([cubes[k]], ones, zeros))
+        else:
+            members, o, z = groups[best]
+            groups[best] = (members + [cubes[k]], o | ones, z | zeros)
+    if not groups:
+        return [[UNIFORM] * width]
+    return [[quantize(p, max_terms) for p in cube_weights(members, width)] for members, _, _ in groups]
+
+
+def weighted_words(lfsr: LFSR, weights: Sequence[Weight], count: int) -> List[int]:
+    """`count` patterns as packed words, one per weight (bit j = pattern j).
+
+    Lane j of the bank starts where pattern j's share of the LFSR sequence
+    begins; lanes are refreshed by stepping `degree` times, so the bits of
+    a pattern never repeat. The register moves past everything used.
+    """
+    if count <= 0:
+        return [0] * len(weights)
+    terms = sum(w.terms for w in weights)
+    refills = -(-terms // lfsr.degree)
+    length = refills * lfsr.degree
+    jump = mat_pow(lfsr.transition(), length)
+    starts = []
+    state = lfsr.state
+    for _ in range(count):
+        starts.append(state)
+        state = mat_vec(jump, state)
+    lfsr.state = state
+
+    bits = _bit_words(LfsrBank.from_seeds(lfsr.polynomial, starts))
+    mask = (1 << count) - 1
+    words = []
+    for weight in weights:
+        word = next(bits)
+        for _ in range(weight.terms - 1):
+            word = word & next(bits) if weight.op == "and" else word | next(bits)
+        words.append(word & mask)
+    return words
+
+
+def weighted_stream(
+    lfsr: LFSR, sets: Sequence[Sequence[Weight]], count: int, block: int = WEIGHT_BLOCK
+) -> Tuple[List[int], int]:
+    """`count` patterns as (packed words, mask), switching to the next weight set every `block`."""
+    if not sets:
+        raise ValueError("At least one weight set is required")
+    if block < 1:
+        raise ValueError("block must be >= 1")
+    width = len(sets[0])
+    if any(len(weights) != width for weights in sets):
+        raise ValueError("All weight sets must have one weight per input")
+    words = [0] * width
+    offset = 0
+    while offset < count:
+        n = min(block, count - offset)
+        weights = sets[(offset // block) % len(sets)]
+        for i, word in enumerate(weighted_words(lfsr, weights, n)):
+            words[i] |= word << offset
+        offset += n
+    return words, (1 << max(count, 0)) - 1
+
+
+def first_detections(
+    compiled: CompiledCircuit, words: Sequence[int], mask: int, faults: Sequence[Fault]
+) -> List[Optional[int]]:
+    """Per fault, the index of the first pattern that detects it (None if none does)."""
+    good = simulate_words(compiled, words, mask)
+    first: List[Optional[int]] = []
+    for fault in faults:
+        bad = simulate_words(compiled, words, mask, (compiled.index[fault.pole], fault.stuck_at))
+        diff = 0
+        for o in compiled.outputs:
+            diff |= bad[o] ^ good[o]
+        first.append((diff & -diff).bit_length() - 1 if diff else None)
+    return first
+
+
+def patterns_to_detect(first: Sequence[Optional[int]], target: int) -> Optional[int]:
+    """Patterns needed until `target` faults are detected, from `first_detections`."""
+    found = sorted(k for k in first if k is not None)
+    if target <= 0:
+        return 0
+    return found[target - 1] + 1 if target <= len(found) else None
+
+
+def _bit_words(bank: LfsrBank) -> Iterator[int]:
+    """Fresh packed words of uniform bits: every stage plane, then `degree` steps for new ones."""
+    while True:
+        yield from bank.planes
+        for _ in range(bank.degree):
+            bank.step()
+
+
+def _masks(cube: str) -> Tuple[int, int]:
+    ones = zeros = 0
+    for i, ch in enumerate(cube):
+        if ch == "1":
+            ones |= 1 << i
+        elif ch == "0":
+            zeros |= 1 << i
+    return ones, zeros
@@ -1,4 +1,4 @@
-from lab1.single_path import run_lab1
+from lab1.single_path import iter_lab1, run_lab1
 
-__all__ = ["run_lab1"]
+__all__ = ["iter_lab1", "run_lab1"]
 
@@ -1,20 +1,36 @@
 """Lab 1: Single path activation method"""
 
 import logging
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
+from configs.cfg import ATPG_STATS, BRIDGE_COVERAGE, RELAX_TESTS, STATIC_LEARNING
 from dto import Circuit, Fault, Gate
+from helpers.bridging import bridge_coverage
+from helpers.fault_sim import observing_outputs, output_word
+from helpers.redundancy import RedundancyProver, UntestableCache, classify_untested
+from helpers.learning import ImplicationGraph, learn_implications
 from helpers.logic import find_paths, get_activation_condition, get_observability_condition, solve_conditions
+from helpers.pseudo_exhaustive import output_supports
+from helpers.relaxation import log_relaxed, relax_tests
+from helpers.stats import AtpgStats, fault_timer, make_stats, report_stats
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+ENGINE = "single_path"
 
-def find_test_for_fault(circuit: Circuit, fault: Fault) -> Optional[Dict[str, int]]:
+
+def find_test_for_fault(
+    circuit: Circuit,
+    fault: Fault,
+    stats: Optional[AtpgStats] = None,
+    learned: Optional[ImplicationGraph] = None,
+    paths: Optional[List[List[str]]] = None,
+) -> Optional[Dict[str, int]]:
     """Find test for single fault using single path activation"""
     
     # For input faults, enumerate all combinations
     if fault.pole in circuit.inputs:
-        return find_test_for_input_fault(circuit, fault)
+        return find_test_for_input_fault(circuit, fault, stats)
     
     gate = circuit.get_gate_by_output(fault.pole)
     if not gate:
@@ -24,13 +40,16 @@ def find_test_for_fault(circuit: Circuit, fault: Fault) -> Optional[Dict[str, in
     obs_cond = get_observability_condition(gate, fault.stuck_at)
     
     # Step 2: find path to output
-    paths = find_paths(circuit, fault.pole, circuit.outputs)
+    if paths is None:
+        paths = find_paths(circuit, fault.pole, circuit.outputs)
     
     if not paths:
         return None
     
     # Try each path
     for path in paths:
+        if stats is not None:
+            stats.paths_tried += 1
         conditions = [obs_cond]
         
         # Step 3: activation conditions
@@ -51,7 +70,7 @@ def find_test_for_fault(circuit: Circuit, fault: Fault) -> Optional[Dict[str, in
             continue
         
         # Step 4: solve for inputs
-        solutions = solve_conditions(conditions, circuit)
+        solutions = solve_conditions(conditions, circuit, stats, learned)
         
         if solutions:
             test = solutions[0]
@@ -60,21 +79,29 @@ def find_test_for_fault(circuit: Circuit, fault: Fault) -> Optional[Dict[str, in
             
             # Simulate with fault
             faulty_out = simulate_with_fault(circuit, test, fault)
+            if stats is not None:
+                stats.gate_evaluations += 2 * len(circuit.gates)
             
-            if normal_out[circuit.outputs[0]] != faulty_out[circuit.outputs[0]]:
-                logger.info(f"Test for {fault.pole}/{fault.stuck_at}: {format_test(test, circuit)}")
+            mask = output_word(circuit, normal_out) ^ output_word(circuit, faulty_out)
+            if mask:
+                log_test(circuit, fault, test, mask)
                 return test
     
     return None
 
 
-def find_test_for_input_fault(circuit: Circuit, fault: Fault) -> Optional[Dict[str, int]]:
+def find_test_for_input_fault(
+    circuit: Circuit, fault: Fault, stats: Optional[AtpgStats] = None
+) -> Optional[Dict[str, int]]:
     """Find test for input pole fault"""
-    n = len(circuit.inputs)
-    
-    for i in range(2 ** n):
-        test = {}
-        for j, inp in enumerate(circuit.inputs):
+    # Only inputs sharing an output cone with the fault matter; the rest stay at 0
+    supports = output_supports(circuit).values()
+    relevant = {inp for cone in supports if fault.pole in cone for inp in cone}
+    enumerated = [inp for inp in circuit.inputs if inp in relevant]
+    
+    for i in range(2 ** len(enumerated)):
+        test = {inp: 0 for inp in circuit.inputs}
+        for j, inp in enumerate(enumerated):
             test[inp] = (i >> j) & 1
         
         # Normal output
@@ -84,9 +111,12 @@ def find_test_for_input_fault(circuit: Circuit, fault: Fault) -> Optional[Dict[s
         faulty_test = test.copy()
         faulty_test[fault.pole] = fault.stuck_at
         faulty_out = circuit.evaluate(faulty_test)
+        if stats is not None:
+            stats.gate_evaluations += 2 * len(circuit.gates)
         
-        if normal_out[circuit.outputs[0]] != faulty_out[circuit.outputs[0]]:
-            logger.info(f"Test for {fault.pole}/{fault.stuck_at}: {format_test(test, circuit)}")
+        mask = output_word(circuit, normal_out) ^ output_word(circuit, faulty_out)
+        if mask:
+            log_test(circuit, fault, test, mask)
             return test
     
     return None
@@ -115,9 +145,26 @@ def format_test(test: Dict[str, int], circuit: Circuit) -> str:
     return ''.join(str(test[inp]) for inp in sorted(circuit.inputs))
 
 
-def run_lab1(circuit: Circuit):
-    """Run lab 1 for all faults"""
-    logger.info("=== Lab 1: Single Path Activation Method ===\n")
+def log_test(circuit: Circuit, fault: Fault, test: Dict[str, int], mask: int) -> None:
+    """Log test, naming the observing outputs on multi-output circuits"""
+    line = f"Test for {fault.pole}/{fault.stuck_at}: {format_test(test, circuit)}"
+    if len(circuit.outputs) > 1:
+        line += f" (observed at {', '.join(observing_outputs(circuit, mask))})"
+    logger.info(line)
+
+
+def iter_lab1(
+    circuit: Circuit,
+    stats: Optional[AtpgStats] = None,
+    cache: Optional[UntestableCache] = None,
+    learned: Optional[ImplicationGraph] = None,
+) -> Iterator[Tuple[Fault, Dict[str, int]]]:
+    """Yield (fault, test) as each test is found; the cache is saved once exhausted"""
+    if cache is None:
+        cache = UntestableCache(circuit)
+    if learned is None and STATIC_LEARNING:
+        learned = learn_implications(circuit)
+    prover = RedundancyProver(circuit, learned=learned)
     
     # Characteristic faults: inputs + internal branches
     characteristic_poles = circuit.inputs.copy()
@@ -125,17 +172,42 @@ def run_lab1(circuit: Circuit):
     for gate in circuit.gates:
         characteristic_poles.append(gate.output)
     
-    tests = []
-    found_faults = []
-    
     for pole in characteristic_poles:
         for stuck_at in [0, 1]:
             fault = Fault(pole=pole, stuck_at=stuck_at)
-            test = find_test_for_fault(circuit, fault)
+            if cache.is_redundant(fault):
+                continue
+            with fault_timer(stats, f"{pole}/{stuck_at}"):
+                test = find_test_for_fault(circuit, fault, stats, learned)
             if test:
-                tests.append((fault, test))
-                found_faults.append(f"{pole}/{stuck_at}")
+                cache.record_detected(fault, ENGINE)
+                yield fault, test
+            else:
+                classify_untested(cache, prover, fault, ENGINE)
     
-    logger.info(f"\nTotal: {len(tests)} tests for {len(found_faults)} faults")
-    return tests
+    cache.save()
+
 
+def run_lab1(
+    circuit: Circuit,
+    stats: Optional[AtpgStats] = None,
+    cache: Optional[UntestableCache] = None,
+    learned: Optional[ImplicationGraph] = None,
+):
+    """Run lab 1 for all faults"""
+    logger.info("=== Lab 1: Single Path Activation Method ===\n")
+    if stats is None:
+        stats = make_stats(ATPG_STATS)
+    if cache is None:
+        cache = UntestableCache(circuit)
+    
+    tests = list(iter_lab1(circuit, stats, cache, learned))
+    
+    logger.info(f"\nTotal: {len(tests)} tests for {len(tests)} faults")
+    if RELAX_TESTS:
+        log_relaxed(relax_tests(circuit, [test for _, test in tests]), logger)
+    if BRIDGE_COVERAGE:
+        bridge_coverage(circuit, [test for _, test in tests]).log(logger)
+    cache.log_summary(logger, ENGINE)
+    report_stats(stats, ATPG_STATS, logger)
+    return tests
@@ -1,4 +1,4 @@
-from lab2.d_algorithm import run_lab2
+from lab2.d_algorithm import iter_lab2, run_lab2
 
-__all__ = ["run_lab2"]
+__all__ = ["iter_lab2", "run_lab2"]
 
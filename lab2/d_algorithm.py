@@ -1,43 +1,68 @@
 """Lab 2: D-algorithm (multi-path activation)"""
 
 import logging
-from typing import List, Dict, Optional, Set
+from typing import Iterator, List, Dict, Optional, Set, Tuple
+from configs.cfg import ATPG_STATS, BRIDGE_COVERAGE, RELAX_TESTS, STATIC_LEARNING
 from dto import Circuit, Fault, GateType
-from helpers.cube import (
-    Cube, d_intersection, build_singular_cubes, 
-    build_d_cubes, build_primitive_d_cubes, build_primitive_d_cubes_for_input
-)
+from helpers.cube import Cube, CubeTables, d_intersection
+from helpers.bridging import bridge_coverage
+from helpers.fault_sim import detection_mask, observing_outputs
+from helpers.learning import ImplicationGraph, learn_implications
+from helpers.redundancy import RedundancyProver, UntestableCache, classify_untested
+from helpers.relaxation import log_relaxed, relax_tests
+from helpers.stats import AtpgStats, fault_timer, make_stats, report_stats
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+ENGINE = "d_algorithm"
 
-def d_algorithm(circuit: Circuit, fault: Fault) -> Optional[Cube]:
+
+def d_algorithm(
+    circuit: Circuit,
+    fault: Fault,
+    stats: Optional[AtpgStats] = None,
+    learned: Optional[ImplicationGraph] = None,
+    tables: Optional[CubeTables] = None,
+) -> Optional[Cube]:
     """D-algorithm implementation"""
     
-    all_poles = circuit.get_all_poles()
+    if tables is None:
+        tables = CubeTables(circuit.get_all_poles())
+    all_poles = tables.all_poles
     
     # Check if fault is on input pole
     if fault.pole in circuit.inputs:
-        return d_algorithm_for_input_fault(circuit, fault, all_poles)
+        return d_algorithm_for_input_fault(circuit, fault, all_poles, stats, learned, tables)
     else:
         gate = circuit.get_gate_by_output(fault.pole)
         if not gate:
             return None
-        primitive_cubes = build_primitive_d_cubes(gate, fault.stuck_at, all_poles)
+        primitive_cubes = tables.primitive(gate, fault.stuck_at)
     
         if not primitive_cubes:
             return None
         
         for prim_cube in primitive_cubes:
-            result = d_drive(circuit, prim_cube.copy(), all_poles)
+            if not is_consistent(prim_cube, learned):
+                continue
+            result = d_drive(circuit, prim_cube.copy(), all_poles, stats, learned, tables)
             if result:
                 return result
+            if stats is not None:
+                stats.backtracks += 1
     
     return None
 
 
-def d_algorithm_for_input_fault(circuit: Circuit, fault: Fault, all_poles: List[str]) -> Optional[Cube]:
+def d_algorithm_for_input_fault(
+    circuit: Circuit,
+    fault: Fault,
+    all_poles: List[str],
+    stats: Optional[AtpgStats] = None,
+    learned: Optional[ImplicationGraph] = None,
+    tables: Optional[CubeTables] = None,
+) -> Optional[Cube]:
     """D-algorithm for input faults - propagate effect through gates"""
     
     # Start cube: set input to opposite of stuck value
@@ -82,16 +107,29 @@ def d_algorithm_for_input_fault(circuit: Circuit, fault: Fault, all_poles: List[
                     test_cube[inp] = '0'
         
         # Try to propagate to output
-        result = d_drive(circuit, test_cube, all_poles)
+        if not is_consistent(test_cube, learned):
+            continue
+        result = d_drive(circuit, test_cube, all_poles, stats, learned, tables)
         if result:
             return result
+        if stats is not None:
+            stats.backtracks += 1
     
     return None
 
 
-def d_drive(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Optional[Cube]:
+def d_drive(
+    circuit: Circuit,
+    cube: Cube,
+    all_poles: List[str],
+    stats: Optional[AtpgStats] = None,
+    learned: Optional[ImplicationGraph] = None,
+    tables: Optional[CubeTables] = None,
+) -> Optional[Cube]:
     """D-drive phase: propagate d/D to outputs"""
     
+    if tables is None:
+        tables = CubeTables(all_poles)
     max_iterations = len(circuit.gates) * 5
     changed = True
     
@@ -101,9 +139,11 @@ def d_drive(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Optional[Cube
         
         if cube.has_output_d(circuit.outputs):
             # D reached output, now consistency
-            final = consistency_phase(circuit, cube, all_poles)
+            final = consistency_phase(circuit, cube, all_poles, stats, learned, tables)
             if final:
                 return final
+            if stats is not None:
+                stats.backtracks += 1
         
         # Try to propagate d/D through each gate
         for gate in circuit.gates:
@@ -113,10 +153,12 @@ def d_drive(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Optional[Cube
             
             if has_d_input and not output_has_d:
                 # Try d-cubes to propagate
-                d_cubes = build_d_cubes(gate, all_poles)
+                d_cubes = tables.d_cubes(gate)
                 
                 for d_cube in d_cubes:
                     new_cube = d_intersection(cube, d_cube)
+                    if stats is not None:
+                        stats.cube_intersections += 1
                     if new_cube and new_cube.has_d_chain():
                         # Check if we propagated d/D further
                         if new_cube[gate.output] in ['d', 'D']:
@@ -129,23 +171,36 @@ def d_drive(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Optional[Cube
             
             # Also try to justify gate outputs using singular cubes
             if not changed and cube[gate.output] == 'x':
-                singular_cubes = build_singular_cubes(gate, all_poles)
+                singular_cubes = tables.singular(gate)
                 for sing_cube in singular_cubes:
                     new_cube = d_intersection(cube, sing_cube)
-                    if new_cube:
+                    if stats is not None:
+                        stats.cube_intersections += 1
+                    if new_cube and is_consistent(new_cube, learned):
+                        if stats is not None:
+                            stats.implications += 1
                         cube = new_cube
                         changed = True
                         break
     
     if cube.has_output_d(circuit.outputs):
-        return consistency_phase(circuit, cube, all_poles)
+        return consistency_phase(circuit, cube, all_poles, stats, learned, tables)
     
     return None
 
 
-def consistency_phase(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Optional[Cube]:
+def consistency_phase(
+    circuit: Circuit,
+    cube: Cube,
+    all_poles: List[str],
+    stats: Optional[AtpgStats] = None,
+    learned: Optional[ImplicationGraph] = None,
+    tables: Optional[CubeTables] = None,
+) -> Optional[Cube]:
     """Consistency phase: assign values to remaining x's"""
     
+    if tables is None:
+        tables = CubeTables(all_poles)
     max_iterations = len(circuit.gates) * 5
     
     for iteration in range(max_iterations):
@@ -153,11 +208,15 @@ def consistency_phase(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Opt
         
         # Process gates in topological order
         for gate in circuit.gates:
-            singular_cubes = build_singular_cubes(gate, all_poles)
+            singular_cubes = tables.singular(gate)
             
             for sing_cube in singular_cubes:
                 new_cube = d_intersection(cube, sing_cube)
-                if new_cube:
+                if stats is not None:
+                    stats.cube_intersections += 1
+                if new_cube and (new_cube.values == cube.values or is_consistent(new_cube, learned)):
+                    if stats is not None:
+                        stats.implications += 1
                     cube = new_cube
                     changed = True
                     break
@@ -177,16 +236,20 @@ def consistency_phase(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Opt
                             # Can evaluate gate
                             input_vals = {i: test_cube[i] for i in gate.inputs}
                             expected = gate.evaluate({k: int(v) if v in ['0','1'] else 0 for k,v in input_vals.items()})
+                            if stats is not None:
+                                stats.gate_evaluations += 1
                             
                             if test_cube[gate.output] in ['0', '1']:
                                 if int(test_cube[gate.output]) != expected:
                                     consistent = False
                                     break
                     
-                    if consistent:
+                    if consistent and is_consistent(test_cube, learned):
                         cube[inp] = val
                         changed = True
                         break
+                    if stats is not None:
+                        stats.backtracks += 1
         
         if not changed:
             break
@@ -205,6 +268,14 @@ def consistency_phase(circuit: Circuit, cube: Cube, all_poles: List[str]) -> Opt
     return None
 
 
+def is_consistent(cube: Cube, learned: Optional[ImplicationGraph]) -> bool:
+    """Check the cube's 0/1 values against direct and learned implications"""
+    if learned is None:
+        return True
+    assignment = {pole: int(val) for pole, val in cube.values.items() if val in ('0', '1')}
+    return learned.imply(assignment) is not None
+
+
 def cube_to_test(cube: Cube, circuit: Circuit) -> Optional[Dict[str, int]]:
     """Convert cube to test vector"""
     test = {}
@@ -230,37 +301,81 @@ def format_test(test: Dict[str, int], circuit: Circuit) -> str:
     return ''.join(str(test[inp]) for inp in sorted(circuit.inputs))
 
 
-def run_lab2(circuit: Circuit):
-    """Run lab 2 for all faults"""
-    logger.info("\n=== Lab 2: D-Algorithm ===\n")
+def iter_lab2(
+    circuit: Circuit,
+    stats: Optional[AtpgStats] = None,
+    cache: Optional[UntestableCache] = None,
+    learned: Optional[ImplicationGraph] = None,
+) -> Iterator[Tuple[Fault, Dict[str, int]]]:
+    """Yield (fault, test) as each fault is covered; the cache is saved once exhausted"""
+    if cache is None:
+        cache = UntestableCache(circuit)
+    if learned is None and STATIC_LEARNING:
+        learned = learn_implications(circuit)
+    prover = RedundancyProver(circuit, learned=learned)
+    tables = CubeTables(circuit.get_all_poles())
     
     characteristic_poles = circuit.inputs.copy()
     
     for gate in circuit.gates:
         characteristic_poles.append(gate.output)
     
-    tests = []
-    test_set = set()
-    covered_faults = []
-    
     for pole in characteristic_poles:
         for stuck_at in [0, 1]:
             fault = Fault(pole=pole, stuck_at=stuck_at)
+            if cache.is_redundant(fault):
+                continue
             
-            cube = d_algorithm(circuit, fault)
+            with fault_timer(stats, f"{pole}/{stuck_at}"):
+                cube = d_algorithm(circuit, fault, stats, learned, tables)
             
             if cube:
                 test = cube_to_test(cube, circuit)
-                test_str = format_test(test, circuit)
                 
-                logger.info(f"Test for {fault.pole}/{fault.stuck_at}: {test_str}")
-                covered_faults.append(f"{fault.pole}/{fault.stuck_at}")
-                
-                if test_str not in test_set:
-                    tests.append(test)
-                    test_set.add(test_str)
+                line = f"Test for {fault.pole}/{fault.stuck_at}: {format_test(test, circuit)}"
+                if len(circuit.outputs) > 1:
+                    # the D-drive stops at the first output reached; report every observing output
+                    mask = detection_mask(circuit, test, fault)
+                    line += f" (observed at {', '.join(observing_outputs(circuit, mask)) or '-'})"
+                logger.info(line)
+                cache.record_detected(fault, ENGINE)
+                yield fault, test
+            else:
+                classify_untested(cache, prover, fault, ENGINE)
     
-    logger.info(f"\nTotal: {len(tests)} unique tests for {len(covered_faults)} faults")
+    cache.save()
+
+
+def run_lab2(
+    circuit: Circuit,
+    stats: Optional[AtpgStats] = None,
+    cache: Optional[UntestableCache] = None,
+    learned: Optional[ImplicationGraph] = None,
+):
+    """Run lab 2 for all faults"""
+    logger.info("\n=== Lab 2: D-Algorithm ===\n")
+    if stats is None:
+        stats = make_stats(ATPG_STATS)
+    if cache is None:
+        cache = UntestableCache(circuit)
+    
+    tests = []
+    test_set = set()
+    covered_faults = 0
+    
+    for _, test in iter_lab2(circuit, stats, cache, learned):
+        covered_faults += 1
+        test_str = format_test(test, circuit)
+        if test_str not in test_set:
+            tests.append(test)
+            test_set.add(test_str)
+    
+    logger.info(f"\nTotal: {len(tests)} unique tests for {covered_faults} faults")
+    if RELAX_TESTS:
+        log_relaxed(relax_tests(circuit, tests), logger)
+    if BRIDGE_COVERAGE:
+        bridge_coverage(circuit, tests).log(logger)
+    cache.log_summary(logger, ENGINE)
+    report_stats(stats, ATPG_STATS, logger)
     
     return tests
-
@@ -5,12 +5,19 @@ from __future__ import annotations
 import logging
 from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Tuple
 
-from configs.cfg import LAB3_POLY
+from configs.cfg import LAB3_POLY, RESEED_CYCLES
 from dto import Fault
 from helpers.circuit_factory import create_circuit_variant_3
+from helpers.fault_sim import characteristic_faults, coverage_for_tests, signature_coverage
 from helpers.lfsr import LFSR, parse_polynomial
+from helpers.polynomials import from_degrees, is_primitive, sparsest_primitive, to_string
+from helpers.redundancy import UntestableCache
+from helpers.relaxation import relax_tests
+from helpers.reseeding import encode_cubes
+from helpers.testability import compute_cop
+from helpers.transition import transition_coverage
 from lab1 import run_lab1
 
 logger = logging.getLogger(__name__)
@@ -27,7 +34,8 @@ def run_lab3(polynomial: str = LAB3_POLY) -> SeedResult | None:
     """Find minimal LFSR seed that covers all Lab1 faults."""
     circuit = create_circuit_variant_3()
     ordered_inputs = sorted(circuit.inputs)
-    required_map, total_faults = _build_required_vectors(circuit, ordered_inputs)
+    tests = run_lab1(circuit, cache=UntestableCache(circuit, directory=None))
+    required_map, total_faults = _build_required_vectors(tests, ordered_inputs)
 
     logger.info("=== Lab 3: LFSR test generation ===")
     logger.info("Polynomial: %s", polynomial)
@@ -35,21 +43,20 @@ def run_lab3(polynomial: str = LAB3_POLY) -> SeedResult | None:
 
     degrees = parse_polynomial(polynomial)
     degree = degrees[0]
-    best: SeedResult | None = None
-
-    for seed in range(1, (1 << degree)):
-        result = _evaluate_seed(
+    if is_primitive(from_degrees(degrees)):
+        logger.info("Polynomial is primitive: one cycle of %d states", (1 << degree) - 1)
+    else:
+        logger.warning(
+            "Polynomial %s is not primitive, so the seeds split over several shorter cycles; "
+            "%s is a primitive polynomial of the same degree",
             polynomial,
-            seed,
-            ordered_inputs,
-            required_map,
-            total_faults,
+            to_string(sparsest_primitive(degree)),
         )
-        if not result:
-            continue
-
-        if best is None or result.cycles < best.cycles:
-            best = result
+    compute_cop(circuit).log(logger, characteristic_faults(circuit))
+    best: SeedResult | None = None
+    found = search_seeds(LFSR(polynomial, 1), len(ordered_inputs), required_map)
+    if found:
+        best = _evaluate_seed(polynomial, found[0], ordered_inputs, required_map, total_faults)
 
     if best:
         logger.info("Best seed: %s (0x%X)", format_seed(best.seed, degree), best.seed)
@@ -61,18 +68,29 @@ def run_lab3(polynomial: str = LAB3_POLY) -> SeedResult | None:
                 hit["vector"],
                 ", ".join(hit["faults"]),
             )
+        stream = lfsr_patterns(polynomial, best.seed, best.cycles, ordered_inputs)
+        transition_coverage(circuit, stream).log(logger, "LFSR")
+        signed = signature_coverage(circuit, stream)
+        logger.info(
+            "MISR signature coverage: %d/%d (%.1f%%), aliased %d, estimated aliasing %.2g",
+            signed.coverage.detected,
+            signed.coverage.total,
+            signed.coverage.percent,
+            signed.aliased,
+            signed.aliasing_estimate,
+        )
     else:
         logger.warning(
             "No seed reached full coverage within %d cycles", (1 << degree) - 1
         )
 
+    _log_reseeding(circuit, polynomial, ordered_inputs, tests, best)
     return best
 
 
 def _build_required_vectors(
-    circuit, ordered_inputs: List[str]
+    tests: List[Tuple[Fault, Dict[str, int]]], ordered_inputs: List[str]
 ) -> Tuple[Dict[str, set], int]:
-    tests = run_lab1(circuit)
     mapping: Dict[str, set] = defaultdict(set)
     fault_ids = set()
 
@@ -85,6 +103,137 @@ def _build_required_vectors(
     return mapping, len(fault_ids)
 
 
+def search_seeds(lfsr: LFSR, width: int, required_map: Dict[str, set]) -> Tuple[int, int] | None:
+    """(seed, cycles) of the shortest run that covers every fault; ties go to the smaller seed.
+
+    The state graph is generated once and split into cycles. A two-pointer
+    sweep over each doubled cycle finds the shortest covering window from
+    every cycle state in O(cycle length). When the step map is singular,
+    states on the tails leading into a cycle are handled by a walk down
+    each tail tree, using the next occurrence of every fault on the cycle.
+    """
+    ids = sorted({f for faults in required_map.values() for f in faults})
+    bit = {f: k for k, f in enumerate(ids)}
+    low = {
+        sum(int(ch) << i for i, ch in enumerate(pattern)): [bit[f] for f in faults]
+        for pattern, faults in required_map.items()
+    }
+    width_mask = (1 << width) - 1
+    period = lfsr.period
+    nxt = [lfsr.next_state(state) for state in range(period + 1)]
+    faults_of = [low.get(state & width_mask, ()) for state in range(period + 1)]
+
+    cycles = _state_cycles(nxt)
+    best: Tuple[int, int] | None = None
+
+    def consider(cycles_needed: int, seed: int) -> None:
+        nonlocal best
+        if seed and cycles_needed <= period and (best is None or (cycles_needed, seed) < (best[1], best[0])):
+            best = (seed, cycles_needed)
+
+    on_cycle = [False] * (period + 1)
+    for cycle in cycles:
+        for state in cycle:
+            on_cycle[state] = True
+        for start, length in _cycle_windows(cycle, faults_of, len(ids)):
+            consider(length, cycle[start])
+
+    if not all(on_cycle):
+        for seed, length in _tail_windows(nxt, cycles, on_cycle, faults_of, len(ids)):
+            consider(length, seed)
+
+    return best
+
+
+def _state_cycles(nxt: List[int]) -> List[List[int]]:
+    """Every cycle of the functional graph `state -> nxt[state]`, in orbit order."""
+    color = [0] * len(nxt)  # 0 unseen, 1 on the current walk, 2 done
+    cycles = []
+    for start in range(len(nxt)):
+        walk = []
+        state = start
+        while color[state] == 0:
+            color[state] = 1
+            walk.append(state)
+            state = nxt[state]
+        if color[state] == 1:
+            cycles.append(walk[walk.index(state) :])
+        for visited in walk:
+            color[visited] = 2
+    return cycles
+
+
+def _cycle_windows(cycle: List[int], faults_of: List, total: int) -> Iterator[Tuple[int, int]]:
+    """(position, length) of the shortest covering window from each cycle position.
+
+    Two pointers over the doubled orbit: the window end only moves forward,
+    so the sweep is linear in the cycle length.
+    """
+    size = len(cycle)
+    counts = [0] * total
+    covered = 0
+    end = 0  # window is [start, end)
+    for start in range(size):
+        while covered < total and end < start + size:
+            for f in faults_of[cycle[end % size]]:
+                counts[f] += 1
+                covered += counts[f] == 1
+            end += 1
+        if covered < total:
+            return  # a whole lap misses some fault, so every start does
+        yield start, end - start
+        for f in faults_of[cycle[start]]:
+            counts[f] -= 1
+            covered -= counts[f] == 0
+
+
+def _tail_windows(
+    nxt: List[int], cycles: List[List[int]], on_cycle: List[bool], faults_of: List, total: int
+) -> Iterator[Tuple[int, int]]:
+    """(seed, length) for every covering seed that only reaches its cycle after a tail."""
+    missing = len(nxt)  # larger than any run
+    preds: Dict[int, List[int]] = defaultdict(list)
+    for state, following in enumerate(nxt):
+        if not on_cycle[state]:
+            preds[following].append(state)
+
+    for cycle in cycles:
+        size = len(cycle)
+        # ahead[f][p]: steps from cycle position p to the first state with fault f
+        ahead = []
+        for f in range(total):
+            row = [missing] * size
+            dist = missing
+            for p in reversed(range(2 * size)):
+                dist = 0 if f in faults_of[cycle[p % size]] else dist + 1
+                if p < size:
+                    row[p] = dist
+            ahead.append(row)
+
+        for pos, entry in enumerate(cycle):
+            # depth-first down the tail tree; deepest[f] = depth of the nearest-to-seed f
+            deepest = [-1] * total
+            stack = [(child, 1, None) for child in preds.get(entry, ())]
+            while stack:
+                state, depth, undo = stack.pop()
+                if state is None:
+                    for f, previous in undo:
+                        deepest[f] = previous
+                    continue
+                changes = [(f, deepest[f]) for f in faults_of[state]]
+                for f in faults_of[state]:
+                    deepest[f] = depth
+                stack.append((None, depth, changes))
+                stack.extend((child, depth + 1, None) for child in preds.get(state, ()))
+
+                length = 0
+                for f in range(total):
+                    first = depth - deepest[f] if deepest[f] >= 0 else depth + ahead[f][pos]
+                    length = max(length, first + 1)
+                if length < missing:
+                    yield state, length
+
+
 def _evaluate_seed(
     polynomial: str,
     seed: int,
@@ -117,6 +266,62 @@ def _evaluate_seed(
     return None
 
 
+def _log_reseeding(
+    circuit,
+    polynomial: str,
+    ordered_inputs: List[str],
+    tests: List[Tuple[Fault, Dict[str, int]]],
+    best: SeedResult | None,
+    max_cycles: int = RESEED_CYCLES,
+) -> None:
+    """Encode the relaxed Lab1 cubes as LFSR seeds and grade the expanded streams."""
+    lfsr = LFSR(polynomial, 1)
+    if len(ordered_inputs) > lfsr.degree:
+        logger.warning(
+            "Reseeding skipped: %d inputs but only %d LFSR stages", len(ordered_inputs), lfsr.degree
+        )
+        return
+    cubes = [rc for rc in relax_tests(circuit, [test for _, test in tests]) if rc.faults]
+    position = {name: k for k, name in enumerate(circuit.inputs)}
+    # relaxed cubes follow circuit.inputs; LFSR stage i drives ordered_inputs[i]
+    ordered = ["".join(rc.cube[position[name]] for name in ordered_inputs) for rc in cubes]
+    result = encode_cubes(lfsr, ordered, max_cycles)
+
+    logger.info(
+        "Reseeding: %d cubes in %d seeds of at most %d cycles, %d cycles in total%s",
+        len(cubes),
+        len(result.seeds),
+        max_cycles,
+        result.total_cycles,
+        f" (single seed: {best.cycles})" if best else "",
+    )
+    stream: List[Dict[str, int]] = []
+    for reseed in result.seeds:
+        logger.info(
+            "  seed %s → %d cycles → cubes %s",
+            format_seed(reseed.seed, lfsr.degree),
+            reseed.cycles,
+            ", ".join(f"{ordered[k]}@{cycle}" for k, cycle in reseed.cubes),
+        )
+        stream.extend(lfsr_patterns(polynomial, reseed.seed, reseed.cycles, ordered_inputs))
+    if result.unencodable:
+        logger.warning(
+            "Cubes no seed produces within %d cycles: %s",
+            max_cycles,
+            ", ".join(ordered[k] for k in result.unencodable),
+        )
+    coverage = coverage_for_tests(circuit, stream)
+    logger.info(
+        "Reseeded stream coverage: %d/%d (%.1f%%)", coverage.detected, coverage.total, coverage.percent
+    )
+
+
+def lfsr_patterns(polynomial: str, seed: int, cycles: int, ordered_inputs: List[str]) -> List[Dict[str, int]]:
+    """The first `cycles` LFSR states as input patterns, in stream order."""
+    states = LFSR(polynomial, seed).states(cycles).tolist()
+    return [{name: (state >> i) & 1 for i, name in enumerate(ordered_inputs)} for state in states]
+
+
 def _vector_from_state(state: int, width: int) -> str:
     return "".join(str((state >> bit) & 1) for bit in range(width))
 
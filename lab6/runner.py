@@ -8,8 +8,18 @@ import random
 from dataclasses import dataclass
 from typing import Dict, List, Literal
 
+from configs.cfg import WEIGHT_SETS, WEIGHTED_PATTERNS, WEIGHTED_POLY
+from dto import Circuit
 from helpers.circuit_factory import create_circuit_variant_3
-from helpers.fault_sim import coverage_for_tests, map_bits_to_inputs
+from helpers.fault_sim import characteristic_faults, coverage_for_tests, map_bits_to_inputs
+from helpers.lfsr import LFSR
+from helpers.netlist import compile_circuit
+from helpers.redundancy import UntestableCache
+from helpers.relaxation import relax_tests
+from helpers.testability import compute_cop
+from helpers.transition import transition_coverage
+from helpers.weighted import UNIFORM, first_detections, patterns_to_detect, weight_sets, weighted_stream
+from lab1 import iter_lab1
 
 logger = logging.getLogger(__name__)
 
@@ -35,14 +45,21 @@ def run_lab6(
     candidates: int = 5,
     metric: Metric = "thd",
     seed: int | None = 1,
+    circuit: Circuit | None = None,
 ) -> CrtResult:
+    """CRT patterns graded on `circuit` (variant 3 by default).
+
+    Sequential circuits are graded over sequences of SEQ_CYCLES patterns;
+    the transition and COP estimates only apply to combinational ones.
+    """
     if candidates < 2 or candidates > 10:
         raise ValueError("candidates must be in [2..10]")
 
     rng = random.Random(seed)
     vectors = generate_crt(n=n, q=q, candidates=candidates, metric=metric, rng=rng)
 
-    circuit = create_circuit_variant_3()
+    label = "Lab1/2 circuit (variant 3)" if circuit is None else "given circuit"
+    circuit = circuit or create_circuit_variant_3()
     tests = [map_bits_to_inputs(v, circuit.inputs) for v in vectors]
     cov = coverage_for_tests(circuit, tests)
 
@@ -52,11 +69,23 @@ def run_lab6(
     for i, v in enumerate(vectors):
         logger.info("  T%d: %s", i, bits_to_str(v))
     logger.info(
-        "Coverage on Lab1/2 circuit (variant 3): %d/%d (%.1f%%)",
+        "Coverage on %s: %d/%d (%.1f%%)",
+        label,
         cov.detected,
         cov.total,
         cov.percent,
     )
+    if not circuit.get_flip_flops():
+        transition_coverage(circuit, tests).log(logger, "CRT")
+        cop = compute_cop(circuit)
+        faults = characteristic_faults(circuit)
+        logger.info(
+            "COP expected coverage for %d random patterns: %.1f%%",
+            len(tests),
+            cop.expected_coverage(faults, len(tests)) * 100,
+        )
+        cop.log(logger, faults)
+        _compare_weighted(circuit)
 
     return CrtResult(
         n=n,
@@ -70,6 +99,46 @@ def run_lab6(
     )
 
 
+def _compare_weighted(circuit: Circuit, count: int = WEIGHTED_PATTERNS, sets: int = WEIGHT_SETS) -> None:
+    """Weighted random patterns, weights from the relaxed Lab1 cubes, against uniform ones."""
+    lab1_logger = logging.getLogger("lab1.single_path")
+    level = lab1_logger.level
+    lab1_logger.setLevel(logging.WARNING)  # the Lab 1 tests are only the source of the cubes here
+    try:
+        tests = [test for _, test in iter_lab1(circuit, cache=UntestableCache(circuit, directory=None))]
+    finally:
+        lab1_logger.setLevel(level)
+    cubes = [rc.cube for rc in relax_tests(circuit, tests) if rc.faults]
+    width = len(circuit.inputs)
+    weights = weight_sets(cubes, width, sets)
+    compiled = compile_circuit(circuit)
+    faults = characteristic_faults(circuit)
+
+    logger.info("Weighted random patterns, weights from %d relaxed Lab1 cubes:", len(cubes))
+    for k, weight_set in enumerate(weights):
+        logger.info(
+            "Weight set %d: %s", k, " ".join(f"{name}={w.probability:.3g}" for name, w in zip(circuit.inputs, weight_set))
+        )
+    runs = {}
+    for name, schedule in (("Weighted", weights), ("Uniform", [[UNIFORM] * width])):
+        words, mask = weighted_stream(LFSR(WEIGHTED_POLY, 1), schedule, count)
+        runs[name] = first_detections(compiled, words, mask, faults)
+
+    target = max(sum(k is not None for k in first) for first in runs.values())
+    for name, first in runs.items():
+        needed = patterns_to_detect(first, target)
+        logger.info(
+            "%s random: %d/%d faults in %d patterns; %d/%d reached after %s",
+            name,
+            sum(k is not None for k in first),
+            len(faults),
+            count,
+            target,
+            len(faults),
+            f"{needed} patterns" if needed is not None else "never",
+        )
+
+
 def generate_crt(
     *,
     n: int,
@@ -7,8 +7,11 @@ import random
 from dataclasses import dataclass
 from typing import List
 
+from dto import Circuit
 from helpers.circuit_factory import create_circuit_variant_3
-from helpers.fault_sim import coverage_for_tests, map_bits_to_inputs
+from helpers.fault_sim import characteristic_faults, coverage_for_tests, map_bits_to_inputs
+from helpers.testability import compute_cop
+from helpers.transition import transition_coverage
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +24,15 @@ class Lab7Result:
     ocrt_coverage_percent: float
 
 
-def run_lab7(*, seed: int | None = 1) -> Lab7Result:
+def run_lab7(*, seed: int | None = 1, circuit: Circuit | None = None) -> Lab7Result:
+    """FAR and OCRT patterns graded on `circuit` (variant 3 by default), as in lab6."""
     rng = random.Random(seed)
 
     far_vectors = generate_far(n=7, q=5, rng=rng)
     ocrt_vectors = generate_ocrt(n=8, rng=rng)
 
-    circuit = create_circuit_variant_3()
+    label = "Lab1/2 circuit (variant 3)" if circuit is None else "given circuit"
+    circuit = circuit or create_circuit_variant_3()
     far_cov = coverage_for_tests(circuit, [map_bits_to_inputs(v, circuit.inputs) for v in far_vectors])
     ocrt_cov = coverage_for_tests(circuit, [map_bits_to_inputs(v, circuit.inputs) for v in ocrt_vectors])
 
@@ -36,7 +41,8 @@ def run_lab7(*, seed: int | None = 1) -> Lab7Result:
     for i, v in enumerate(far_vectors):
         logger.info("  T%d: %s", i, bits_to_str(v))
     logger.info(
-        "FAR coverage on Lab1/2 circuit (variant 3): %d/%d (%.1f%%)",
+        "FAR coverage on %s: %d/%d (%.1f%%)",
+        label,
         far_cov.detected,
         far_cov.total,
         far_cov.percent,
@@ -46,11 +52,14 @@ def run_lab7(*, seed: int | None = 1) -> Lab7Result:
     for i, v in enumerate(ocrt_vectors):
         logger.info("  T%d: %s", i, bits_to_str(v))
     logger.info(
-        "OCRT coverage on Lab1/2 circuit (variant 3): %d/%d (%.1f%%)",
+        "OCRT coverage on %s: %d/%d (%.1f%%)",
+        label,
         ocrt_cov.detected,
         ocrt_cov.total,
         ocrt_cov.percent,
     )
+    if not circuit.get_flip_flops():
+        _log_estimates(circuit, far_vectors, ocrt_vectors)
 
     return Lab7Result(
         far_vectors=far_vectors,
@@ -60,6 +69,24 @@ def run_lab7(*, seed: int | None = 1) -> Lab7Result:
     )
 
 
+def _log_estimates(circuit: Circuit, far_vectors: List[List[int]], ocrt_vectors: List[List[int]]) -> None:
+    """Transition coverage and COP estimates; combinational circuits only."""
+    for name, vectors in (("FAR", far_vectors), ("OCRT", ocrt_vectors)):
+        tests = [map_bits_to_inputs(v, circuit.inputs) for v in vectors]
+        transition_coverage(circuit, tests).log(logger, name)
+
+    cop = compute_cop(circuit)
+    faults = characteristic_faults(circuit)
+    for name, vectors in (("FAR", far_vectors), ("OCRT", ocrt_vectors)):
+        logger.info(
+            "COP expected coverage for %d random patterns (%s budget): %.1f%%",
+            len(vectors),
+            name,
+            cop.expected_coverage(faults, len(vectors)) * 100,
+        )
+    cop.log(logger, faults)
+
+
 def generate_far(*, n: int, q: int, rng: random.Random) -> List[List[int]]:
     seq: List[List[int]] = [_rand_bits(rng, n)]
 
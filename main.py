@@ -3,6 +3,8 @@ from __future__ import annotations
 import argparse
 import logging
 
+from atpg import run_streaming
+from bench import run_bench
 from configs.cfg import LOG_LEVEL
 from helpers.circuit_factory import create_circuit_variant_3
 from lab1 import run_lab1
@@ -18,7 +20,7 @@ def main() -> None:
     parser = argparse.ArgumentParser(description="Digital and memory testing labs.")
     parser.add_argument(
         "--suite",
-        choices=("logic", "memory", "lfsr", "prob", "all"),
+        choices=("logic", "pipeline", "memory", "lfsr", "prob", "bench", "all"),
         default="logic",
         help="Which set of labs to run.",
     )
@@ -30,6 +32,8 @@ def main() -> None:
         circuit = create_circuit_variant_3()
         run_lab1(circuit)
         run_lab2(circuit)
+    elif args.suite == "pipeline":
+        run_streaming(create_circuit_variant_3())
     elif args.suite == "memory":
         run_lab4()
         run_lab5()
@@ -38,10 +42,13 @@ def main() -> None:
     elif args.suite == "prob":
         run_lab6()
         run_lab7()
+    elif args.suite == "bench":
+        run_bench()
     elif args.suite == "all":
         circuit = create_circuit_variant_3()
         run_lab1(circuit)
         run_lab2(circuit)
+        run_streaming(circuit)
         run_lab3()
         run_lab4()
         run_lab5()